@@ -0,0 +1,25 @@
+import random
+from wordfinder import LetterMatrix
+
+# Relative frequencies of letters in English text, in percent.
+LETTER_FREQUENCIES = {
+  'A': 8.2, 'B': 1.5, 'C': 2.8, 'D': 4.3, 'E': 12.7, 'F': 2.2, 'G': 2.0,
+  'H': 6.1, 'I': 7.0, 'J': 0.15, 'K': 0.77, 'L': 4.0, 'M': 2.4, 'N': 6.7,
+  'O': 7.5, 'P': 1.9, 'Q': 0.095, 'R': 6.0, 'S': 6.3, 'T': 9.1, 'U': 2.8,
+  'V': 0.98, 'W': 2.4, 'X': 0.15, 'Y': 2.0, 'Z': 0.074,
+}
+
+def random_letters(rows, columns, seed):
+  """
+  Return a rows x columns list of lists of upper-case letters, drawn
+  with English letter frequencies. The same seed always gives the same
+  letters.
+  """
+  rng = random.Random(seed)
+  letters = list(LETTER_FREQUENCIES)
+  weights = list(LETTER_FREQUENCIES.values())
+  return [rng.choices(letters, weights, k=columns) for _ in range(rows)]
+
+def random_board(rows, columns, seed):
+  """Return a LetterMatrix of random letters, see `random_letters`."""
+  return LetterMatrix(random_letters(rows, columns, seed))
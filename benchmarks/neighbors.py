@@ -0,0 +1,88 @@
+"""
+Micro-benchmark the cost of finding a cell's neighbors.
+
+  python -m benchmarks.neighbors [--sizes 4 6 8] [--repeat 5]
+
+For each board size, times `LetterMatrix.neighbors` over every cell of
+a seeded random board, against a copy of the old implementation that
+tried every offset in NEIGHBOR_TRANSFORMS and checked each candidate
+with `is_letter`. It then times a raw `find_word_coords` on the same
+board and reports the time per node visited, the per-node overhead the
+neighbor lookup is part of.
+"""
+import time
+from argparse import ArgumentParser
+from wordfinder import SearchStats
+from wordfinder.adjacency import NEIGHBOR_TRANSFORMS
+from benchmarks.boards import random_board
+
+SIZES = [4, 6, 8]
+
+# Calls to neighbors() per timing, spread over every cell of the board
+CALLS = 200000
+
+def transform_neighbors(matrix, r, c):
+  """The neighbors of (r, c), found as LetterMatrix.neighbors used to."""
+  neighbors_arr = []
+  for t in NEIGHBOR_TRANSFORMS:
+    candidate = (r + t[0], c + t[1])
+    if matrix.is_letter(candidate[0], candidate[1]):
+      neighbors_arr.append(candidate)
+  return neighbors_arr
+
+def time_calls(neighbors, cells, repeat):
+  """Return the fewest nanoseconds per call of `neighbors` over `cells`."""
+  rounds = max(CALLS // len(cells), 1)
+  best = None
+  for _ in range(repeat):
+    start = time.perf_counter()
+    for _ in range(rounds):
+      for (r, c) in cells:
+        neighbors(r, c)
+    seconds = time.perf_counter() - start
+    best = seconds if best is None else min(best, seconds)
+  return best * 1e9 / (rounds * len(cells))
+
+def time_per_node(matrix, length, repeat):
+  """Return the fewest nanoseconds per node of a raw find_word_coords."""
+  stats = SearchStats()
+  matrix.find_word_coords(length, stats=stats)
+  best = None
+  for _ in range(repeat):
+    start = time.perf_counter()
+    matrix.find_word_coords(length)
+    seconds = time.perf_counter() - start
+    best = seconds if best is None else min(best, seconds)
+  return best * 1e9 / stats.nodes
+
+def main(args=None):
+  parser = ArgumentParser("benchmarks.neighbors")
+  parser.add_argument("--sizes", type=int, nargs="+", default=SIZES,
+                      help="Board sizes to run, default all of " +
+                      " ".join(map(str, SIZES)) + ".")
+  parser.add_argument("--repeat", type=int, default=5,
+                      help="Times to run each timing, keeping the best.")
+  parser.add_argument("--length", type=int, default=4,
+                      help="Word length for the per-node timing.")
+  parser.add_argument("--seed", type=int, default=0,
+                      help="Seed for the random boards.")
+  parsed_args = parser.parse_args(args)
+
+  print("{:<6} {:>14} {:>14} {:>8} {:>14}".format(
+    "size", "old ns/call", "new ns/call", "speedup", "search ns/node"
+  ))
+  for size in parsed_args.sizes:
+    matrix = random_board(size, size, parsed_args.seed)
+    cells = [(r, c) for r in range(size) for c in range(size)]
+    old = time_calls(
+      lambda r, c: transform_neighbors(matrix, r, c), cells,
+      parsed_args.repeat
+    )
+    new = time_calls(matrix.neighbors, cells, parsed_args.repeat)
+    per_node = time_per_node(matrix, parsed_args.length, parsed_args.repeat)
+    print("{:<6} {:>14.1f} {:>14.1f} {:>7.2f}x {:>14.1f}".format(
+      "{0}x{0}".format(size), old, new, old / new, per_node
+    ))
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,158 @@
+"""
+Benchmark LetterMatrix and solve_word_game on reproducible random boards.
+
+  python -m benchmarks.run [--output results.json] [--compare old.json]
+
+Each case solves a seeded random board, either with solve_word_game or,
+for "matrix" cases, with LetterMatrix.find_word_coords, in dictionary or
+raw mode. The solve is run once timed and once, with search stats, under
+tracemalloc to measure peak memory. Each case reports the wall time,
+number of results, results per second, peak memory, and the nodes
+visited, paths explored and dictionary lookups made by the search.
+Saving the results as JSON and passing them to a later run with
+--compare prints the change in time for each case.
+"""
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from argparse import ArgumentParser
+from wordfinder import Dictionary, SearchStats, solve_word_game
+from benchmarks.boards import random_board
+
+SIZES = [3, 4, 5, 6, 7, 8]
+
+# (mode, word lengths, largest board size) for each benchmark. The number
+# of solutions grows combinatorially with board size and word count, so
+# multi-word and raw games are only run on smaller boards. Modes are
+# "dictionary" or "raw" for solve_word_game, and "matrix" or
+# "matrix-raw" for LetterMatrix.find_word_coords with one word length.
+LENGTH_SETS = [
+  ("matrix", [5], 8),
+  ("matrix-raw", [4], 6),
+  ("dictionary", [3], 8),
+  ("dictionary", [5], 8),
+  ("dictionary", [7], 8),
+  ("dictionary", [3, 3], 6),
+  ("dictionary", [4, 3], 6),
+  ("dictionary", [3, 3, 3], 4),
+  ("raw", [3], 8),
+  ("raw", [5], 6),
+  ("raw", [2, 2], 5),
+  ("raw", [3, 2], 4),
+]
+
+def cases(sizes, seed):
+  """Yield a dict describing each benchmark case."""
+  for size in sizes:
+    for (mode, word_lengths, max_size) in LENGTH_SETS:
+      if size > max_size:
+        continue
+      yield {
+        "name": "{0}x{0} {1} {2}".format(
+          size, mode, "-".join(map(str, word_lengths))
+        ),
+        "rows": size,
+        "columns": size,
+        "seed": seed,
+        "mode": mode,
+        "word_lengths": word_lengths,
+      }
+
+def run_case(case, dictionary):
+  """Run one case, returning its description updated with measurements."""
+  matrix = random_board(case["rows"], case["columns"], case["seed"])
+  if case["mode"].endswith("raw"):
+    dictionary = None
+  if case["mode"].startswith("matrix"):
+    solve = lambda stats=None: matrix.find_word_coords(
+      case["word_lengths"][0], dictionary=dictionary, stats=stats
+    )
+  else:
+    solve = lambda stats=None: solve_word_game(
+      matrix, case["word_lengths"], dictionary, stats=stats
+    )
+
+  start = time.perf_counter()
+  results = solve()
+  seconds = time.perf_counter() - start
+  count = len(results)
+  del results
+
+  # Stats are only collected here, so they don't affect the timing
+  stats = SearchStats()
+  tracemalloc.start()
+  solve(stats)
+  (_, peak_bytes) = tracemalloc.get_traced_memory()
+  tracemalloc.stop()
+
+  return dict(
+    case,
+    seconds=seconds,
+    results=count,
+    results_per_second=count / seconds if seconds else None,
+    peak_bytes=peak_bytes,
+    nodes=stats.nodes,
+    paths=stats.paths,
+    lookups=stats.lookups,
+  )
+
+def compare(results, previous):
+  """Print the change in time for each case also in `previous`."""
+  before = {c["name"]: c for c in previous["cases"]}
+  for case in results["cases"]:
+    old = before.get(case["name"])
+    if old is None or not old["seconds"]:
+      continue
+    print("{:<24} {:>9.4f}s -> {:>9.4f}s  x{:.2f}".format(
+      case["name"], old["seconds"], case["seconds"],
+      old["seconds"] / case["seconds"] if case["seconds"] else float("inf")
+    ))
+
+def main(args=None):
+  parser = ArgumentParser("benchmarks.run")
+  parser.add_argument("--output", "-o", type=str, default="",
+                      help="Write the results as JSON to this file.")
+  parser.add_argument("--compare", type=str, default="",
+                      help="A JSON file from an earlier run to compare to.")
+  parser.add_argument("--sizes", type=int, nargs="+", default=SIZES,
+                      help="Board sizes to run, default all of " +
+                      " ".join(map(str, SIZES)) + ".")
+  parser.add_argument("--seed", type=int, default=0,
+                      help="Seed for the random boards.")
+  parser.add_argument("--dictionary_path", type=str, default="",
+                      help="Dictionary to use, as for wordfinder.")
+  parsed_args = parser.parse_args(args)
+
+  start = time.perf_counter()
+  dictionary = Dictionary(parsed_args.dictionary_path)
+  load_seconds = time.perf_counter() - start
+
+  results = {
+    "python": sys.version,
+    "platform": platform.platform(),
+    "timestamp": time.time(),
+    "dictionary": dictionary.path,
+    "dictionary_load_seconds": load_seconds,
+    "cases": [],
+  }
+  for case in cases(parsed_args.sizes, parsed_args.seed):
+    result = run_case(case, dictionary)
+    results["cases"].append(result)
+    print(
+      "{:<24} {:>9.4f}s {:>9} results {:>10} paths {:>12} peak bytes".format(
+        result["name"], result["seconds"], result["results"],
+        result["paths"], result["peak_bytes"]
+      )
+    )
+
+  if parsed_args.output:
+    with open(parsed_args.output, "w") as f:
+      json.dump(results, f, indent=2)
+  if parsed_args.compare:
+    with open(parsed_args.compare) as f:
+      compare(results, json.load(f))
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,105 @@
+"""
+Benchmark how long the command line takes to start and answer.
+
+  python -m benchmarks.startup [--repeat 10] [--board PATH]
+
+The tool is often run once per puzzle, so its start-up cost is paid on
+every run. This times, in fresh interpreters:
+
+  interpreter    python -c pass, the floor for everything else
+  import         import wordfinder
+  first output   wordfinder BOARD 4, until the first line is printed,
+                 including loading the default dictionary
+  raw output     the same with --raw_results, without a dictionary
+
+and reports the fastest and median of each in milliseconds, along with
+the slowest modules `-X importtime` reports for the command line. With
+no --board, a seeded random 4x4 board is used.
+"""
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from argparse import ArgumentParser
+from benchmarks.boards import random_letters
+
+def time_to_first_line(args, repeat):
+  """
+  Return the seconds each of `repeat` runs of python with `args` took to
+  print its first line.
+  """
+  times = []
+  for _ in range(repeat):
+    start = time.perf_counter()
+    process = subprocess.Popen(
+      [sys.executable] + args, stdout=subprocess.PIPE,
+      stderr=subprocess.DEVNULL
+    )
+    process.stdout.readline()
+    times.append(time.perf_counter() - start)
+    process.communicate()
+  return times
+
+def slowest_imports(args, count):
+  """
+  Return (microseconds, module) for the `count` modules with the most
+  cumulative import time when python is run with `args`.
+  """
+  result = subprocess.run(
+    [sys.executable, "-X", "importtime"] + args, stdout=subprocess.DEVNULL,
+    stderr=subprocess.PIPE, text=True
+  )
+  imports = []
+  for line in result.stderr.splitlines():
+    fields = line.split("|")
+    if len(fields) == 3 and fields[1].strip().isdigit():
+      imports.append((int(fields[1]), fields[2].strip()))
+  return sorted(imports, reverse=True)[:count]
+
+def main(args=None):
+  parser = ArgumentParser("benchmarks.startup")
+  parser.add_argument("--repeat", type=int, default=10,
+                      help="Times to run each command.")
+  parser.add_argument("--board", type=str, default=None,
+                      help="Board file to solve, default a random 4x4 board.")
+  parser.add_argument("--imports", type=int, default=10,
+                      help="Number of slowest imports to list.")
+  parsed_args = parser.parse_args(args)
+
+  board = parsed_args.board
+  if board is None:
+    with tempfile.NamedTemporaryFile(
+        "w", suffix=".txt", delete=False
+    ) as f:
+      for row in random_letters(4, 4, 0):
+        f.write("".join(row) + "\n")
+    board = f.name
+  try:
+    commands = [
+      ("interpreter", ["-c", "print()"]),
+      ("import", ["-c", "import wordfinder; print()"]),
+      ("first output", ["-m", "wordfinder", board, "4"]),
+      ("raw output", ["-m", "wordfinder", board, "4", "--raw_results"]),
+    ]
+    # Once first, so the dictionary's compiled cache is built
+    time_to_first_line(commands[2][1], 1)
+    print("{:<14} {:>10} {:>10}".format("command", "best ms", "median ms"))
+    for (name, command) in commands:
+      times = time_to_first_line(command, parsed_args.repeat)
+      print("{:<14} {:>10.1f} {:>10.1f}".format(
+        name, min(times) * 1e3, statistics.median(times) * 1e3
+      ))
+    print()
+    print("Slowest imports for the command line:")
+    for (micros, module) in slowest_imports(
+        ["-m", "wordfinder", board, "4"], parsed_args.imports
+    ):
+      print("  {:>8.1f} ms  {}".format(micros / 1e3, module))
+  finally:
+    if parsed_args.board is None:
+      os.remove(board)
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,40 @@
+from nose.tools import assert_equal
+from wordfinder import LetterMatrix
+from wordfinder.adjacency import (
+  NEIGHBOR_TRANSFORMS, neighbor_coords, neighbor_masks, neighbor_table
+)
+
+class TestAdjacency:
+
+  def test_neighbor_coords(self):
+    coords = neighbor_coords(2, 3)
+    assert_equal(coords[0][0], ((0, 1), (1, 0), (1, 1)))
+    assert_equal(coords[1][1], ((0, 0), (0, 1), (0, 2), (1, 0), (1, 2)))
+    assert coords is neighbor_coords(2, 3)
+
+  def test_tables_agree(self):
+    for (rows, columns) in [(1, 1), (1, 4), (3, 3), (4, 2)]:
+      coords = neighbor_coords(rows, columns)
+      table = neighbor_table(rows, columns)
+      masks = neighbor_masks(rows, columns)
+      for r in range(rows):
+        for c in range(columns):
+          i = r * columns + c
+          assert_equal(
+            table[i], tuple(nr * columns + nc for (nr, nc) in coords[r][c])
+          )
+          assert_equal(masks[i], sum(1 << n for n in table[i]))
+
+  def test_letter_matrix_neighbors(self):
+    matrix = LetterMatrix([
+      ['A', '', 'C'],
+      ['D', 'E', ''],
+      ['', 'H', 'I'],
+    ])
+    for r in range(3):
+      for c in range(3):
+        expected = [
+          (r + dr, c + dc) for (dr, dc) in NEIGHBOR_TRANSFORMS
+          if matrix.is_letter(r + dr, c + dc)
+        ]
+        assert_equal(matrix.neighbors(r, c), expected)
@@ -0,0 +1,91 @@
+from nose.tools import assert_equal
+import wordfinder
+from wordfinder import batch, LetterMatrix
+import os
+import shutil
+import tempfile
+
+class TestBatch:
+
+  def setup(self):
+    self.dir = tempfile.mkdtemp()
+
+  def teardown(self):
+    shutil.rmtree(self.dir)
+
+  def write(self, name, contents):
+    path = os.path.join(self.dir, name)
+    with open(path, "w") as f:
+      f.write(contents)
+    return path
+
+  def test_iter_jobs_directory(self):
+    b = self.write("b.csv", "A,B\n")
+    a = self.write("a.csv", "C,D\n")
+    self.write("notes.txt", "")
+    assert_equal(
+      list(batch.iter_jobs(self.dir, [2])),
+      [
+        {"id": a, "path": a, "word_lengths": [2], "prefix": "",
+         "suffix": "", "pattern": ""},
+        {"id": b, "path": b, "word_lengths": [2], "prefix": "",
+         "suffix": "", "pattern": ""},
+      ]
+    )
+
+  def test_iter_jobs_jsonl(self):
+    path = self.write("jobs.jsonl", '{"board": [["A"]]}\n\n[1]\n')
+    jobs = list(batch.iter_jobs(path, [1], "A", pattern="A"))
+    assert_equal(jobs[0], {
+      "id": "line 1", "board": [["A"]], "word_lengths": [1], "prefix": "A",
+      "suffix": "", "pattern": "A"
+    })
+    assert_equal(jobs[1]["id"], "line 3")
+    assert "error" in jobs[1]
+
+  def test_solve_batch(self):
+    path = self.write("bad.csv", "A,9\n")
+    jobs = [
+      {"id": "ok", "board": [["A", "B", "A"]], "word_lengths": [2]},
+      {"id": "bad", "path": path, "word_lengths": [2]},
+      {"id": "none", "board": [["A"]]},
+      {"id": "prefix", "board": [["A", "B", "C"]], "word_lengths": [2],
+       "prefix": "B"},
+    ]
+    results = list(batch.solve_batch(jobs, None, limit=5))
+    assert_equal(results[0], {
+      "id": "ok", "solutions": [["AB"], ["BA"]], "error": None
+    })
+    assert results[1]["error"].startswith("InvalidLetterMatrixException")
+    assert_equal(results[2]["error"], "ValueError: No word lengths given.")
+    assert_equal(results[3]["solutions"], [["BA"], ["BC"]])
+    assert_equal(list(batch.solve_batch(jobs, None, workers=2)), results)
+
+  def test_constraints(self):
+    board = [["A", "B", "C"], ["D", "E", "F"]]
+    for (word_lengths, fields) in [
+      ([2, 2], {"prefix": "B,C"}),
+      ([2, 2], {"suffix": ",F"}),
+      ([2, 1, 2], {"pattern": [".E", "", "A"]}),
+      ([3], {"suffix": "F", "pattern": ".E"}),
+    ]:
+      constraints = batch.job_constraints(fields)
+      expected = sorted(
+        s for s in wordfinder.solve_word_game(
+          LetterMatrix(board), word_lengths, None, unique=True
+        )
+        if all(c is None or c.matches(w) for (c, w) in zip(constraints, s))
+      )
+      result = batch.solve_job(
+        dict(fields, board=board, word_lengths=word_lengths), None
+      )
+      assert_equal(result["error"], None)
+      assert result["solutions"]
+      if len(word_lengths) == 1:
+        # A single word's matches are listed one per solution
+        expected = [[w] for w in sorted({s[0] for s in expected})]
+      assert_equal(result["solutions"], expected)
+    result = batch.solve_job(
+      {"board": board, "word_lengths": [2], "pattern": "A?"}, None
+    )
+    assert result["error"].startswith("ValueError")
@@ -0,0 +1,13 @@
+from nose.tools import assert_equal
+from benchmarks.boards import random_letters, random_board
+
+class TestBenchmarkBoards:
+
+  def test_reproducible(self):
+    assert_equal(random_letters(5, 4, 7), random_letters(5, 4, 7))
+    assert random_letters(5, 4, 7) != random_letters(5, 4, 8)
+
+  def test_shape(self):
+    matrix = random_board(3, 6, 0)
+    assert_equal(matrix.row_count(), 3)
+    assert_equal(matrix.column_count(), 6)
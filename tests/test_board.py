@@ -0,0 +1,50 @@
+from nose.tools import assert_equal
+from wordfinder import LetterMatrix
+from wordfinder.board import Board, neighbor_table
+import copy
+
+class TestBoard:
+
+  letters = [
+    ['' , 'A', 'B', 'C', 'D'],
+    ['E', 'F', '' , 'G', '' ],
+    ['H', 'I', 'J', 'K', 'L'],
+    ['' , '' , '' , '' , '' ],
+    ['M', '' , 'N', '' , 'O'],
+    ['P', 'Q', 'R', 'S', '' ],
+  ]
+
+  def setup(self):
+    self.matrix = LetterMatrix(copy.deepcopy(self.letters))
+    self.board = Board.from_matrix(self.matrix)
+
+  def test_round_trip(self):
+    assert_equal(self.board.to_matrix().matrix, self.letters)
+    assert_equal(self.board, Board.from_matrix(self.board.to_matrix()))
+    assert_equal(Board.from_matrix(LetterMatrix([])).cells, b"")
+
+  def test_neighbor_table(self):
+    table = neighbor_table(2, 3)
+    assert_equal(table[0], (1, 3, 4))
+    assert_equal(table[4], (0, 1, 2, 3, 5))
+    assert table is neighbor_table(2, 3)
+
+  def test_word_coords_match_letter_matrix(self):
+    for length in range(5):
+      for prefix in ["", "M", "mq", "IFA", ".F", "i.a"]:
+        assert_equal(
+          sorted(self.board.iter_word_coords(length, prefix)),
+          sorted(self.matrix.find_word_coords(length, prefix))
+        )
+
+  def test_remove_word(self):
+    coords = [(0, 1), (1, 1), (2, 2)]
+    reduced = self.board.remove_word(coords)
+    self.matrix.remove_word(coords)
+    assert_equal(reduced.to_matrix().matrix, self.matrix.matrix)
+    # The original board is unchanged
+    assert_equal(self.board.to_matrix().matrix, self.letters)
+
+  def test_word_at(self):
+    assert_equal(self.board.word_at([(1, 1), (1, 2), (1, 3)]), 'FG')
+    assert_equal(self.board.word_at_cells([20, 25]), 'MP')
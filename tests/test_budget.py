@@ -0,0 +1,76 @@
+from nose.tools import assert_equal, assert_raises
+import wordfinder
+from wordfinder import LetterMatrix, SearchBudget, SolveCache
+from wordfinder.budget import BudgetExceeded
+from wordfinder.scoring import best_solutions
+from wordfinder.solve import solve_word_game_within
+from benchmarks.boards import random_board
+
+class TestBudget:
+
+  def setup(self):
+    self.matrix = random_board(4, 4, seed=3)
+    self.all_solutions = wordfinder.solve_word_game(self.matrix, [3, 3], None)
+
+  def test_spend(self):
+    budget = SearchBudget(max_nodes=10)
+    budget.spend(10)
+    assert budget.completed
+    assert_raises(BudgetExceeded, budget.spend)
+    assert budget.exhausted
+    assert_equal(budget.reason(), "visited more than 10 cells")
+
+  def test_timeout(self):
+    budget = SearchBudget(timeout=0)
+    assert_raises(BudgetExceeded, budget.check)
+    assert_equal(budget.reason(), "ran for more than 0 seconds")
+
+  def test_unlimited(self):
+    budget = SearchBudget()
+    solutions = wordfinder.solve_word_game(
+      self.matrix, [3, 3], None, budget=budget
+    )
+    assert_equal(solutions, self.all_solutions)
+    assert budget.completed
+    assert budget.nodes > 0
+
+  def test_node_limit(self):
+    budget = SearchBudget(max_nodes=2000)
+    solutions = wordfinder.solve_word_game(
+      self.matrix, [3, 3], None, budget=budget
+    )
+    assert budget.exhausted
+    assert 0 < len(solutions) < len(self.all_solutions)
+    for s in solutions:
+      assert s in self.all_solutions
+
+  def test_within(self):
+    (solutions, completed) = solve_word_game_within(
+      self.matrix, [3, 3], None, max_nodes=10 ** 9
+    )
+    assert completed
+    assert_equal(solutions, self.all_solutions)
+    (solutions, completed) = solve_word_game_within(
+      self.matrix, [3, 3], None, max_nodes=100
+    )
+    assert not completed
+
+  def test_no_partial_cache_entries(self):
+    cache = SolveCache()
+    matrix = LetterMatrix([['A','B','C'],['D','E','F'],['G','H','I']])
+    wordfinder.solve_word_game(
+      matrix, [3, 3, 3], None, cache, budget=SearchBudget(max_nodes=500)
+    )
+    # The same cache must still give every solution afterwards
+    assert_equal(
+      sorted(wordfinder.solve_word_game(matrix, [3, 3, 3], None, cache)),
+      sorted(wordfinder.solve_word_game(matrix, [3, 3, 3], None))
+    )
+
+  def test_best_solutions(self):
+    budget = SearchBudget(max_nodes=300)
+    best = best_solutions(self.matrix, [3, 3], None, 5, budget=budget)
+    assert budget.exhausted
+    assert len(best) <= 5
+    for (_, solution) in best:
+      assert solution in self.all_solutions
@@ -0,0 +1,57 @@
+from nose.tools import assert_equal
+from wordfinder import CellPath, CellPathList, LetterMatrix
+from wordfinder.board import Board
+from benchmarks.boards import random_board
+
+class TestCellPath:
+
+  def setup(self):
+    self.matrix = LetterMatrix([
+      ['C', 'A', 'T'],
+      ['D', 'O', 'G'],
+    ])
+
+  def test_coords(self):
+    path = CellPath.from_coords([(0, 2), (1, 1), (1, 0)], 2, 3)
+    assert_equal(path.cells, bytes([2, 4, 3]))
+    assert_equal(list(path), [(0, 2), (1, 1), (1, 0)])
+    assert_equal(path[1], (1, 1))
+    assert_equal(len(path), 3)
+    assert_equal(path, CellPath(bytes([2, 4, 3]), 3))
+
+  def test_large_board(self):
+    path = CellPath.from_coords([(20, 19), (19, 19)], 30, 20)
+    assert_equal(list(path.cells), [419, 399])
+    assert_equal(list(path), [(20, 19), (19, 19)])
+
+  def test_word_at_and_remove_word(self):
+    path = CellPath.from_coords([(1, 0), (1, 1), (1, 2)], 2, 3)
+    assert_equal(self.matrix.word_at(path), "DOG")
+    board = Board.from_matrix(self.matrix)
+    assert_equal(board.word_at(path), "DOG")
+    assert_equal(
+      board.remove_word(path),
+      Board.from_matrix(LetterMatrix([['C', 'A', 'T'], ['', '', '']]))
+    )
+    self.matrix.remove_word(path)
+    assert_equal(
+      self.matrix.matrix, [['C', 'A', 'T'], ['', '', '']]
+    )
+
+  def test_find_word_coords_compact(self):
+    matrix = random_board(4, 4, seed=5)
+    board = Board.from_matrix(matrix)
+    for length in range(1, 6):
+      expected = matrix.find_word_coords(length)
+      paths = matrix.find_word_coords(length, compact=True)
+      assert isinstance(paths, CellPathList)
+      assert_equal(len(paths), len(expected))
+      assert_equal([p.coords() for p in paths], expected)
+      assert_equal(paths[-1].coords(), expected[-1])
+      assert_equal(
+        sorted(board.iter_word_coords(length, compact=True)), sorted(paths)
+      )
+
+  def test_compact_memory(self):
+    paths = random_board(4, 4, seed=5).find_word_coords(5, compact=True)
+    assert_equal(paths.nbytes(), 5 * len(paths))
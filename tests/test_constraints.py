@@ -0,0 +1,153 @@
+from nose.tools import assert_equal, assert_raises
+import wordfinder
+from wordfinder import LetterMatrix, Dictionary, ResultCache, WordConstraint
+from wordfinder.constraints import (
+  matches_pattern, parse_constraints, word_patterns
+)
+from wordfinder.scoring import best_solutions
+from benchmarks.boards import random_board
+import os
+
+# The packaged word list, so results are the same on every host
+DICTIONARY_PATH = os.path.join(
+  os.path.dirname(__file__), "..", "dictionaries", "scrabble_2019.txt"
+)
+
+class TestWordConstraint:
+
+  def test_pattern(self):
+    assert_equal(WordConstraint("CA").pattern(4), "CA")
+    assert_equal(WordConstraint(suffix="S").pattern(4), "...S")
+    assert_equal(WordConstraint("c", "t", {1: "a"}).pattern(3), "CAT")
+    assert_equal(WordConstraint(fixed={2: "A"}).pattern(5), "..A")
+    assert_equal(WordConstraint().pattern(3), "")
+    # Too long, or conflicting letters
+    assert_equal(WordConstraint("CATS").pattern(3), None)
+    assert_equal(WordConstraint("CA", "TS").pattern(3), None)
+    assert_equal(WordConstraint(fixed={3: "A"}).pattern(3), None)
+
+  def test_invalid(self):
+    assert_raises(ValueError, WordConstraint, "C4T")
+    assert_raises(ValueError, WordConstraint, fixed={-1: "A"})
+    assert_raises(ValueError, WordConstraint, fixed={0: "AB"})
+
+  def test_matches(self):
+    assert WordConstraint("C", "T").matches("cat")
+    assert not WordConstraint("C", "T").matches("cats")
+    assert matches_pattern("CATS", "C.T")
+    assert not matches_pattern("CAB", "C.T")
+    assert not matches_pattern("CA", "C.T")
+
+  def test_parse_constraints(self):
+    constraints = parse_constraints("CA,,T", ",ING", "..A.E")
+    assert_equal(constraints, [
+      WordConstraint("CA", fixed={2: "A", 4: "E"}),
+      WordConstraint(suffix="ING"),
+      WordConstraint("T"),
+    ])
+    assert_equal(parse_constraints(",", "", ""), [None, None])
+    assert_equal(parse_constraints(), [])
+    assert_raises(ValueError, parse_constraints, "", "", "A?B")
+
+  def test_word_patterns(self):
+    constraints = [None, WordConstraint(suffix="S")]
+    assert_equal(word_patterns(constraints, [2, 3, 4]), ("", "..S", ""))
+    assert_equal(word_patterns(None, [2, 3]), ("", ""))
+    assert_equal(word_patterns([WordConstraint("ABC")], [2]), None)
+    assert_raises(ValueError, word_patterns, [None, None], [2])
+
+
+class TestConstrainedSearch:
+
+  def setup(self):
+    self.dictionary = Dictionary(DICTIONARY_PATH, use_cache=False)
+    self.matrix = random_board(4, 4, 3)
+
+  def check(self, word_lengths, constraints, dictionary, **kwargs):
+    expected = [
+      s for s in wordfinder.solve_word_game(
+        self.matrix, word_lengths, dictionary, **kwargs
+      )
+      if all(c is None or c.matches(w) for (c, w) in zip(constraints, s))
+    ]
+    assert_equal(
+      sorted(wordfinder.solve_word_game(
+        self.matrix, word_lengths, dictionary, constraints=constraints,
+        **kwargs
+      )),
+      sorted(expected)
+    )
+    return expected
+
+  def test_matches_filtered_solutions(self):
+    for constraints in [
+      [None, WordConstraint("T")],
+      [WordConstraint(suffix="E"), None, WordConstraint(fixed={1: "A"})],
+      [WordConstraint("ZZ")],
+    ]:
+      for unique in [False, True]:
+        self.check([4, 4, 3], constraints, self.dictionary, unique=unique)
+      self.check([4, 4, 3], constraints, self.dictionary, workers=2)
+    assert self.check(
+      [3, 2], [WordConstraint(suffix="T"), WordConstraint("A")], None
+    )
+
+  def test_prunes_inside_search(self):
+    (_, free) = wordfinder.solve_word_game_with_stats(
+      self.matrix, [4, 4], self.dictionary
+    )
+    (_, constrained) = wordfinder.solve_word_game_with_stats(
+      self.matrix, [4, 4], self.dictionary,
+      constraints=[None, WordConstraint(suffix="E")]
+    )
+    assert constrained.nodes < free.nodes
+
+  def test_impossible_constraint(self):
+    assert_equal(wordfinder.solve_word_game(
+      self.matrix, [3, 3], self.dictionary,
+      constraints=[None, WordConstraint("TEAK")]
+    ), [])
+    assert_raises(
+      ValueError, wordfinder.solve_word_game, self.matrix, [3],
+      self.dictionary, constraints=[None, None]
+    )
+
+  def test_find_words_with_pattern(self):
+    matrix = LetterMatrix([['A','B','C'], ['D', 'E', 'F']])
+    for pattern in [".B", "A.C", "..", ".e."]:
+      for length in [2, 3]:
+        assert_equal(
+          matrix.find_words(length, pattern),
+          [w for w in matrix.find_words(length)
+           if matches_pattern(w, pattern.upper())]
+        )
+
+  def test_count_raw_solutions(self):
+    for constraints in [[WordConstraint(suffix="E")], [None, WordConstraint(
+        fixed={1: "A"}
+    )]]:
+      assert_equal(
+        wordfinder.count_raw_solutions(
+          self.matrix, [3, 2], constraints=constraints
+        ),
+        len(self.check([3, 2], constraints, None))
+      )
+
+  def test_best_solutions(self):
+    constraints = [None, WordConstraint(suffix="E")]
+    best = best_solutions(
+      self.matrix, [4, 4], self.dictionary, 3, constraints=constraints
+    )
+    assert best
+    for (_, solution) in best:
+      assert constraints[1].matches(solution[1])
+
+  def test_result_cache(self):
+    cache = ResultCache()
+    constraints = [None, WordConstraint(suffix="E")]
+    free = cache.solve_word_game(self.matrix, [4, 4], self.dictionary)
+    constrained = cache.solve_word_game(
+      self.matrix, [4, 4], self.dictionary, constraints=constraints
+    )
+    assert len(constrained) < len(free)
+    assert_equal(cache.hits, 0)
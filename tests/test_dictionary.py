@@ -0,0 +1,178 @@
+from nose.tools import assert_equal
+from wordfinder import Dictionary, CompositeDictionary
+from wordfinder import packed
+from wordfinder.dictionary import load_dictionary
+import os
+import pickle
+import shutil
+import tempfile
+
+class TestDictionary:
+
+  def setup(self):
+    self.dir = tempfile.mkdtemp()
+    self.old_cache_dir = os.environ.get("WORDFINDER_CACHE_DIR")
+    os.environ["WORDFINDER_CACHE_DIR"] = os.path.join(self.dir, "cache")
+    self.source = os.path.join(self.dir, "words.txt")
+    self.write_words("dog\ncat\r\nCAT\nbird\n")
+
+  def teardown(self):
+    if self.old_cache_dir is None:
+      del os.environ["WORDFINDER_CACHE_DIR"]
+    else:
+      os.environ["WORDFINDER_CACHE_DIR"] = self.old_cache_dir
+    shutil.rmtree(self.dir)
+
+  def write_words(self, contents):
+    with open(self.source, "w") as f:
+      f.write(contents)
+
+  def test_text(self):
+    dictionary = Dictionary(self.source, use_cache=False)
+    assert_equal(dictionary.words, ["BIRD", "CAT", "DOG"])
+    assert dictionary.contains("cat")
+    assert not dictionary.contains("ca")
+    assert_equal(dictionary.dictionary_words, {"BIRD", "CAT", "DOG"})
+
+  def test_compiled(self):
+    dictionary = Dictionary(self.source)
+    assert isinstance(dictionary.words, packed.PackedWords)
+    assert_equal(list(dictionary.words), ["BIRD", "CAT", "DOG"])
+    assert dictionary.contains("Dog")
+    assert not dictionary.contains("DOGS")
+    assert os.path.exists(packed.compiled_path(self.source))
+
+  def test_feasible_words(self):
+    self.write_words("dog\ncat\ngod\ngood\ngo\ndo's\nact\n")
+    for use_cache in (False, True):
+      dictionary = Dictionary(self.source, use_cache=use_cache)
+      assert_equal(dictionary.words_of_length(3), ["ACT", "CAT", "DOG", "GOD"])
+      assert_equal(dictionary.words_of_length(9), [])
+      letters = {"D": 1, "O": 1, "G": 1, "S": 1, "T": 0}
+      assert_equal(dictionary.feasible_words(3, letters), ["DOG", "GOD"])
+      assert_equal(dictionary.feasible_words(4, letters), [])
+      assert_equal(dictionary.feasible_words(2, letters), ["GO"])
+      letters["O"] = 2
+      assert_equal(dictionary.feasible_words(4, letters), ["GOOD"])
+
+  def test_compiled_rebuilt_when_source_changes(self):
+    assert_equal(list(Dictionary(self.source).words), ["BIRD", "CAT", "DOG"])
+    self.write_words("emu\n")
+    stat = os.stat(self.source)
+    os.utime(self.source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert_equal(list(Dictionary(self.source).words), ["EMU"])
+
+  def test_compiled_pickles(self):
+    dictionary = pickle.loads(pickle.dumps(Dictionary(self.source)))
+    assert dictionary.contains("bird")
+
+
+class TestCompositeDictionary:
+
+  def setup(self):
+    self.dir = tempfile.mkdtemp()
+    self.old_cache_dir = os.environ.get("WORDFINDER_CACHE_DIR")
+    os.environ["WORDFINDER_CACHE_DIR"] = os.path.join(self.dir, "cache")
+    self.scrabble = self.write_words("scrabble.txt", "dog\ncat\ngod\nact\n")
+    self.system = self.write_words("system.txt", "cat\ncow\ndogs\n")
+    self.banned = self.write_words("banned.txt", "god\n")
+
+  def teardown(self):
+    if self.old_cache_dir is None:
+      del os.environ["WORDFINDER_CACHE_DIR"]
+    else:
+      os.environ["WORDFINDER_CACHE_DIR"] = self.old_cache_dir
+    shutil.rmtree(self.dir)
+
+  def write_words(self, name, contents):
+    path = os.path.join(self.dir, name)
+    with open(path, "w") as f:
+      f.write(contents)
+    return path
+
+  def check(self, dictionary, expected):
+    assert_equal(dictionary.dictionary_words, set(expected))
+    for word in ["ACT", "CAT", "COW", "DOG", "DOGS", "GOD", "EMU"]:
+      assert_equal(dictionary.contains(word.lower()), word in expected)
+    assert_equal(
+      dictionary.words_of_length(3), sorted(w for w in expected if len(w) == 3)
+    )
+    letters = {"D": 1, "O": 1, "G": 1, "C": 1, "W": 1}
+    assert_equal(
+      dictionary.feasible_words(3, letters),
+      [w for w in ["COW", "DOG", "GOD"] if w in expected]
+    )
+    letters = {"A": 1, "C": 1, "D": 1, "G": 1, "O": 1, "T": 1}
+    for trie in [dictionary.trie(), dictionary.trie(3, letters)]:
+      for word in ["CAT", "DOG", "GOD"]:
+        node = trie.walk(word)
+        assert_equal(
+          node is not None and trie.is_word(node), word in expected
+        )
+    trie = dictionary.trie(3, letters, "G.D")
+    assert_equal(
+      trie.words if trie else [], [w for w in ["GOD"] if w in expected]
+    )
+    assert_equal(dictionary.trie(3, letters, "Z"), None)
+
+  def test_union(self):
+    for use_cache in (False, True):
+      dictionary = CompositeDictionary(
+        [self.scrabble, self.system], use_cache=use_cache
+      )
+      self.check(dictionary, {"ACT", "CAT", "COW", "DOG", "DOGS", "GOD"})
+
+  def test_intersection(self):
+    for use_cache in (False, True):
+      dictionary = CompositeDictionary(
+        [self.scrabble, self.system], intersect=True, use_cache=use_cache
+      )
+      self.check(dictionary, {"CAT"})
+
+  def test_exclusion(self):
+    for use_cache in (False, True):
+      dictionary = CompositeDictionary(
+        [self.scrabble, self.system], [self.banned], use_cache=use_cache
+      )
+      self.check(dictionary, {"ACT", "CAT", "COW", "DOG", "DOGS"})
+
+  def test_shared_storage(self):
+    dictionary = CompositeDictionary([self.scrabble, self.system])
+    assert isinstance(dictionary.words, packed.PackedWords)
+    # Each word is stored once, however many lists it is in
+    assert_equal(
+      list(dictionary.words), ["ACT", "CAT", "COW", "DOG", "DOGS", "GOD"]
+    )
+    assert_equal(list(dictionary.flags), [1, 3, 2, 1, 2, 1])
+    dictionary = pickle.loads(pickle.dumps(dictionary))
+    assert dictionary.contains("cow")
+
+  def test_rebuilt_when_source_changes(self):
+    dictionary = CompositeDictionary([self.scrabble], [self.banned])
+    assert not dictionary.contains("god")
+    self.write_words("banned.txt", "dog\n")
+    stat = os.stat(self.banned)
+    os.utime(self.banned, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    dictionary = CompositeDictionary([self.scrabble], [self.banned])
+    assert dictionary.contains("god")
+    assert not dictionary.contains("dog")
+
+  def test_merged_files_pruned(self):
+    old_max_merged = packed.MAX_MERGED
+    packed.MAX_MERGED = 2
+    try:
+      for paths in [[self.scrabble, self.system], [self.scrabble, self.banned],
+                    [self.system, self.banned]]:
+        dictionary = CompositeDictionary(paths)
+        assert isinstance(dictionary.words, packed.PackedWords)
+    finally:
+      packed.MAX_MERGED = old_max_merged
+    names = os.listdir(os.environ["WORDFINDER_CACHE_DIR"])
+    assert_equal(len([name for name in names if name.endswith(".wfm")]), 2)
+    assert dictionary.contains("cow")
+
+  def test_load_dictionary(self):
+    assert_equal(type(load_dictionary([self.scrabble])), Dictionary)
+    dictionary = load_dictionary([self.scrabble], [self.banned])
+    assert isinstance(dictionary, CompositeDictionary)
+    assert_equal(dictionary.dictionary_words, {"ACT", "CAT", "DOG"})
@@ -0,0 +1,102 @@
+from nose.tools import assert_equal
+import os
+import tempfile
+import wordfinder
+from wordfinder import LetterMatrix, Dictionary
+from wordfinder import solve
+from wordfinder.feasibility import LetterFeasibility, letter_counts
+
+WORDS = ["AB", "AC", "AD", "BD", "CD", "ABC", "BAD", "CAB"]
+
+class TestLetterFeasibility:
+
+  def setup(self):
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as f:
+      f.write("\n".join(WORDS) + "\n")
+    try:
+      self.dictionary = Dictionary(f.name, use_cache=False)
+    finally:
+      os.remove(f.name)
+
+  def test_letter_counts(self):
+    counts = letter_counts("abAz?")
+    assert_equal(len(counts), 26)
+    assert_equal((counts[0], counts[1], counts[25]), (2, 1, 1))
+    assert_equal(sum(counts), 4)
+    assert_equal(letter_counts(b"\x00BA"), letter_counts("AB"))
+
+  def test_solvable(self):
+    letters = LetterFeasibility({
+      2: [w for w in WORDS if len(w) == 2],
+      3: [w for w in WORDS if len(w) == 3],
+    })
+    assert letters.solvable(letter_counts("ABCD"), [2, 2])
+    assert letters.solvable(letter_counts("ABCDD"), [3, 2])
+    assert letters.solvable(letter_counts("ABCDDE"), [3, 2])
+    # AB and AC both fit, but leave BC or BB
+    assert not letters.solvable(letter_counts("ABBC"), [2, 2])
+    assert not letters.solvable(letter_counts("ABC"), [2, 2])
+    assert not letters.solvable(letter_counts("ABCD"), [4])
+    assert letters.leaves_solvable(letter_counts("ABCD"), "AB", [2])
+    assert not letters.leaves_solvable(letter_counts("ABCD"), "AD", [2])
+
+  def test_solutions_unchanged(self):
+    matrix = LetterMatrix([['A','B'], ['C', 'D']])
+    for word_lengths in [[2, 2], [3, 1], [1, 2, 1]]:
+      expected = sorted(
+        s for s in wordfinder.solve_word_game(matrix, word_lengths, None)
+        if all(w in WORDS or len(w) == 1 for w in s)
+      )
+      if 1 in word_lengths:
+        # Single letters aren't dictionary words
+        expected = []
+      for workers in [1, 2]:
+        assert_equal(
+          sorted(wordfinder.solve_word_game(
+            matrix, word_lengths, self.dictionary, workers=workers
+          )),
+          expected
+        )
+
+  def test_prunes_counted(self):
+    matrix = LetterMatrix([['A','B'], ['C', 'D']])
+    (solutions, stats) = wordfinder.solve_word_game_with_stats(
+      matrix, [2, 2], self.dictionary
+    )
+    assert_equal(sorted(solutions), [
+      ['AB', 'CD'], ['AC', 'BD'], ['BD', 'AC'], ['CD', 'AB']
+    ])
+    # AD leaves B and C, which make no word
+    assert_equal(stats.prunes["letters"], 1)
+
+  def test_unsolvable_board(self):
+    matrix = LetterMatrix([['A','C'], ['C', 'B']])
+    (solutions, stats) = wordfinder.solve_word_game_with_stats(
+      matrix, [2, 2], self.dictionary
+    )
+    assert_equal(solutions, [])
+    assert_equal(stats.paths, 0)
+
+  def test_single_word_builds_no_index(self):
+    # A single word can't be pruned by its leftover letters, so the
+    # index is never built for one
+    built = []
+
+    class Recording(LetterFeasibility):
+      def __init__(self, words_by_length):
+        built.append(words_by_length)
+        super().__init__(words_by_length)
+
+    matrix = LetterMatrix([['A','B'], ['C', 'D']])
+    original = solve.LetterFeasibility
+    solve.LetterFeasibility = Recording
+    try:
+      for workers in [1, 2]:
+        wordfinder.solve_word_game(
+          matrix, [2], self.dictionary, workers=workers
+        )
+      assert_equal(built, [])
+      wordfinder.solve_word_game(matrix, [2, 2], self.dictionary)
+      assert_equal(len(built), 1)
+    finally:
+      solve.LetterFeasibility = original
@@ -0,0 +1,97 @@
+from nose.tools import assert_equal
+from wordfinder import Dictionary, IncrementalSolver, LetterMatrix
+from wordfinder.board import Board
+from wordfinder.stats import SearchStats
+from wordfinder.trie import Trie
+from benchmarks.boards import random_board
+import os
+import random
+
+# The packaged word list, so results are the same on every host
+DICTIONARY_PATH = os.path.join(
+  os.path.dirname(__file__), "..", "dictionaries", "scrabble_2019.txt"
+)
+
+class TestIncrementalSolver:
+
+  def check_turns(self, matrix, length, prefix, dictionary, turns=6):
+    solver = IncrementalSolver(matrix, length, prefix, dictionary)
+    choices = random.Random(0)
+    for _ in range(turns):
+      expected = solver.matrix().find_word_coords(length, prefix, dictionary)
+      assert_equal(solver.word_coords(), sorted(expected))
+      assert_equal(len(solver), len(expected))
+      if not expected:
+        break
+      solver.remove_word(choices.choice(expected))
+
+  def test_matches_full_search_raw(self):
+    self.check_turns(random_board(5, 5, 1), 3, "", None)
+    self.check_turns(random_board(5, 5, 2), 2, "E", None)
+
+  def test_matches_full_search_with_dictionary(self):
+    dictionary = Dictionary(DICTIONARY_PATH, use_cache=False)
+    self.check_turns(random_board(6, 6, 1), 4, "", dictionary)
+
+  def test_words(self):
+    matrix = LetterMatrix([
+      ['C', 'A', 'T'],
+      ['D', 'O', 'G'],
+    ])
+    dictionary = Dictionary(DICTIONARY_PATH, use_cache=False)
+    solver = IncrementalSolver(matrix, 3, dictionary=dictionary)
+    assert "CAT" in solver.words()
+    changed = solver.remove_word([(0, 0), (0, 1), (0, 2)])
+    assert_equal(changed, {0, 1, 2, 3, 4, 5})
+    assert_equal(solver.words(), ["DOG", "GOD"])
+    assert_equal(solver.matrix().matrix, [['D', 'O', 'G'], ['', '', '']])
+
+  def test_unchanged_paths_are_not_searched_again(self):
+    matrix = random_board(8, 8, 0)
+    stats = SearchStats()
+    solver = IncrementalSolver(matrix, 3, stats=stats)
+    nodes = stats.nodes
+    # Removing the top-right letter only changes that cell
+    solver.remove_word([(7, 7)])
+    assert stats.nodes - nodes < nodes / 4
+    assert_equal(
+      solver.word_coords(),
+      sorted(solver.matrix().find_word_coords(3))
+    )
+
+  def test_collapse_is_not_searched_again(self):
+    dictionary = Dictionary(DICTIONARY_PATH, use_cache=False)
+    stats = SearchStats()
+    solver = IncrementalSolver(random_board(8, 8, 1), 3, "", dictionary, stats)
+    choices = random.Random(1)
+    (nodes, full_nodes) = (0, 0)
+    for _ in range(4):
+      coords = choices.choice(solver.word_coords())
+      before = stats.nodes
+      solver.remove_word(coords)
+      nodes += stats.nodes - before
+      full = SearchStats()
+      expected = solver.matrix().find_word_coords(3, "", dictionary, full)
+      full_nodes += full.nodes
+      assert_equal(solver.word_coords(), sorted(expected))
+    # Removing a word moves every letter above it down, but only paths
+    # across the edges of what moved are searched again
+    assert nodes < full_nodes / 2, (nodes, full_nodes)
+
+  def test_regions(self):
+    board = Board.from_matrix(random_board(4, 4, 0))
+    regions = [i % 4 < 2 for i in range(16)]
+    expected = [
+      path for path in board.iter_cell_paths(3)
+      if len({regions[i] for i in path}) > 1
+    ]
+    assert_equal(list(board.iter_cell_paths(3, regions=regions)), expected)
+    dictionary = Dictionary(DICTIONARY_PATH, use_cache=False)
+    trie = Trie(dictionary.words_of_length(3))
+    assert_equal(
+      list(board.iter_cell_paths(3, "", trie, regions=regions)),
+      [
+        path for path in board.iter_cell_paths(3, "", trie)
+        if len({regions[i] for i in path}) > 1
+      ]
+    )
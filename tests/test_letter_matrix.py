@@ -1,6 +1,8 @@
-from wordfinder import LetterMatrix, InvalidLetterMatrixException
+from wordfinder import LetterMatrix, InvalidLetterMatrixException, Dictionary
 from nose.tools import assert_raises, assert_equal
 import copy
+import os
+import tempfile
 
 class TestLetterMatrix():
 
@@ -60,6 +62,13 @@ class TestLetterMatrix():
     else:
       assert_raises(InvalidLetterMatrixException, LetterMatrix.validate, matrix)
 
+  def test_validation_message(self):
+    with assert_raises(InvalidLetterMatrixException) as context:
+      LetterMatrix([['A', 'B'], ['C', '9']])
+    assert "row 2, column 2" in str(context.exception)
+    # Validation can be skipped for matrices known to be valid
+    assert_equal(LetterMatrix([['9']], validate=False).matrix, [['9']])
+
   def test_element(self):
     assert_equal(self.fixture.element(1, 2), '')
     assert_equal(self.fixture.element(1, 3), 'G')
@@ -178,6 +187,43 @@ class TestLetterMatrix():
     assert_equal(row_matrix.find_words(3, 'A'), ['ABC', 'AHG', 'AIJ'])
     assert_equal(row_matrix.find_words(3, 'ai'), ['AIJ'])
 
+  def test_find_words_unique(self):
+    matrix = LetterMatrix([['A', 'B', 'A']])
+    assert_equal(matrix.find_words(2), ['AB', 'AB', 'BA', 'BA'])
+    assert_equal(matrix.find_words(2, unique=True), ['AB', 'BA'])
+
+  def test_iter_word_coords(self):
+    small_matrix = LetterMatrix([
+      ['A', 'B'],
+      ['' , 'C']
+    ])
+    coords = small_matrix.iter_word_coords(3, 'B')
+    assert_equal(next(coords), [(0, 1), (0, 0), (1, 1)])
+    assert_equal(list(coords), [[(0, 1), (1, 1), (0, 0)]])
+    assert_equal(list(small_matrix.iter_words(2, 'C')), ['CA', 'CB'])
+
+  def test_find_words_with_dictionary(self):
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as f:
+      f.write("ab\ncab\nBAC\nabcd\nzz\n")
+    try:
+      dictionary = Dictionary(f.name, use_cache=False)
+    finally:
+      os.remove(f.name)
+    small_matrix = LetterMatrix([
+      ['A', 'B'],
+      ['' , 'c']
+    ])
+    assert_equal(small_matrix.find_words(2, dictionary=dictionary), ['AB'])
+    assert_equal(
+      small_matrix.find_words(3, dictionary=dictionary), 
+      ['BAc', 'cAB']
+    )
+    assert_equal(
+      small_matrix.find_words(3, 'b', dictionary=dictionary), 
+      ['BAc']
+    )
+    assert_equal(small_matrix.find_words(4, dictionary=dictionary), [])
+
   def test_next_letter_above(self):
     assert_equal(self.fixture._next_letter_above(4, 4), None)
     assert_equal(self.fixture._next_letter_above(5, 1), None)
@@ -0,0 +1,72 @@
+from nose.tools import assert_equal, assert_raises
+from wordfinder import InvalidLetterMatrixException, LetterMatrix
+from wordfinder.board import Board
+from wordfinder.loader import load_board, load_matrix, parse_board
+import os
+import shutil
+import tempfile
+
+class TestLoader:
+
+  expected = Board(2, 3, b"CATD\0G")
+
+  def setup(self):
+    self.directory = tempfile.mkdtemp()
+
+  def teardown(self):
+    shutil.rmtree(self.directory)
+
+  def write(self, name, data):
+    path = os.path.join(self.directory, name)
+    with open(path, "wb") as f:
+      f.write(data)
+    return path
+
+  def test_formats(self):
+    cases = [
+      b"C,A,T\nD,,G\n",
+      b"C,A,T\r\nD,,G\r\n\r\n",
+      b'"C",A,T\nD,"",G',
+      b"\xef\xbb\xbfC,A,T\nD,,G\n",
+      b"CAT\nD.G\n",
+      b"C A T\n\nD . G",
+      b'[["C", "A", "T"], ["D", "", "G"]]',
+    ]
+    for data in cases:
+      yield self.check_board, data
+
+  def check_board(self, data):
+    assert_equal(parse_board(data), self.expected)
+
+  def test_load(self):
+    path = self.write("board.csv", b"C,A,T\nD,,G\n")
+    assert_equal(load_board(path), self.expected)
+    matrix = load_matrix(path)
+    assert isinstance(matrix, LetterMatrix)
+    assert_equal(matrix.matrix, [["C", "A", "T"], ["D", "", "G"]])
+
+  def test_errors(self):
+    cases = [
+      (b"C,A,T\nD,7,G\n", "'7' at row 2, column 2"),
+      (b"C,A,T\nD,AB,G\n", "'AB' at row 2, column 2"),
+      (b"C,A, T\n", "' T' at row 1, column 3"),
+      # As many letters as elements, but not one in each
+      (b"AB,,C\nX,Y,Z\n", "'AB' at row 1, column 1"),
+      (b"A,BC,\n", "'BC' at row 1, column 2"),
+      (b"CAT\nD.?\n", "'?' at row 2, column 3"),
+      (b'[["C", "A"], ["D", 5]]', "5 at row 2, column 2"),
+      (b'[["C", "A"], ["D", "\\u00e9"]]', "at row 2, column 2"),
+      (b"C,A,T\nD,G\n", "row 2 has 2 elements but row 1 has 3"),
+      (b'[["C", "A"]', "Invalid JSON"),
+      (b'["CA"]', "list of lists"),
+    ]
+    for (data, message) in cases:
+      yield self.check_error, data, message
+
+  def check_error(self, data, message):
+    with assert_raises(InvalidLetterMatrixException) as context:
+      parse_board(data)
+    assert message in str(context.exception), str(context.exception)
+
+  def test_empty(self):
+    assert_equal(parse_board(b""), Board(0, 0, b""))
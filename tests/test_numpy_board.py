@@ -0,0 +1,86 @@
+from unittest import SkipTest
+from nose.tools import assert_equal
+from wordfinder import Dictionary, LetterMatrix
+from wordfinder.board import Board
+from wordfinder.numpy_board import NumpyBoard, available, board_class
+from wordfinder.stats import SearchStats
+from wordfinder.trie import Trie
+from benchmarks.boards import random_board
+import copy
+import os
+
+# The packaged word list, so results are the same on every host
+DICTIONARY_PATH = os.path.join(
+  os.path.dirname(__file__), "..", "dictionaries", "scrabble_2019.txt"
+)
+
+class TestNumpyBoard:
+
+  letters = [
+    ['' , 'A', 'B', 'C', 'D'],
+    ['E', 'F', '' , 'G', '' ],
+    ['H', 'I', 'J', 'K', 'L'],
+    ['' , '' , '' , '' , '' ],
+    ['M', '' , 'N', '' , 'O'],
+    ['P', 'Q', 'R', 'S', '' ],
+  ]
+
+  def setup(self):
+    if not available():
+      raise SkipTest("NumPy is not installed.")
+    self.matrix = LetterMatrix(copy.deepcopy(self.letters))
+    self.board = Board.from_matrix(self.matrix)
+    self.numpy_board = NumpyBoard.from_matrix(self.matrix)
+
+  def test_equal_to_board(self):
+    assert_equal(self.numpy_board, self.board)
+    assert_equal(hash(self.numpy_board), hash(self.board))
+    assert_equal(self.numpy_board.to_matrix().matrix, self.letters)
+
+  def test_raw_paths_match_board(self):
+    for length in range(6):
+      for prefix in ["", "M", "mq", "IFA", ".F", "i.a"]:
+        assert_equal(
+          sorted(self.numpy_board.iter_cell_paths(length, prefix)),
+          sorted(self.board.iter_cell_paths(length, prefix))
+        )
+
+  def test_dictionary_paths_match_board(self):
+    trie = Trie(["FIJ", "FIJK", "IJK", "KJIH", "MPQ", "NRS", "ZZZ"])
+    for length in range(1, 5):
+      for prefix in ["", "F", "KJ", ".J", "F.J"]:
+        assert_equal(
+          sorted(self.numpy_board.iter_cell_paths(length, prefix, trie)),
+          sorted(self.board.iter_cell_paths(length, prefix, trie))
+        )
+
+  def test_random_boards_match_board(self):
+    dictionary = Dictionary(DICTIONARY_PATH, use_cache=False)
+    for seed in range(3):
+      matrix = random_board(5, 5, seed)
+      board = Board.from_matrix(matrix)
+      numpy_board = NumpyBoard.from_matrix(matrix)
+      for length in [3, 5]:
+        assert_equal(
+          sorted(numpy_board.iter_word_coords(length, dictionary=dictionary)),
+          sorted(board.iter_word_coords(length, dictionary=dictionary))
+        )
+
+  def test_stats(self):
+    stats = SearchStats()
+    paths = list(self.numpy_board.iter_cell_paths(3, "F", None, stats))
+    assert_equal(stats.paths, len(paths))
+    assert_equal(stats.max_path_depth, 3)
+    assert stats.prunes["prefix"] > 0
+
+  def test_remove_word(self):
+    coords = [(0, 1), (1, 1), (2, 2)]
+    reduced = self.numpy_board.remove_word(coords)
+    assert_equal(reduced, self.board.remove_word(coords))
+    assert isinstance(reduced, NumpyBoard)
+
+  def test_board_class(self):
+    assert_equal(board_class("python"), Board)
+    assert_equal(board_class("numpy"), NumpyBoard)
+    assert_equal(board_class("auto", 25), NumpyBoard)
+    assert_equal(board_class("auto", 100), Board)
@@ -0,0 +1,65 @@
+from nose.tools import assert_equal
+from wordfinder import LetterMatrix, count_raw_solutions, solve_word_game
+from wordfinder.board import Board
+from wordfinder.paths import count_paths, iter_paths, neighbor_masks
+from wordfinder.stats import SearchStats
+import copy
+
+class TestPaths:
+
+  letters = [
+    ['' , 'A', 'B', 'C', 'D'],
+    ['E', 'F', '' , 'G', '' ],
+    ['H', 'I', 'J', 'K', 'L'],
+    ['' , '' , '' , '' , '' ],
+    ['M', '' , 'N', '' , 'O'],
+    ['P', 'Q', 'R', 'S', '' ],
+  ]
+
+  def setup(self):
+    self.matrix = LetterMatrix(copy.deepcopy(self.letters))
+    self.board = Board.from_matrix(self.matrix)
+
+  def paths(self, length, prefix=""):
+    return iter_paths(
+      self.board.rows, self.board.columns, self.board.cells, length, prefix
+    )
+
+  def test_neighbor_masks(self):
+    masks = neighbor_masks(2, 3)
+    assert_equal(masks[0], 0b11010)
+    assert_equal(masks[4], 0b101111)
+
+  def test_paths_match_letter_matrix(self):
+    for length in range(6):
+      for prefix in ["", "M", "mq", "IFA", ".F", "i.a"]:
+        expected = sorted(
+          tuple(self.board.index(r, c) for (r, c) in coords)
+          for coords in self.matrix.find_word_coords(length, prefix)
+        )
+        assert_equal(sorted(self.paths(length, prefix)), expected)
+        assert_equal(
+          count_paths(
+            self.board.rows, self.board.columns, self.board.cells,
+            length, prefix
+          ),
+          len(expected)
+        )
+
+  def test_stats(self):
+    stats = SearchStats()
+    paths = list(iter_paths(
+      self.board.rows, self.board.columns, self.board.cells, 3, "F", stats
+    ))
+    assert_equal(stats.paths, len(paths))
+    assert_equal(stats.max_path_depth, 3)
+    assert stats.prunes["prefix"] > 0
+
+  def test_count_raw_solutions(self):
+    for word_lengths in [[1], [3], [2, 2], [3, 1, 2]]:
+      assert_equal(
+        count_raw_solutions(self.matrix, word_lengths),
+        len(solve_word_game(self.matrix, word_lengths, None))
+      )
+    assert_equal(count_raw_solutions(self.matrix, [2], "F"), 6)
+    assert_equal(count_raw_solutions(self.matrix, [10, 10]), 0)
@@ -0,0 +1,132 @@
+from nose.tools import assert_equal
+import os
+import shutil
+import tempfile
+import wordfinder
+from wordfinder import Dictionary, LetterMatrix, ResultCache, SearchBudget
+from wordfinder.board import Board
+from benchmarks.boards import random_board
+
+class TestResultCache:
+
+  def setup(self):
+    self.dir = tempfile.mkdtemp()
+    self.cache_dir = os.path.join(self.dir, "results")
+    self.matrix = random_board(4, 4, seed=2)
+
+  def teardown(self):
+    shutil.rmtree(self.dir)
+
+  def test_key(self):
+    key = ResultCache.key("words", self.matrix, [3], "ab")
+    assert_equal(key, ResultCache.key(
+      "words", Board.from_matrix(self.matrix), [3], "AB"
+    ))
+    assert key != ResultCache.key("solutions", self.matrix, [3], "ab")
+    assert key != ResultCache.key("words", self.matrix, [4], "ab")
+    assert key != ResultCache.key("words", self.matrix, [3], "ab", unique=True)
+    other = random_board(4, 4, seed=3)
+    assert key != ResultCache.key("words", other, [3], "ab")
+
+  def test_dictionary_identity(self):
+    paths = []
+    for (name, words) in [("a.txt", "cat\n"), ("b.txt", "dog\n")]:
+      paths.append(os.path.join(self.dir, name))
+      with open(paths[-1], "w") as f:
+        f.write(words)
+    keys = {
+      ResultCache.key("words", self.matrix, [3], "", Dictionary(path, False))
+      for path in paths
+    }
+    keys.add(ResultCache.key("words", self.matrix, [3]))
+    assert_equal(len(keys), 3)
+
+  def test_memory(self):
+    cache = ResultCache()
+    expected = sorted(wordfinder.solve_word_game(self.matrix, [2, 2], None))
+    assert_equal(cache.solve_word_game(self.matrix, [2, 2], None), expected)
+    assert_equal(cache.solve_word_game(self.matrix, [2, 2], None), expected)
+    assert_equal((cache.memory_hits, cache.misses), (1, 1))
+    assert_equal(cache.hit_rate(), 0.5)
+    assert cache.memory_bytes > 0
+    assert_equal(cache.disk_bytes(), 0)
+
+  def test_find_words(self):
+    cache = ResultCache()
+    for _ in range(2):
+      assert_equal(
+        cache.find_words(self.matrix, 3, "s", unique=True),
+        self.matrix.find_words(3, "s", unique=True)
+      )
+    assert_equal(cache.hits, 1)
+
+  def test_disk(self):
+    cache = ResultCache(self.cache_dir)
+    words = cache.find_words(self.matrix, 3)
+    cache = ResultCache(self.cache_dir)
+    assert_equal(cache.find_words(self.matrix, 3), words)
+    assert_equal((cache.disk_hits, cache.misses), (1, 0))
+    assert_equal(cache.find_words(self.matrix, 3), words)
+    assert_equal(cache.memory_hits, 1)
+    assert cache.disk_bytes() > 0
+    cache.clear()
+    assert_equal((len(cache), cache.disk_bytes()), (0, 0))
+
+  def test_memory_eviction(self):
+    cache = ResultCache(maxsize=2)
+    for length in (1, 2, 3):
+      cache.find_words(self.matrix, length)
+    assert_equal(len(cache), 2)
+    cache.find_words(self.matrix, 1)
+    assert_equal(cache.misses, 4)
+
+  def test_disk_eviction(self):
+    cache = ResultCache(self.cache_dir, maxsize=0, max_bytes=30)
+    # Keys are hex digests
+    (a, b, c, d) = (letter * 64 for letter in "abcd")
+    for (n, key) in enumerate([a, b, c], start=1):
+      cache.put(key, [key[0] * 10])
+      # Make the order of use clear, whatever the clock's resolution
+      path = os.path.join(self.cache_dir, key + ".json")
+      os.utime(path, ns=(n * 10**9, n * 10**9))
+      assert cache.disk_bytes() <= 30
+    assert_equal(cache.get(a), None)
+    assert_equal(cache.get(c), ["c" * 10])
+    # Results bigger than the whole cache are not stored at all
+    cache.put(d, ["d" * 40])
+    assert_equal(cache.get(d), None)
+    assert_equal(cache.get(c), ["c" * 10])
+
+  def test_other_files_kept(self):
+    os.makedirs(self.cache_dir)
+    other = os.path.join(self.cache_dir, "notes.json")
+    with open(other, "w") as f:
+      f.write("[" + "1," * 200 + "1]")
+    # Room for one of the two results, but not both
+    cache = ResultCache(self.cache_dir, maxsize=0, max_bytes=450)
+    cache.find_words(self.matrix, 1)
+    cache.find_words(self.matrix, 2)
+    assert_equal(len(os.listdir(self.cache_dir)), 2)
+    assert 0 < cache.disk_bytes() <= 450
+    cache.clear()
+    assert_equal(os.listdir(self.cache_dir), ["notes.json"])
+
+  def test_failed_write_leaves_no_file(self):
+    cache = ResultCache(self.cache_dir)
+    replace = os.replace
+
+    def fail(*args):
+      raise OSError("No space left on device")
+    os.replace = fail
+    try:
+      cache.put("a" * 64, ["AB"])
+    finally:
+      os.replace = replace
+    assert_equal(os.listdir(self.cache_dir), [])
+
+  def test_incomplete_not_cached(self):
+    cache = ResultCache()
+    budget = SearchBudget(max_nodes=100)
+    cache.solve_word_game(self.matrix, [3, 3], None, budget=budget)
+    assert budget.exhausted
+    assert_equal(len(cache), 0)
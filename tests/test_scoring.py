@@ -0,0 +1,85 @@
+from nose.tools import assert_equal, assert_raises
+from wordfinder import Dictionary, LetterMatrix, solve_word_game
+from wordfinder.__main__ import main
+from wordfinder.board import Board
+from wordfinder.scoring import SCORERS, Scorer, best_solutions
+from wordfinder.stats import SearchStats
+from benchmarks.boards import random_board
+from contextlib import redirect_stdout
+import io
+import os
+import tempfile
+
+# The packaged word list, so results are the same on every host
+DICTIONARY_PATH = os.path.join(
+  os.path.dirname(__file__), "..", "dictionaries", "scrabble_2019.txt"
+)
+
+class TestScoring:
+
+  def test_score(self):
+    scrabble = SCORERS["scrabble"]
+    assert_equal(scrabble.score("QUIZ"), 22)
+    assert_equal(scrabble.score("quiz"), 22)
+    length = SCORERS["length"]
+    assert_equal(length.score("CAT"), 1)
+    assert_equal(length.score("ABCDEFGHIJ"), 11)
+    assert_equal(Scorer({"A": 2}, {1: 5}).score("AB"), 7)
+    assert_equal(Scorer({"A": 2}, {2: 5}).score("A"), 2)
+
+  def test_upper_bound(self):
+    board = LetterMatrix([['Q', 'A'], ['Z', '']])
+    scrabble = SCORERS["scrabble"]
+    assert_equal(scrabble.upper_bound(Board.from_matrix(board), [2]), 20)
+    assert_equal(scrabble.upper_bound(Board.from_matrix(board), [2, 2]), 21)
+
+  def check_matches_full_solve(self, matrix, word_lengths, dictionary, k):
+    scorer = SCORERS["scrabble"]
+    best = best_solutions(matrix, word_lengths, dictionary, k, scorer)
+    solutions = set(
+      tuple(s) for s in solve_word_game(matrix, word_lengths, dictionary)
+    )
+    expected = sorted(
+      (sum(scorer.score(w) for w in s) for s in solutions), reverse=True
+    )[:k]
+    assert_equal([score for (score, _) in best], expected)
+    for (score, solution) in best:
+      assert tuple(solution) in solutions
+      assert_equal(score, sum(scorer.score(w) for w in solution))
+    assert_equal(len(set(tuple(s) for (_, s) in best)), len(best))
+
+  def test_matches_full_solve(self):
+    dictionary = Dictionary(DICTIONARY_PATH, use_cache=False)
+    cases = [
+      (random_board(4, 4, 1), [3, 3], dictionary, 5),
+      (random_board(4, 4, 2), [4, 3], dictionary, 1),
+      (random_board(4, 4, 3), [3], dictionary, 1000),
+      (random_board(3, 3, 4), [2, 2], None, 7),
+    ]
+    for (matrix, word_lengths, dictionary, k) in cases:
+      yield self.check_matches_full_solve, matrix, word_lengths, dictionary, k
+
+  def test_prunes_by_bound(self):
+    stats = SearchStats()
+    best_solutions(random_board(4, 4, 1), [3, 3, 3], None, 1, stats=stats)
+    assert stats.prunes["bound"] > 0
+
+  def test_prefix_and_no_solutions(self):
+    matrix = LetterMatrix([['C', 'A', 'T'], ['D', 'O', 'G']])
+    dictionary = Dictionary(DICTIONARY_PATH, use_cache=False)
+    best = best_solutions(matrix, [3], dictionary, 10, prefix="D")
+    assert_equal(sorted(s[0] for (_, s) in best), ["DAG", "DOC", "DOG", "DOT"])
+    assert_equal(best_solutions(matrix, [4, 4], dictionary, 10), [])
+    assert_equal(best_solutions(matrix, [3], dictionary, 0), [])
+
+  def test_top_option_conflicts(self):
+    with tempfile.TemporaryDirectory() as directory:
+      board = os.path.join(directory, "board.txt")
+      with open(board, "w") as f:
+        f.write("AB\n")
+      args = [board, "2", "--raw_results", "--top", "1"]
+      for extra in [["--limit", "1"], ["--jobs", "2"], ["--stream"]]:
+        out = io.StringIO()
+        with redirect_stdout(out):
+          assert_raises(SystemExit, main, args + extra)
+        assert "Top can't be used" in out.getvalue()
@@ -0,0 +1,158 @@
+from nose.tools import assert_equal
+from wordfinder.result_cache import ResultCache
+from wordfinder.server import SolverServer
+from benchmarks.boards import random_letters
+from wordfinder import batch
+import asyncio
+import json
+import tempfile
+
+class TestSolverServer:
+
+  async def request(self, port, method, path, body=None, length=None):
+    (reader, writer) = await asyncio.open_connection("127.0.0.1", port)
+    data = json.dumps(body).encode("utf-8") if body is not None else b""
+    if length is None:
+      length = len(data)
+    writer.write(
+      "{} {} HTTP/1.1\r\nContent-Length: {}\r\nConnection: close\r\n\r\n"
+      .format(method, path, length).encode("latin-1") + data
+    )
+    response = await reader.read()
+    writer.close()
+    (head, _, body) = response.partition(b"\r\n\r\n")
+    return (int(head.split()[1]), json.loads(body))
+
+  def run(self, *requests, timeout=10.0, result_cache=None, workers=0):
+    async def go():
+      server = SolverServer(
+        None, workers=workers, timeout=timeout, result_cache=result_cache
+      )
+      listener = await server.start(port=0)
+      port = listener.sockets[0].getsockname()[1]
+      try:
+        return [await self.request(port, *r) for r in requests]
+      finally:
+        listener.close()
+        server.close()
+    return asyncio.run(go())
+
+  def test_solve(self):
+    responses = self.run(
+      ("POST", "/solve", {"board": [["A", "B"]], "word_lengths": [2]}),
+      ("POST", "/solve", {"board": [["A", "9"]], "word_lengths": [2]}),
+      ("GET", "/health"),
+      ("GET", "/solve"),
+      ("GET", "/nowhere"),
+    )
+    assert_equal(responses[0], (200, {
+      "id": None, "solutions": [["AB"], ["BA"]], "error": None,
+      "completed": True
+    }))
+    assert_equal(responses[1][0], 400)
+    assert_equal(responses[2], (200, {"status": "ok"}))
+    assert_equal(responses[3][0], 405)
+    assert_equal(responses[4][0], 404)
+
+  def test_bad_requests(self):
+    board = {"board": [["A", "B"]], "word_lengths": [2]}
+    responses = self.run(
+      ("POST", "/solve", board, "abc"),
+      ("POST", "/solve", dict(board, limit="5")),
+      ("POST", "/solve", dict(board, limit=-1)),
+      result_cache=ResultCache()
+    )
+    assert_equal(responses[0], (400, {"error": "Invalid Content-Length."}))
+    for (status, response) in responses[1:]:
+      assert_equal(status, 400)
+      assert response["error"].startswith("Limit must be")
+
+  def test_limit_on_cache_hit(self):
+    job = {"board": [["A", "B"]], "word_lengths": [2]}
+    responses = self.run(
+      ("POST", "/solve", job),
+      ("POST", "/solve", dict(job, limit="1")),
+      ("POST", "/solve", dict(job, limit=1)),
+      result_cache=ResultCache()
+    )
+    assert_equal([status for (status, _) in responses], [200, 400, 200])
+    assert_equal(responses[2][1]["solutions"], [["AB"]])
+
+  def test_paths_are_refused(self):
+    with tempfile.NamedTemporaryFile("w", suffix=".csv") as f:
+      f.write("SECRET,9\n")
+      f.flush()
+      opened = []
+      original = batch.load_board
+      batch.load_board = lambda path: opened.append(path)
+      try:
+        responses = self.run(
+          ("POST", "/solve", {"path": f.name, "word_lengths": [2]}),
+          ("POST", "/solve", {
+            "board": [["A", "B"]], "path": f.name, "word_lengths": [2]
+          }),
+        )
+      finally:
+        batch.load_board = original
+    for (status, response) in responses:
+      assert_equal(status, 400)
+      assert "path" in response["error"]
+      assert "SECRET" not in response["error"]
+    assert_equal(opened, [])
+
+  def test_timeout(self):
+    # Far more raw paths than can be found in the time allowed
+    board = random_letters(5, 5, 0)
+    for workers in [0, 1]:
+      responses = self.run(
+        ("POST", "/solve", {"board": board, "word_lengths": [9]}),
+        ("POST", "/solve", {"board": [["A", "B"]], "word_lengths": [2]}),
+        timeout=0.5, workers=workers
+      )
+      (status, response) = responses[0]
+      assert_equal(status, 504)
+      assert response["error"].startswith("Timed out")
+      assert_equal(response["completed"], False)
+      # The search stopped itself, returning the solutions it had, rather
+      # than the server giving up on it
+      assert response["solutions"] is not None
+      # The slow board's search stopped, so the worker is free for the
+      # next request
+      assert_equal(responses[1], (200, {
+        "id": None, "solutions": [["AB"], ["BA"]], "error": None,
+        "completed": True
+      }))
+
+  def test_result_cache(self):
+    cache = ResultCache()
+    job = {"board": [["A", "B"], ["C", ""]], "word_lengths": [2]}
+    responses = self.run(
+      ("POST", "/solve", dict(job, id=1, limit=1)),
+      ("POST", "/solve", dict(job, id=2)),
+      ("POST", "/solve", {"board": [["A", "9"]], "word_lengths": [2]}),
+      result_cache=cache
+    )
+    assert_equal(responses[0], (200, {
+      "id": 1, "solutions": [["AB"]], "error": None, "completed": True
+    }))
+    assert_equal(responses[1], (200, {
+      "id": 2,
+      "solutions": [["AB"], ["AC"], ["BA"], ["BC"], ["CA"], ["CB"]],
+      "error": None, "completed": True
+    }))
+    assert_equal(responses[2][0], 400)
+    assert_equal((cache.hits, cache.misses), (1, 1))
+
+  def test_constraints(self):
+    cache = ResultCache()
+    job = {"board": [["A", "B"], ["C", ""]], "word_lengths": [1, 2]}
+    responses = self.run(
+      ("POST", "/solve", dict(job, suffix=",B")),
+      ("POST", "/solve", dict(job, prefix="C", suffix=",B")),
+      ("POST", "/solve", dict(job, suffix=",B")),
+      result_cache=cache
+    )
+    assert_equal(responses[0][1]["solutions"], [["A", "CB"], ["C", "AB"]])
+    assert_equal(responses[1][1]["solutions"], [["C", "AB"]])
+    assert_equal(responses[2], responses[0])
+    assert_equal((cache.hits, cache.misses), (1, 2))
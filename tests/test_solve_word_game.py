@@ -1,6 +1,9 @@
 from nose.tools import assert_equal
+import os
+import tempfile
 import wordfinder
-from wordfinder import LetterMatrix
+from wordfinder import LetterMatrix, SolveCache, Dictionary
+from benchmarks.boards import random_board
 
 class TestSolveWordGame:
 
@@ -74,4 +77,130 @@ class TestSolveWordGame:
         ['D', 'CB'],
       ], 
       sorted(wordfinder.solve_word_game(matrix, [1, 2], None))
-    )
\ No newline at end of file
+    )
+
+  def test_iter_is_lazy(self):
+    matrix = LetterMatrix([['A','B','C']])
+    solutions = wordfinder.iter_solve_word_game(matrix, [1, 2], None)
+    assert_equal(['A', 'BC'], next(solutions))
+    assert_equal(
+      sorted(wordfinder.solve_word_game(matrix, [1, 2], None)),
+      sorted([['A', 'BC']] + list(solutions))
+    )
+
+  def test_cache(self):
+    matrix = LetterMatrix([['A','B','C'], ['D', 'E', 'F']])
+    cache = SolveCache()
+    solutions = wordfinder.solve_word_game(matrix, [1, 1, 2], None, cache)
+    uncached = wordfinder.solve_word_game(
+      matrix, [1, 1, 2], None, SolveCache(0)
+    )
+    assert_equal(sorted(solutions), sorted(uncached))
+    # Removing A then B leaves the same board as removing B then A
+    assert cache.hits > 0
+    assert_equal(cache.misses, len(cache))
+
+  def test_cache_eviction(self):
+    cache = SolveCache(2)
+    cache.put('a', [1])
+    cache.put('b', [2])
+    assert_equal(cache.get('a'), [1])
+    cache.put('c', [3])
+    assert_equal(cache.get('b'), None)
+    assert_equal(cache.get('a'), [1])
+    assert_equal((cache.hits, cache.misses), (2, 1))
+
+  def test_cache_bounded_by_solutions(self):
+    cache = SolveCache(max_solutions=3)
+    cache.put('a', [1, 2])
+    cache.put('b', [3])
+    assert_equal(cache.solutions, 3)
+    cache.put('c', [4, 5])
+    assert_equal(cache.get('a'), None)
+    assert_equal(cache.get('b'), [3])
+    # Too many solutions to hold at all
+    cache.put('d', [6, 7, 8, 9])
+    assert_equal(cache.get('d'), None)
+    assert_equal((len(cache), cache.solutions), (2, 3))
+
+  def test_streaming_keeps_cache_bounded(self):
+    matrix = random_board(3, 3, 0)
+    cache = SolveCache(max_solutions=100)
+    solutions = list(wordfinder.iter_solve_word_game(
+      matrix, [2, 2, 2], None, cache
+    ))
+    assert_equal(
+      solutions, wordfinder.solve_word_game(matrix, [2, 2, 2], None)
+    )
+    assert len(solutions) > 100
+    assert 0 < cache.solutions <= 100
+
+  def test_parallel_matches_serial(self):
+    matrix = LetterMatrix([['A','B','C'], ['D', 'E', 'F']])
+    assert_equal(
+      wordfinder.solve_word_game(matrix, [2, 2, 1], None),
+      wordfinder.solve_word_game(matrix, [2, 2, 1], None, workers=3)
+    )
+
+  def test_dictionary(self):
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as f:
+      f.write("ab\ncd\nabc\nbad\n")
+    try:
+      dictionary = Dictionary(f.name, use_cache=False)
+    finally:
+      os.remove(f.name)
+    matrix = LetterMatrix([['A','B'],['C', 'D']])
+    assert_equal(
+      [['AB', 'CD'], ['CD', 'AB']],
+      sorted(wordfinder.solve_word_game(matrix, [2, 2], dictionary))
+    )
+    assert_equal(
+      [['ABC'], ['BAD']],
+      sorted(wordfinder.solve_word_game(matrix, [3], dictionary))
+    )
+    # No dictionary words of these lengths, or not enough letters
+    assert_equal([], wordfinder.solve_word_game(matrix, [1, 3], dictionary))
+    assert_equal([], wordfinder.solve_word_game(matrix, [3, 2], None))
+
+  def test_stats(self):
+    matrix = LetterMatrix([['A','B','C']])
+    (solutions, stats) = wordfinder.solve_word_game_with_stats(
+      matrix, [1, 2], None
+    )
+    assert_equal(len(solutions), 4)
+    assert_equal(stats.max_solve_depth, 2)
+    assert_equal(stats.max_path_depth, 2)
+    # 3 single letters, then two-letter paths on each reduced board.
+    # Removing B leaves A and C apart, so no paths remain.
+    assert_equal(stats.paths, 3 + 2 + 0 + 2)
+    assert "search" in stats.timings
+    assert_equal(stats.to_dict()["paths"], stats.paths)
+
+  def test_unique(self):
+    # Repeated letters make the same words from different cells
+    matrix = LetterMatrix([['A','B','A'], ['B', 'A', 'B']])
+    for word_lengths in [[2], [2, 2], [1, 2, 3], [3, 1]]:
+      solutions = wordfinder.solve_word_game(matrix, word_lengths, None)
+      assert len(set(map(tuple, solutions))) < len(solutions)
+      unique = wordfinder.solve_word_game(
+        matrix, word_lengths, None, unique=True
+      )
+      assert_equal(
+        sorted(map(tuple, unique)), sorted(set(map(tuple, solutions)))
+      )
+      assert_equal(
+        unique,
+        wordfinder.solve_word_game(
+          matrix, word_lengths, None, workers=2, unique=True
+        )
+      )
+
+  def test_unique_skips_repeated_boards(self):
+    matrix = LetterMatrix([['A','A'], ['A', 'B']])
+    (solutions, stats) = wordfinder.solve_word_game_with_stats(
+      matrix, [1, 3], None, unique=True
+    )
+    assert_equal(sorted(solutions), [['A', 'AAB'], ['A', 'ABA'], ['A', 'BAA'],
+                                     ['B', 'AAA']])
+    # Removing either A from the top row leaves the same board
+    assert_equal(stats.prunes["duplicate"], 1)
@@ -0,0 +1,95 @@
+from nose.tools import assert_equal, assert_raises
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import wordfinder
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Generous limits, several times what a typical machine takes, so only a
+# real regression such as an eager import of NumPy fails them
+IMPORT_BUDGET_MS = 150
+FIRST_OUTPUT_BUDGET = 2.0
+
+# Modules only some options need, which must not be imported otherwise
+DEFERRED = [
+  "numpy", "concurrent.futures", "multiprocessing", "csv", "tempfile",
+  "wordfinder.numpy_board", "wordfinder.result_cache",
+]
+
+def imports(result):
+  """Return {module: self microseconds} from `-X importtime` output."""
+  modules = {}
+  for line in result.stderr.splitlines():
+    fields = line.split("|")
+    if len(fields) == 3 and fields[0].strip().split()[-1].isdigit():
+      modules[fields[2].strip()] = int(fields[0].split()[-1])
+  return modules
+
+class TestStartup:
+
+  def setup(self):
+    self.dir = tempfile.mkdtemp()
+    self.board = os.path.join(self.dir, "board.txt")
+    with open(self.board, "w") as f:
+      f.write("CAT\nDOG\n")
+
+  def teardown(self):
+    shutil.rmtree(self.dir)
+
+  def python(self, *args):
+    """
+    Return the CompletedProcess for python run from the repository, with
+    compiled dictionaries kept in the test's directory.
+    """
+    env = dict(
+      os.environ, PYTHONPATH=ROOT,
+      WORDFINDER_CACHE_DIR=os.path.join(self.dir, "cache")
+    )
+    return subprocess.run(
+      [sys.executable] + list(args), stdout=subprocess.PIPE,
+      stderr=subprocess.PIPE, text=True, cwd=ROOT, env=env
+    )
+
+  def test_import_is_lazy(self):
+    result = self.python(
+      "-c", "import sys, wordfinder; print('\\n'.join(sys.modules))"
+    )
+    modules = result.stdout.split()
+    assert "wordfinder" in modules
+    for name in DEFERRED + ["wordfinder.solve", "wordfinder.dictionary"]:
+      assert name not in modules, name
+
+  def test_lazy_attributes(self):
+    from wordfinder.solve import solve_word_game
+    assert wordfinder.solve_word_game is solve_word_game
+    for name in wordfinder.__all__:
+      assert getattr(wordfinder, name) is not None
+      assert name in dir(wordfinder)
+    assert_raises(AttributeError, getattr, wordfinder, "not_a_name")
+
+  def test_cli_imports(self):
+    result = self.python(
+      "-X", "importtime", "-m", "wordfinder", self.board, "3",
+      "--raw_results"
+    )
+    assert_equal(result.returncode, 0)
+    assert "CAT" in result.stdout
+    modules = imports(result)
+    for name in DEFERRED:
+      assert name not in modules, name
+    total_ms = sum(modules.values()) / 1e3
+    assert total_ms < IMPORT_BUDGET_MS, total_ms
+
+  def test_time_to_first_output(self):
+    # The first run may build the dictionary's compiled cache
+    self.python("-m", "wordfinder", self.board, "3")
+    start = time.perf_counter()
+    result = self.python("-m", "wordfinder", self.board, "3")
+    elapsed = time.perf_counter() - start
+    assert_equal(result.returncode, 0)
+    assert "CAT" in result.stdout
+    assert elapsed < FIRST_OUTPUT_BUDGET, elapsed
@@ -0,0 +1,54 @@
+from nose.tools import assert_equal
+from contextlib import redirect_stderr, redirect_stdout
+import io
+import json
+import os
+import tempfile
+from wordfinder import SearchStats
+from wordfinder.__main__ import main
+
+class TestSearchStats:
+
+  def test_merge(self):
+    a = SearchStats()
+    a.nodes = 3
+    a.max_path_depth = 4
+    a.prunes["prefix"] += 2
+    b = SearchStats()
+    b.nodes = 5
+    b.max_path_depth = 2
+    b.prunes["prefix"] += 1
+    b.prunes["dictionary"] += 1
+    with b.phase("search"):
+      pass
+    a.merge(b)
+    assert_equal(a.nodes, 8)
+    assert_equal(a.max_path_depth, 4)
+    assert_equal(a.prunes, {"prefix": 3, "dictionary": 1})
+    assert "search" in a.timings
+
+  def test_timed(self):
+    stats = SearchStats()
+    assert_equal(list(stats.timed(iter([1, 2]), "work")), [1, 2])
+    assert stats.timings["work"] >= 0
+
+  def test_profile_option(self):
+    with tempfile.TemporaryDirectory() as directory:
+      board = os.path.join(directory, "board.txt")
+      with open(board, "w") as f:
+        f.write("AB\n")
+      path = os.path.join(directory, "profile.json")
+      for (args, written) in [
+        (["--profile", board, "2"], None),
+        ([board, "2", "--profile_path", path], path),
+      ]:
+        (out, err) = (io.StringIO(), io.StringIO())
+        with redirect_stdout(out), redirect_stderr(err):
+          main(args + ["--raw_results"])
+        assert "AB" in out.getvalue()
+        if written is None:
+          profile = json.loads(err.getvalue())
+        else:
+          with open(written) as f:
+            profile = json.load(f)
+        assert_equal(profile["paths"], 2)
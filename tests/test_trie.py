@@ -0,0 +1,28 @@
+from nose.tools import assert_equal
+from wordfinder.trie import Trie
+
+class TestTrie:
+
+  trie = Trie(sorted(['A', 'AB', 'ABC', 'ABD', 'B', 'BAD', 'CAB']))
+
+  def test_root(self):
+    assert_equal(self.trie.root(), (0, 7, 0))
+    assert not self.trie.is_word(self.trie.root())
+
+  def test_child(self):
+    node = self.trie.child(self.trie.root(), 'A')
+    assert_equal(node, (0, 4, 1))
+    assert self.trie.is_word(node)
+    assert_equal(self.trie.child(node, 'C'), None)
+    assert_equal(self.trie.child(self.trie.root(), 'Z'), None)
+
+  def test_walk(self):
+    assert self.trie.is_word(self.trie.walk('abd'))
+    assert not self.trie.is_word(self.trie.walk('BA'))
+    assert_equal(self.trie.walk('BAT'), None)
+    assert_equal(self.trie.walk('ABCD'), None)
+
+  def test_empty(self):
+    trie = Trie([])
+    assert_equal(trie.child(trie.root(), 'A'), None)
+    assert not trie.is_word(trie.root())
@@ -1,3 +1,48 @@
-from wordfinder.letter_matrix import LetterMatrix, InvalidLetterMatrixException
-from wordfinder.dictionary import Dictionary
-from wordfinder.solve import solve_word_game
\ No newline at end of file
+"""
+Find words in a grid of letters, and solve word games in which each
+word found is removed from the grid.
+
+The names below are imported from their modules the first time they are
+used, rather than all at once with the package, so that scripts and the
+command line only pay for the parts they use.
+"""
+import importlib
+
+# The module each public name is defined in
+_EXPORTS = {
+  "LetterMatrix": "letter_matrix",
+  "InvalidLetterMatrixException": "letter_matrix",
+  "Dictionary": "dictionary",
+  "CompositeDictionary": "dictionary",
+  "CellPath": "cell_path",
+  "CellPathList": "cell_path",
+  "WordConstraint": "constraints",
+  "solve_word_game": "solve",
+  "iter_solve_word_game": "solve",
+  "solve_word_game_with_stats": "solve",
+  "solve_word_game_within": "solve",
+  "count_raw_solutions": "solve",
+  "SolveCache": "solve",
+  "SearchStats": "stats",
+  "SearchBudget": "budget",
+  "IncrementalSolver": "incremental",
+  "Scorer": "scoring",
+  "best_solutions": "scoring",
+  "ResultCache": "result_cache",
+}
+
+__all__ = sorted(_EXPORTS)
+
+def __getattr__(name):
+  module = _EXPORTS.get(name)
+  if module is None:
+    raise AttributeError(
+      "module {!r} has no attribute {!r}".format(__name__, name)
+    )
+  value = getattr(importlib.import_module("wordfinder." + module), name)
+  # Later lookups find it directly, without calling __getattr__
+  globals()[name] = value
+  return value
+
+def __dir__():
+  return sorted(set(globals()) | set(_EXPORTS))
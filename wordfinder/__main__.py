@@ -1,17 +1,20 @@
-import csv
 import sys
+import itertools
 from argparse import ArgumentParser
+from contextlib import nullcontext
 import wordfinder
-from wordfinder import LetterMatrix, Dictionary
+from wordfinder import SearchStats
+from wordfinder.dictionary import load_dictionary
+from wordfinder.budget import BudgetExceeded, SearchBudget
+from wordfinder.constraints import parse_constraints, word_patterns
+from wordfinder.loader import load_board
+from wordfinder.scoring import SCORERS, best_solutions
+# The tool is often run once per puzzle, so modules only some options
+# need, above all NumPy, are imported when those options are used
 
-def construct_matrix(input_csv):
-  letter_array = []
+def construct_board(input_csv):
   try:
-    with open(input_csv) as csv_file:
-      reader = csv.reader(csv_file)
-      for row in reader:
-        letter_array.append(row)
-    return LetterMatrix(letter_array)
+    return load_board(input_csv)
   except Exception as e:
     print("Encountered error when constructing matrix: {}".format(e))
     sys.exit(1)
@@ -20,74 +23,335 @@ def main(args=None):
   if args is None:
     args = sys.argv[1:]
 
+  if args and args[0] == "batch":
+    from wordfinder import batch
+    return batch.main(args[1:])
+  if args and args[0] == "serve":
+    from wordfinder import server
+    return server.main(args[1:])
+
   parser = ArgumentParser("wordfinder", 
                           description="Find words of the specified lengths " +
                           "in a 2D array of letters. As each word is found, " +
                           "its letters are removed from the array and the " +
-                          "remaining letters drop down within each column.")
+                          "remaining letters drop down within each column. " +
+                          "Run `wordfinder batch -h` to solve many boards at " +
+                          "once, or `wordfinder serve -h` to run a server.")
   parser.add_argument("input_csv", type=str,
                       help="Path to a CSV file containing letter matrix. " +
                       "Each element in CSV must either be empty, or contain " +
                       "a single letter A-Z or a-z. All rows must be the " +
-                      "same length.")
+                      "same length. A plain text grid, one character per " +
+                      "element and . for empty, or a JSON list of rows " +
+                      "can be used instead.")
   parser.add_argument("word_lengths", type=int, nargs="+",
                       help="The lengths of the word to find.")
   parser.add_argument("--prefix", "-p", type=str, default="", 
                       help="If provided, only words with this prefix " +
-                      "will be returned. Can be any length up to word length." +
-                      "Only valid when searching for a single word. ")
+                      "will be returned. Can be any length up to word length. " +
+                      "Give a comma-separated list for several words, " +
+                      "e.g. \"CA,,T\" for the first and third words.")
+  parser.add_argument("--suffix", type=str, default="",
+                      help="Only return words ending with this suffix. " +
+                      "Comma-separated for several words, as for --prefix.")
+  parser.add_argument("--pattern", type=str, default="",
+                      help="Only return words with these letters at these " +
+                      "positions, with . for any letter, e.g. \"..A.E\". " +
+                      "Comma-separated for several words, as for --prefix.")
   parser.add_argument("--raw_results", dest="use_dict", action="store_false",
                       help="By default we return only words that appear in " +
                       "the configured dictionary. Use this option to return " +
                       "every possible solution instead. Note that this may " +
                       "return a truly huge number of results.")
-  parser.add_argument("--dictionary_path", type=str, default="",
+  parser.add_argument("--dictionary_path", type=str, action="append",
+                     default=[],
                      help="Use this option to define a custom dictionary to " +
                      "pull solutions from. If not set, we attempt to use " +
                      "the system dictionary, and fall back to the 2019 " +
-                     "Scrabble dictionary, which is packaged with this module.")
+                     "Scrabble dictionary, which is packaged with this module. " +
+                     "Give it more than once to accept words from any of " +
+                     "several dictionaries.")
+  parser.add_argument("--exclude_dictionary", type=str, action="append",
+                     default=[],
+                     help="Never accept words from this dictionary, e.g. a " +
+                     "list of banned words. Can be given more than once.")
+  parser.add_argument("--intersect_dictionaries", action="store_true",
+                     help="Only accept words that are in every dictionary " +
+                     "given with --dictionary_path.")
+  parser.add_argument("--jobs", "-j", type=int, default=1,
+                      help="Number of processes to solve multi-word " +
+                      "games with. Defaults to 1.")
+  parser.add_argument("--stream", action="store_true",
+                      help="Print each solution as soon as it is found, " +
+                      "rather than collecting and sorting all solutions " +
+                      "first. Solutions are not ordered.")
+  parser.add_argument("--all_paths", dest="unique", action="store_false",
+                      help="Print a solution once for each way of making " +
+                      "it from the board's cells, rather than once.")
+  parser.add_argument("--limit", type=int, default=None,
+                      help="Print at most this many solutions. With " +
+                      "--stream, the search stops as soon as the limit " +
+                      "is reached.")
+  parser.add_argument("--profile", action="store_true",
+                      help="Collect search counters and per-phase timings, " +
+                      "and write them as JSON to stderr.")
+  parser.add_argument("--profile_path", type=str, default=None,
+                      help="Write the --profile JSON to this file instead " +
+                      "of stderr. Implies --profile.")
+  parser.add_argument("--count_only", action="store_true",
+                      help="With --raw_results, print only the number of " +
+                      "solutions, counted without listing them. Useful " +
+                      "to size a search before running it.")
+  parser.add_argument("--top", type=int, default=None, metavar="K",
+                      help="Print only the K highest-scoring solutions, " +
+                      "best first, skipping any part of the search that " +
+                      "can't beat them. Not used with --limit, --jobs " +
+                      "or --stream.")
+  parser.add_argument("--score", choices=sorted(SCORERS), default="scrabble",
+                      help="How to score solutions for --top: by Scrabble " +
+                      "letter values, or by word length. Defaults to " +
+                      "scrabble.")
+  parser.add_argument("--timeout", type=float, default=None,
+                      metavar="SECONDS",
+                      help="Stop searching after this many seconds and " +
+                      "print the solutions found so far.")
+  parser.add_argument("--max_nodes", type=int, default=None,
+                      help="Stop searching after visiting this many cells " +
+                      "and print the solutions found so far.")
+  parser.add_argument("--engine", choices=["python", "numpy", "auto"],
+                      default="python",
+                      help="Search with pure Python, or with NumPy " +
+                      "batched over each search depth. \"auto\" uses " +
+                      "NumPy if it is installed. Defaults to python.")
+  parser.add_argument("--cache_dir", type=str, default="",
+                      help="Keep results in this directory, and answer " +
+                      "repeated queries from it without searching. Not " +
+                      "used with --stream, --top or --count_only.")
+  parser.add_argument("--cache_bytes", type=int, default=None,
+                      help="The most bytes of results to keep in " +
+                      "--cache_dir, deleting the least recently used " +
+                      "beyond that. Defaults to 64 MiB.")
 
   parsed_args = parser.parse_args(args)
 
-  if len(parsed_args.word_lengths) > 1 and parsed_args.prefix != "":
-    print("Prefix is only valid when looking for a single word.")
+  try:
+    constraints = parse_constraints(
+      parsed_args.prefix, parsed_args.suffix, parsed_args.pattern
+    )
+    patterns = word_patterns(constraints, parsed_args.word_lengths)
+  except ValueError as e:
+    print(e)
     sys.exit(1)
 
+  if parsed_args.jobs < 1:
+    print("Jobs must be at least 1.")
+    sys.exit(1)
+
+  if parsed_args.limit is not None and parsed_args.limit < 0:
+    print("Limit must not be negative.")
+    sys.exit(1)
+
+  if parsed_args.top is not None and parsed_args.top < 1:
+    print("Top must be at least 1.")
+    sys.exit(1)
+
+  if parsed_args.top is not None and (
+      parsed_args.limit is not None or parsed_args.jobs > 1 or
+      parsed_args.stream
+  ):
+    print("Top can't be used with --limit, --jobs or --stream.")
+    sys.exit(1)
+
+  if parsed_args.count_only and parsed_args.use_dict:
+    print("Count only is only valid with --raw_results.")
+    sys.exit(1)
+
+  profile_path = parsed_args.profile_path
+  if profile_path is None and parsed_args.profile:
+    profile_path = "-"
+  stats = None if profile_path is None else SearchStats()
+  budget = None
+  if parsed_args.timeout is not None or parsed_args.max_nodes is not None:
+    budget = SearchBudget(parsed_args.timeout, parsed_args.max_nodes)
+
   dictionary = None
   if parsed_args.use_dict:
-    dictionary = Dictionary(parsed_args.dictionary_path)
-
-  matrix = construct_matrix(parsed_args.input_csv)
-
-  if parsed_args.prefix:
-    solutions = [
-      sorted(set(
-        matrix.find_words(
-          parsed_args.word_lengths[0], 
-          parsed_args.prefix, 
-          dictionary
-        )
-      ))
-    ]
-    
-  else:
-    solutions = sorted(set(
-      wordfinder.solve_word_game(
-        matrix,
-        parsed_args.word_lengths, 
-        dictionary
+    with phase(stats, "dictionary"):
+      dictionary = load_dictionary(
+        parsed_args.dictionary_path,
+        parsed_args.exclude_dictionary,
+        parsed_args.intersect_dictionaries
+      )
+
+  with phase(stats, "parse"):
+    board = construct_board(parsed_args.input_csv)
+    if parsed_args.engine != "python":
+      from wordfinder.numpy_board import board_class
+      try:
+        cls = board_class(parsed_args.engine, len(board.cells))
+      except ValueError as e:
+        print(e)
+        sys.exit(1)
+      board = cls(board.rows, board.columns, board.cells)
+
+  if parsed_args.count_only:
+    with phase(stats, "search"):
+      count = wordfinder.count_raw_solutions(
+        board, parsed_args.word_lengths, constraints=constraints
+      )
+    print(count)
+    if stats is not None:
+      write_profile(stats, profile_path)
+    return
+
+  if parsed_args.top is not None:
+    with phase(stats, "search"):
+      best = best_solutions(
+        board,
+        parsed_args.word_lengths,
+        dictionary,
+        parsed_args.top,
+        SCORERS[parsed_args.score],
+        stats=stats,
+        budget=budget,
+        constraints=constraints
       )
-    ))
+    print_solutions(
+      [solution for (_, solution) in best], stats,
+      scores=[score for (score, _) in best]
+    )
+    finish(stats, budget, profile_path)
+    return
+
+  result_cache = None
+  if parsed_args.cache_dir and not parsed_args.stream:
+    from wordfinder.result_cache import ResultCache
+    max_bytes = parsed_args.cache_bytes
+    if max_bytes is None:
+      max_bytes = ResultCache.DEFAULT_MAX_BYTES
+    result_cache = ResultCache(parsed_args.cache_dir, max_bytes=max_bytes)
+
+  # A search for a single word with known letters is presented as a
+  # single solution listing every matching word.
+  single = len(parsed_args.word_lengths) == 1 and any(constraints)
+  if single and patterns is None:
+    # The word is too short for its letters
+    solutions = [[]]
+  elif single and result_cache is not None:
+    with phase(stats, "search"):
+      words = result_cache.find_words(
+        board,
+        parsed_args.word_lengths[0],
+        patterns[0],
+        dictionary,
+        parsed_args.unique,
+        stats,
+        budget
+      )
+    solutions = [words[:parsed_args.limit]]
+  elif single:
+    words = board.iter_words(
+      parsed_args.word_lengths[0], 
+      patterns[0], 
+      dictionary,
+      stats,
+      parsed_args.unique,
+      budget
+    )
+    words = within_budget(words)
+    if stats is not None:
+      words = stats.timed(words)
+    if not parsed_args.stream:
+      words = sorted(words)
+    solutions = [itertools.islice(words, parsed_args.limit)]
+  elif result_cache is not None:
+    with phase(stats, "search"):
+      solutions = result_cache.solve_word_game(
+        board,
+        parsed_args.word_lengths,
+        dictionary,
+        parsed_args.unique,
+        constraints,
+        workers=parsed_args.jobs,
+        stats=stats,
+        budget=budget
+      )
+    solutions = solutions[:parsed_args.limit]
+  else:
+    solutions = wordfinder.iter_solve_word_game(
+      board,
+      parsed_args.word_lengths, 
+      dictionary,
+      workers=parsed_args.jobs,
+      stats=stats,
+      unique=parsed_args.unique,
+      budget=budget,
+      constraints=constraints
+    )
+    if not parsed_args.stream:
+      solutions = sorted(solutions)
+    solutions = itertools.islice(solutions, parsed_args.limit)
+
+  print_solutions(solutions, stats)
+  finish(stats, budget, profile_path, result_cache)
 
+def finish(stats, budget, profile_path, result_cache=None):
+  """Report an incomplete search, and write the profile if wanted."""
+  if budget is not None and budget.exhausted:
+    print("Search stopped early, as it {}. These solutions are not "
+          "complete.".format(budget.reason()), file=sys.stderr)
+  if stats is not None:
+    write_profile(stats, profile_path, result_cache)
+
+def within_budget(items):
+  """Yield the items until a search budget stops them."""
+  try:
+    yield from items
+  except BudgetExceeded:
+    return
+
+def phase(stats, name):
+  """Time the named phase if collecting stats, otherwise do nothing."""
+  return nullcontext() if stats is None else stats.phase(name)
+
+def print_solutions(solutions, stats=None, scores=None):
+  """
+  Print each solution (an iterable of words) as it is produced, 
+  separated by horizontal rules. If a SearchStats is given, the time
+  spent printing is added to its "output" phase. If `scores` are given,
+  each solution's score is printed after its words.
+  """
   sep = "-"*20
-  if not solutions:
-    print("No solutions found")
+  found = False
+  scores = iter(scores) if scores is not None else None
   for solution in solutions:
-    print(sep)
-    for word in solution:
-      print(word.upper())
+    found = True
+    with phase(stats, "output"):
+      print(sep)
+      for word in solution:
+        print(word.upper())
+      if scores is not None:
+        print("Score: {}".format(next(scores)))
+  if not found:
+    print("No solutions found")
   print(sep)
 
+def write_profile(stats, path, result_cache=None):
+  """
+  Write stats as JSON to the given path, or to stderr if it is "-",
+  along with the hit rate and size of the result cache if one was used.
+  """
+  profile = stats.to_dict()
+  if result_cache is not None:
+    profile["result_cache"] = result_cache.summary()
+  import json
+  profile = json.dumps(profile, indent=2, sort_keys=True)
+  if path == "-":
+    print(profile, file=sys.stderr)
+  else:
+    with open(path, "w") as f:
+      f.write(profile + "\n")
+
     
 if __name__ == "__main__":
   main()
\ No newline at end of file
@@ -0,0 +1,99 @@
+"""
+Adjacency tables for boards, computed once per shape.
+
+Which cells neighbor which depends only on a board's shape, not its
+letters, so each table is computed the first time a shape is seen and
+shared by every board of that shape in the process, e.g. a batch of
+same-sized boards. Only the tables of the 32 most recently seen shapes
+are kept, so a process fed boards of many sizes doesn't grow without
+bound. The tables come in the forms the searches need:
+
+  neighbor_coords  (row, column) tuples, for LetterMatrix
+  neighbor_table   flat cell indices, for Board
+  neighbor_masks   bitmasks of flat cell indices, for `paths`
+
+`reach_masks` grows a set of cells a step at a time, for searches that
+only want paths able to reach one of them.
+
+Whether a neighbor is empty is left to the caller, which checks its
+own letters directly.
+"""
+from functools import lru_cache
+
+# The (row, column) offsets of the neighbors of a cell, in the order
+# neighbors are listed in
+NEIGHBOR_TRANSFORMS = [
+  (-1, -1),
+  (-1, 0),
+  (-1, 1),
+  (0, -1),
+  (0, 1),
+  (1, -1),
+  (1, 0),
+  (1, 1),
+]
+
+@lru_cache(maxsize=32)
+def neighbor_coords(rows, columns):
+  """
+  Return a tuple of rows of a board with the given shape, each a tuple
+  holding, for each cell in the row, a tuple of the (row, column) of
+  the cells adjacent to it.
+  """
+  return tuple(
+    tuple(
+      tuple(
+        (r + dr, c + dc) for (dr, dc) in NEIGHBOR_TRANSFORMS
+        if 0 <= r + dr < rows and 0 <= c + dc < columns
+      )
+      for c in range(columns)
+    )
+    for r in range(rows)
+  )
+
+@lru_cache(maxsize=32)
+def neighbor_table(rows, columns):
+  """
+  Return a tuple holding, for each cell index of a board with the given
+  shape, a tuple of the indices of the cells adjacent to it.
+  """
+  return tuple(
+    tuple(r * columns + c for (r, c) in neighbors)
+    for row in neighbor_coords(rows, columns)
+    for neighbors in row
+  )
+
+@lru_cache(maxsize=32)
+def neighbor_masks(rows, columns):
+  """
+  Return a tuple holding, for each cell index of a board with the given
+  shape, a bitmask of the cells adjacent to it.
+  """
+  masks = []
+  for neighbors in neighbor_table(rows, columns):
+    mask = 0
+    for i in neighbors:
+      mask |= 1 << i
+    masks.append(mask)
+  return tuple(masks)
+
+def reach_masks(rows, columns, cells, steps):
+  """
+  Return a list whose k-th item, for k up to `steps`, is a bitmask of
+  the cells of a board with the given shape at most k steps from any of
+  the given cells, ignoring whether cells are empty.
+  """
+  neighbors = neighbor_masks(rows, columns)
+  mask = 0
+  for i in cells:
+    mask |= 1 << i
+  masks = [mask]
+  for _ in range(steps):
+    grown = mask
+    while mask:
+      low = mask & -mask
+      grown |= neighbors[low.bit_length() - 1]
+      mask ^= low
+    mask = grown
+    masks.append(mask)
+  return masks
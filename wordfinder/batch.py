@@ -0,0 +1,254 @@
+"""
+Solve many boards in one process:
+
+  wordfinder batch SOURCE [WORD_LENGTHS ...] [options]
+
+SOURCE is a directory of CSV files, a glob pattern matching CSV files,
+a .jsonl file, or "-" to read JSON lines from stdin. Each JSON line
+describes one board:
+
+  {"id": "puzzle-1", "board": [["A", "B"], ["C", ""]], "word_lengths": [2]}
+
+where "board" may be replaced by "path", the path to a CSV file, and
+"word_lengths", "prefix", "suffix" and "pattern" default to those given
+on the command line. As on the command line, the letters a word must
+have are given as comma-separated lists with an entry per word, e.g.
+"suffix": ",ING" for the second word, or as JSON lists of strings.
+
+The dictionary is loaded once and one JSON result is written per board
+as soon as it is solved, in input order:
+
+  {"id": "puzzle-1", "solutions": [["AB"], ...], "error": null}
+
+A board that can't be read or solved gets an "error" message instead,
+and the rest of the batch carries on.
+"""
+import glob
+import json
+import os
+import sys
+from argparse import ArgumentParser
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from wordfinder.budget import BudgetExceeded, SearchBudget
+from wordfinder.constraints import parse_constraints, word_patterns
+from wordfinder.dictionary import load_dictionary
+from wordfinder.letter_matrix import LetterMatrix
+from wordfinder.loader import load_board
+from wordfinder.solve import iter_solve_word_game
+
+def iter_jobs(source, word_lengths=None, prefix="", suffix="", pattern=""):
+  """
+  Yield a dict describing each board to solve in `source`, see above.
+  Lines of JSON input that can't be parsed are yielded as jobs with an
+  "error" entry, so they are reported in order with the rest.
+  """
+  defaults = {
+    "word_lengths": word_lengths, "prefix": prefix, "suffix": suffix,
+    "pattern": pattern
+  }
+  if source == "-" or source.endswith(".jsonl"):
+    if source == "-":
+      yield from _iter_json_jobs(sys.stdin, defaults)
+    else:
+      with open(source) as f:
+        yield from _iter_json_jobs(f, defaults)
+    return
+
+  if os.path.isdir(source):
+    paths = sorted(glob.glob(os.path.join(source, "*.csv")))
+  else:
+    paths = sorted(glob.glob(source))
+  for path in paths:
+    yield dict(defaults, id=path, path=path)
+
+def _iter_json_jobs(lines, defaults):
+  for (n, line) in enumerate(lines, start=1):
+    if not line.strip():
+      continue
+    job_id = "line {}".format(n)
+    try:
+      job = json.loads(line)
+      if not isinstance(job, dict):
+        raise ValueError("Each line must be a JSON object.")
+    except ValueError as e:
+      yield {"id": job_id, "error": "Invalid JSON: {}".format(e)}
+      continue
+    yield {**defaults, "id": job_id, **job}
+
+def job_constraints(job):
+  """
+  Return a list of a WordConstraint or None for each word, from the
+  "prefix", "suffix" and "pattern" of `job`, see above.
+
+  Raises ValueError if they aren't valid.
+  """
+  def joined(name):
+    value = job.get(name) or ""
+    if isinstance(value, list):
+      value = ",".join(value)
+    if not isinstance(value, str):
+      raise ValueError("{} must be a string or a list.".format(name))
+    return value
+
+  return parse_constraints(
+    joined("prefix"), joined("suffix"), joined("pattern")
+  )
+
+def solve_job(job, dictionary, limit=None, timeout=None):
+  """
+  Solve the board described by `job`, returning a result dict with the
+  job's id and either its sorted, de-duplicated solutions or an error.
+  Never raises for problems with the job itself.
+
+  If `timeout` is given, the search stops after that many seconds, and
+  the result also has a "completed" flag, False if the search was
+  stopped early and the solutions are only those found by then.
+  """
+  result = {"id": job.get("id"), "solutions": None, "error": None}
+  budget = None
+  if timeout is not None:
+    budget = SearchBudget(timeout)
+    result["completed"] = True
+  try:
+    if "error" in job:
+      raise ValueError(job["error"])
+    word_lengths = job.get("word_lengths")
+    if not word_lengths:
+      raise ValueError("No word lengths given.")
+    word_lengths = [int(n) for n in word_lengths]
+
+    if "board" in job:
+      matrix = LetterMatrix(job["board"])
+    elif "path" in job:
+      matrix = load_board(job["path"])
+    else:
+      raise ValueError("Each job needs a board or a path.")
+
+    constraints = job_constraints(job)
+    patterns = word_patterns(constraints, word_lengths)
+    if len(word_lengths) == 1 and any(constraints):
+      words = []
+      try:
+        if patterns is not None:
+          words.extend(matrix.iter_words(
+            word_lengths[0], patterns[0], dictionary, unique=True,
+            budget=budget
+          ))
+      except BudgetExceeded:
+        # Keep the words found so far, as iter_solve_word_game does
+        pass
+      solutions = [[w] for w in sorted(words)]
+    else:
+      solutions = sorted(iter_solve_word_game(
+        matrix, word_lengths, dictionary, unique=True, budget=budget,
+        constraints=constraints
+      ))
+    result["solutions"] = solutions[:limit]
+    if budget is not None:
+      result["completed"] = budget.completed
+  except Exception as e:
+    result["error"] = "{}: {}".format(type(e).__name__, e)
+  return result
+
+def solve_batch(jobs, dictionary, workers=1, limit=None):
+  """
+  Lazily yield a result dict (see `solve_job`) for each job, in order.
+  If `workers` is greater than 1, boards are solved in that many
+  processes, with no more than a few jobs per worker read ahead of the
+  results, so arbitrarily long inputs can be streamed.
+  """
+  if workers <= 1:
+    for job in jobs:
+      yield solve_job(job, dictionary, limit)
+    return
+
+  executor = ProcessPoolExecutor(
+    max_workers=workers,
+    initializer=_init_worker,
+    initargs=(dictionary, limit)
+  )
+  try:
+    pending = deque()
+    for job in jobs:
+      pending.append(executor.submit(_solve_job_in_worker, job))
+      if len(pending) >= workers * 2:
+        yield pending.popleft().result()
+    while pending:
+      yield pending.popleft().result()
+  finally:
+    executor.shutdown(cancel_futures=True)
+
+# Set once per worker process, so the dictionary isn't sent per job.
+_worker_state = {}
+
+def _init_worker(dictionary, limit):
+  _worker_state.update(dictionary=dictionary, limit=limit)
+
+def _solve_job_in_worker(job):
+  return solve_job(job, _worker_state["dictionary"], _worker_state["limit"])
+
+def main(args=None):
+  if args is None:
+    args = sys.argv[1:]
+
+  parser = ArgumentParser("wordfinder batch",
+                          description="Solve many boards, writing one " +
+                          "JSON result per line.")
+  parser.add_argument("source", type=str,
+                      help="A directory of CSV files, a glob pattern, a " +
+                      ".jsonl file, or - to read JSON lines from stdin.")
+  parser.add_argument("word_lengths", type=int, nargs="*",
+                      help="The lengths of the words to find, for boards " +
+                      "that don't give their own.")
+  parser.add_argument("--prefix", "-p", type=str, default="",
+                      help="Default prefix, for boards that don't give " +
+                      "their own. Give a comma-separated list for several " +
+                      "words, e.g. \"CA,,T\" for the first and third words.")
+  parser.add_argument("--suffix", type=str, default="",
+                      help="Default suffix, for boards that don't give " +
+                      "their own. Comma-separated for several words, as " +
+                      "for --prefix.")
+  parser.add_argument("--pattern", type=str, default="",
+                      help="Default pattern, with . for any letter, e.g. " +
+                      "\"..A.E\", for boards that don't give their own. " +
+                      "Comma-separated for several words, as for --prefix.")
+  parser.add_argument("--raw_results", dest="use_dict", action="store_false",
+                      help="Return every possible solution rather than " +
+                      "only dictionary words.")
+  parser.add_argument("--dictionary_path", type=str, action="append",
+                      default=[],
+                      help="Use this dictionary rather than the default. " +
+                      "Give it more than once to accept words from any of " +
+                      "several dictionaries.")
+  parser.add_argument("--exclude_dictionary", type=str, action="append",
+                      default=[],
+                      help="Never accept words from this dictionary.")
+  parser.add_argument("--jobs", "-j", type=int, default=1,
+                      help="Number of processes to solve boards with.")
+  parser.add_argument("--limit", type=int, default=None,
+                      help="Return at most this many solutions per board.")
+  parsed_args = parser.parse_args(args)
+
+  if parsed_args.limit is not None and parsed_args.limit < 0:
+    print("Limit must not be negative.", file=sys.stderr)
+    sys.exit(1)
+
+  dictionary = None
+  if parsed_args.use_dict:
+    dictionary = load_dictionary(
+      parsed_args.dictionary_path, parsed_args.exclude_dictionary
+    )
+
+  jobs = iter_jobs(
+    parsed_args.source, parsed_args.word_lengths, parsed_args.prefix,
+    parsed_args.suffix, parsed_args.pattern
+  )
+  results = solve_batch(
+    jobs, dictionary, parsed_args.jobs, parsed_args.limit
+  )
+  for result in results:
+    print(json.dumps(result), flush=True)
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,242 @@
+from collections import Counter
+from wordfinder.adjacency import neighbor_table
+from wordfinder.cell_path import CellPath, pack_cells
+from wordfinder.constraints import WILDCARD
+from wordfinder.letter_matrix import LetterMatrix
+from wordfinder.paths import count_paths, iter_paths, region_masks
+
+# Maps a byte value to the upper-case letter it encodes, so the search
+# can compare against the dictionary without calling str.upper().
+_UPPER = [chr(b).upper() for b in range(256)]
+
+class Board:
+  """
+  An immutable, compact snapshot of a LetterMatrix, used by the solver.
+
+  The letters are held in a single bytes object in row-major order,
+  with a zero byte marking an empty element. Cells are addressed by
+  their flat index (row * columns + column), and the cells used by a
+  path are tracked in an integer bitmask. Removing a word returns a
+  new Board rather than modifying this one, so no copying of nested
+  lists is needed while exploring alternatives.
+  """
+  __slots__ = ("rows", "columns", "cells")
+
+  def __init__(self, rows, columns, cells):
+    """
+    rows (int), columns (int) -- the shape of the board.
+    cells (bytes) -- rows * columns letters in row-major order, with
+      a zero byte for empty elements.
+    """
+    self.rows = rows
+    self.columns = columns
+    self.cells = bytes(cells)
+
+  @staticmethod
+  def from_matrix(matrix):
+    """Build a Board holding the same letters as the given LetterMatrix."""
+    rows = matrix.row_count()
+    columns = matrix.column_count() if rows else 0
+    cells = bytes(
+      ord(elm) if elm else 0 for row in matrix.matrix for elm in row
+    )
+    return Board(rows, columns, cells)
+
+  def to_matrix(self):
+    """Return a new LetterMatrix holding the letters of this board."""
+    columns = self.columns
+    return LetterMatrix([
+      [chr(b) if b else '' for b in self.cells[r*columns:(r+1)*columns]]
+      for r in range(self.rows)
+    ], validate=False)
+
+  def __eq__(self, other):
+    return isinstance(other, Board) and \
+           (self.rows, self.columns, self.cells) == \
+           (other.rows, other.columns, other.cells)
+
+  def __hash__(self):
+    return hash((self.rows, self.columns, self.cells))
+
+  def __repr__(self):
+    return "Board({!r}, {!r}, {!r})".format(self.rows, self.columns, self.cells)
+
+  def index(self, r, c):
+    """Return the flat cell index of the given coordinates."""
+    return r * self.columns + c
+
+  def coords(self, index):
+    """Return the (row, column) of the given flat cell index."""
+    return divmod(index, self.columns)
+
+  def letter_counts(self):
+    """Return a Counter of the upper-case letters on the board."""
+    counts = Counter(self.cells.upper())
+    del counts[0]
+    return Counter({chr(b): n for (b, n) in counts.items()})
+
+  def word_at(self, coords):
+    """Given a list of coordinates, return the string made from joining
+    the letters at those locations."""
+    if isinstance(coords, CellPath):
+      return self.word_at_cells(coords.cells)
+    return self.word_at_cells([self.index(r, c) for (r, c) in coords])
+
+  def word_at_cells(self, cells):
+    """Like `word_at`, but takes flat cell indices."""
+    letters = bytes(self.cells[i] for i in cells)
+    return letters.replace(b"\0", b"").decode("ascii")
+
+  def iter_word_coords(
+      self, length, prefix="", dictionary=None, stats=None, budget=None,
+      compact=False
+  ):
+    """
+    Lazily yield coordinate lists for the words in this board, with the
+    same rules as `LetterMatrix.find_word_coords`. If `compact` is True,
+    each is yielded as a CellPath.
+    """
+    trie = None
+    if dictionary:
+      # Only search for words that can be spelled from our letters
+      trie = dictionary.trie(length, self.letter_counts(), prefix)
+      if trie is None:
+        if stats is not None:
+          stats.prunes["infeasible"] += 1
+        return
+    paths = self.iter_cell_paths(
+      length, prefix, trie, stats, budget=budget
+    )
+    if compact:
+      for path in paths:
+        yield CellPath(pack_cells(path, len(self.cells)), self.columns)
+      return
+    for path in paths:
+      yield [self.coords(i) for i in path]
+
+  # Board has the coordinate methods LetterMatrix.iter_words relies on
+  iter_words = LetterMatrix.iter_words
+
+  def iter_cell_paths(
+      self, length, prefix="", trie=None, stats=None, starts=None,
+      budget=None, regions=None
+  ):
+    """
+    Lazily yield tuples of flat cell indices for the words in this
+    board, with the same rules as `LetterMatrix.find_word_coords`.
+
+    trie (Trie) -- if given, only paths spelling words in it are
+      returned, and paths are abandoned as soon as their letters are not
+      a prefix of any word.
+    stats (SearchStats) -- if given, search counters are added to it.
+    starts (iterable of int) -- if given, only paths starting at these
+      cells are returned.
+    budget (SearchBudget) -- if given, each cell visited is counted
+      against it, and BudgetExceeded is raised when it runs out.
+    regions (sequence) -- if given, the region of each cell, any
+      hashable value, or None for empty cells. Only paths using cells of
+      at least two regions are returned, and a path within one region is
+      abandoned as soon as no other region is within the steps it has
+      left.
+    """
+    if trie is None:
+      # Without a dictionary there is nothing to prune with, so every
+      # path is enumerated using bitmasks
+      yield from iter_paths(
+        self.rows, self.columns, self.cells, length, prefix, stats, starts,
+        budget, regions
+      )
+      return
+    if length < 1 or len(prefix) > length:
+      return
+    prefix = prefix.upper()
+    cells = self.cells
+    table = neighbor_table(self.rows, self.columns)
+    path = []
+    (outside, near) = region_masks(self.rows, self.columns, length, regions)
+
+    def extend(cell, used, node):
+      path.append(cell)
+      depth = len(path)
+      if budget is not None:
+        budget.spend()
+      if stats is not None:
+        stats.nodes += 1
+        stats.max_path_depth = max(stats.max_path_depth, depth)
+      if depth == length:
+        if stats is not None:
+          stats.paths += 1
+          stats.lookups += trie is not None
+        if trie is None or trie.is_word(node):
+          yield tuple(path)
+        elif stats is not None:
+          stats.prunes["dictionary"] += 1
+      else:
+        for n in table[cell]:
+          if not cells[n] or used >> n & 1:
+            continue
+          if near and not used & outside[path[0]] and \
+             not near[path[0]][depth] >> n & 1:
+            continue
+          letter = _UPPER[cells[n]]
+          if depth < len(prefix) and letter != prefix[depth] and \
+             prefix[depth] != WILDCARD:
+            if stats is not None:
+              stats.prunes["prefix"] += 1
+            continue
+          next_node = None
+          if trie:
+            next_node = trie.child(node, letter)
+            if stats is not None:
+              stats.lookups += 1
+              stats.prunes["dictionary"] += next_node is None
+            if next_node is None:
+              continue
+          yield from extend(n, used | 1 << n, next_node)
+      path.pop()
+
+    for cell in range(len(cells)) if starts is None else sorted(starts):
+      if not cells[cell] or near and not near[cell][0] >> cell & 1:
+        continue
+      letter = _UPPER[cells[cell]]
+      if prefix and letter != prefix[0] and prefix[0] != WILDCARD:
+        if stats is not None:
+          stats.prunes["prefix"] += 1
+        continue
+      node = None
+      if trie:
+        node = trie.child(trie.root(), letter)
+        if stats is not None:
+          stats.lookups += 1
+          stats.prunes["dictionary"] += node is None
+        if node is None:
+          continue
+      yield from extend(cell, 1 << cell, node)
+
+  def count_cell_paths(self, length, prefix=""):
+    """
+    Return the number of paths `iter_cell_paths` would yield without a
+    trie, without enumerating them.
+    """
+    return count_paths(self.rows, self.columns, self.cells, length, prefix)
+
+  def remove_word(self, coords):
+    """
+    Return a new Board with the letters at the given coordinates removed
+    and every column collapsed, as `LetterMatrix.remove_word` does.
+    """
+    if isinstance(coords, CellPath):
+      return self.remove_cells(coords.cells)
+    return self.remove_cells([self.index(r, c) for (r, c) in coords])
+
+  def remove_cells(self, cells):
+    """Like `remove_word`, but takes flat cell indices."""
+    new_cells = bytearray(self.cells)
+    for i in cells:
+      new_cells[i] = 0
+    rows = self.rows
+    for c in range(self.columns):
+      # Letters keep their order but drop to the lowest rows
+      letters = new_cells[c::self.columns].replace(b"\0", b"")
+      new_cells[c::self.columns] = letters + bytes(rows - len(letters))
+    return Board(rows, self.columns, new_cells)
@@ -0,0 +1,78 @@
+import time
+
+class BudgetExceeded(Exception):
+  """Raised inside a search when its SearchBudget runs out."""
+  pass
+
+
+class SearchBudget:
+  """
+  Limits on how long a search may run, checked as it goes, so that a
+  solve can answer within a deadline even when it can't finish.
+
+  Searches take an optional `budget` argument. Each cell visited is
+  counted against it, and once the time or node limit is reached the
+  search stops, keeping the solutions already found. `exhausted` then
+  tells the caller the results are incomplete. Partial sub-solutions
+  are never added to a SolveCache.
+
+  The clock starts when the budget is created. A budget can be shared
+  by several searches, to limit them in total.
+  """
+
+  # Cells to visit between checks of the clock
+  CHECK_INTERVAL = 1024
+
+  def __init__(self, timeout=None, max_nodes=None):
+    """
+    timeout (float) -- the most seconds to search for, or None.
+    max_nodes (int) -- the most cells to visit, or None.
+    """
+    self.timeout = timeout
+    self.max_nodes = max_nodes
+    self.deadline = None if timeout is None else time.monotonic() + timeout
+    self.nodes = 0
+    self._reason = None
+    self._next_check = 0
+
+  @property
+  def exhausted(self):
+    """True if a search was stopped early by this budget."""
+    return self._reason is not None
+
+  @property
+  def completed(self):
+    """True unless a search was stopped early by this budget."""
+    return self._reason is None
+
+  def spend(self, nodes=1):
+    """
+    Count visited cells against the budget, raising BudgetExceeded if it
+    has run out. The clock is only read every CHECK_INTERVAL cells.
+    """
+    self.nodes += nodes
+    if self.nodes >= self._next_check:
+      self.check()
+
+  def check(self):
+    """Raise BudgetExceeded if the budget has run out."""
+    if self._reason is None:
+      if self.max_nodes is not None and self.nodes > self.max_nodes:
+        self._reason = "visited more than {} cells".format(self.max_nodes)
+      elif self.deadline is not None and time.monotonic() >= self.deadline:
+        self._reason = "ran for more than {} seconds".format(self.timeout)
+    if self._reason is not None:
+      raise BudgetExceeded(self._reason)
+    self._next_check = self.nodes + SearchBudget.CHECK_INTERVAL
+    if self.max_nodes is not None:
+      self._next_check = min(self._next_check, self.max_nodes + 1)
+
+  def stop(self, reason):
+    """Mark the budget as run out for the given reason, and raise."""
+    if self._reason is None:
+      self._reason = reason
+    raise BudgetExceeded(self._reason)
+
+  def reason(self):
+    """Describe why the budget ran out, or return None if it hasn't."""
+    return self._reason
@@ -0,0 +1,135 @@
+"""
+Compact storage for the coordinate lists the search returns.
+
+A coordinate list like [(0, 1), (1, 2), (2, 2)] costs a list plus a
+tuple per cell, well over 100 bytes for a short word. A CellPath holds
+the same cells as a byte string of flat, row-major indices, and only
+makes (row, column) tuples when it is iterated. A CellPathList goes
+further and packs every path of a result set into one byte array, so a
+path costs its length in bytes until it is looked at.
+
+Boards of more than 256 cells don't fit indices in a byte, so their
+paths use two bytes per cell.
+"""
+from array import array
+
+def _typecode(cell_count):
+  return "B" if cell_count <= 256 else "H"
+
+def pack_cells(indices, cell_count):
+  """
+  Return the flat cell indices as bytes, or as an array of 16-bit ints
+  for a board of more than 256 cells.
+  """
+  typecode = _typecode(cell_count)
+  if typecode == "B":
+    return bytes(indices)
+  return array(typecode, indices)
+
+
+class CellPath:
+  """
+  The cells of one word, as flat indices into a board with `columns`
+  columns. Iterating gives (row, column) tuples, so a CellPath can be
+  used anywhere a coordinate list is expected, including
+  `LetterMatrix.word_at` and `remove_word`.
+  """
+  __slots__ = ("cells", "columns")
+
+  def __init__(self, cells, columns):
+    """
+    cells (bytes or array of int) -- the flat cell indices, in order.
+    columns (int) -- the number of columns of the board.
+    """
+    self.cells = cells
+    self.columns = columns
+
+  @classmethod
+  def from_coords(cls, coords, rows, columns):
+    """Return a CellPath of the (row, column) coordinates in `coords`."""
+    indices = (r * columns + c for (r, c) in coords)
+    return cls(pack_cells(indices, rows * columns), columns)
+
+  def __len__(self):
+    return len(self.cells)
+
+  def __iter__(self):
+    columns = self.columns
+    for i in self.cells:
+      yield divmod(i, columns)
+
+  def __getitem__(self, n):
+    if isinstance(n, slice):
+      return [divmod(i, self.columns) for i in self.cells[n]]
+    return divmod(self.cells[n], self.columns)
+
+  def __eq__(self, other):
+    if not isinstance(other, CellPath):
+      return NotImplemented
+    return self.columns == other.columns and \
+           tuple(self.cells) == tuple(other.cells)
+
+  def __lt__(self, other):
+    # Flat indices are row-major, so this is the order of the coordinates
+    return tuple(self.cells) < tuple(other.cells)
+
+  def __hash__(self):
+    return hash((self.columns, tuple(self.cells)))
+
+  def __repr__(self):
+    return "CellPath({!r})".format(self.coords())
+
+  def coords(self):
+    """Return the path as a list of (row, column) tuples."""
+    return list(self)
+
+
+class CellPathList:
+  """
+  A sequence of CellPaths of the same length, stored back to back in a
+  single array. Items are made on demand.
+  """
+  __slots__ = ("length", "columns", "_cells")
+
+  def __init__(self, length, rows, columns):
+    """
+    length (int) -- the number of cells in every path.
+    rows (int), columns (int) -- the shape of the board.
+    """
+    self.length = length
+    self.columns = columns
+    typecode = _typecode(rows * columns)
+    self._cells = bytearray() if typecode == "B" else array(typecode)
+
+  def append(self, path):
+    """Add a path, given as a CellPath or a sequence of (row, column)."""
+    if isinstance(path, CellPath):
+      self._cells.extend(path.cells)
+    else:
+      self._cells.extend(r * self.columns + c for (r, c) in path)
+
+  def __len__(self):
+    return len(self._cells) // self.length if self.length > 0 else 0
+
+  def __getitem__(self, n):
+    if isinstance(n, slice):
+      return [self[i] for i in range(*n.indices(len(self)))]
+    if n < 0:
+      n += len(self)
+    if not 0 <= n < len(self):
+      raise IndexError("CellPathList index out of range")
+    cells = self._cells[n * self.length:(n + 1) * self.length]
+    if isinstance(cells, bytearray):
+      cells = bytes(cells)
+    return CellPath(cells, self.columns)
+
+  def __iter__(self):
+    for n in range(len(self)):
+      yield self[n]
+
+  def __repr__(self):
+    return "CellPathList({!r})".format([p.coords() for p in self])
+
+  def nbytes(self):
+    """Return the number of bytes used to hold the paths."""
+    return memoryview(self._cells).nbytes
@@ -0,0 +1,172 @@
+"""
+Letters known in advance for the words of a solution.
+
+Players usually know a few letters of the words they're after: how a
+word starts or ends, or a letter in the middle. A WordConstraint holds
+these for one word. For a given word length it reduces to a pattern, a
+string of the letters at the start of the word where WILDCARD stands
+for any letter, e.g. "C.T" for a word starting with C whose third
+letter is T. Everywhere a search takes a `prefix`, it takes a pattern,
+and checks each letter against it as the path reaches it, so paths are
+abandoned at the first letter that doesn't fit rather than filtered
+once complete.
+"""
+
+# Stands for any letter in a pattern
+WILDCARD = "."
+
+class WordConstraint:
+  """
+  Letters a word must have: a prefix, a suffix, and letters at given
+  positions, counted from 0.
+  """
+  __slots__ = ("prefix", "suffix", "fixed")
+
+  def __init__(self, prefix="", suffix="", fixed=None):
+    """
+    prefix (str) -- the word must start with these letters.
+    suffix (str) -- the word must end with these letters.
+    fixed (dict of int to str) -- the word must have each letter at its
+      position.
+
+    Raises ValueError if any of these aren't letters A-Z.
+    """
+    self.prefix = _letters(prefix)
+    self.suffix = _letters(suffix)
+    self.fixed = {}
+    for (position, letter) in (fixed or {}).items():
+      letter = _letters(letter)
+      if position < 0 or len(letter) != 1:
+        raise ValueError(
+          "Fixed letters must be single letters at positions from 0, " +
+          "got {!r} at {}.".format(letter, position)
+        )
+      self.fixed[position] = letter
+
+  @classmethod
+  def from_pattern(cls, pattern):
+    """
+    Return a WordConstraint fixing the letters in `pattern`, with any
+    other character standing for any letter, e.g. "..A.E".
+    """
+    return cls(fixed={
+      i: letter for (i, letter) in enumerate(pattern) if letter.isalpha()
+    })
+
+  def __bool__(self):
+    return bool(self.prefix or self.suffix or self.fixed)
+
+  def __eq__(self, other):
+    return isinstance(other, WordConstraint) and \
+      (self.prefix, self.suffix, self.fixed) == \
+      (other.prefix, other.suffix, other.fixed)
+
+  def __repr__(self):
+    return "WordConstraint({!r}, {!r}, {!r})".format(
+      self.prefix, self.suffix, self.fixed
+    )
+
+  def pattern(self, length):
+    """
+    Return the pattern for a word of `length` letters, with no trailing
+    wildcards, or None if no such word can meet the constraint.
+    """
+    letters = [WILDCARD] * length
+    start = length - len(self.suffix)
+    placed = list(enumerate(self.prefix)) + [
+      (start + i, letter) for (i, letter) in enumerate(self.suffix)
+    ] + list(self.fixed.items())
+    for (i, letter) in placed:
+      if not 0 <= i < length or letters[i] not in (WILDCARD, letter):
+        return None
+      letters[i] = letter
+    return "".join(letters).rstrip(WILDCARD)
+
+  def matches(self, word):
+    """True if `word` meets the constraint."""
+    pattern = self.pattern(len(word))
+    return pattern is not None and matches_pattern(word.upper(), pattern)
+
+
+def matches_pattern(word, pattern):
+  """True if upper-case `word` is at least as long as, and fits, `pattern`."""
+  if len(word) < len(pattern):
+    return False
+  for (letter, wanted) in zip(word, pattern):
+    if letter != wanted and wanted != WILDCARD:
+      return False
+  return True
+
+def word_patterns(constraints, word_lengths):
+  """
+  Return a tuple holding the pattern for each word, given a sequence of
+  a WordConstraint or None for each, or None if a word can't meet its
+  constraint. Words past the end of `constraints` are unconstrained.
+
+  Raises ValueError if there are more constraints than words.
+  """
+  constraints = list(constraints or ())
+  if len(constraints) > len(word_lengths):
+    raise ValueError(
+      "Got constraints for {} words, but only {} word lengths.".format(
+        len(constraints), len(word_lengths)
+      )
+    )
+  patterns = []
+  for (i, length) in enumerate(word_lengths):
+    constraint = constraints[i] if i < len(constraints) else None
+    pattern = constraint.pattern(length) if constraint else ""
+    if pattern is None:
+      return None
+    patterns.append(pattern)
+  return tuple(patterns)
+
+def search_patterns(word_lengths, prefix="", constraints=None):
+  """
+  Return the pattern for each word, as for `word_patterns`, or with
+  `prefix` as the first word's pattern if given.
+  """
+  if prefix:
+    if constraints:
+      raise ValueError("Give either a prefix or constraints, not both.")
+    return (prefix.upper(),) + ("",) * (len(word_lengths) - 1)
+  return word_patterns(constraints, word_lengths)
+
+def parse_constraints(prefixes="", suffixes="", patterns=""):
+  """
+  Return a list of a WordConstraint or None for each word, from
+  comma-separated lists of prefixes, suffixes and patterns, e.g. from
+  the command line. An empty entry leaves that part of a word's
+  constraint out, so "--suffix ,ING" constrains only the second word.
+
+  Raises ValueError if an entry has characters other than letters, or
+  other than letters and wildcards for patterns.
+  """
+  def split(text):
+    return text.split(",") if text else []
+
+  (prefixes, suffixes, patterns) = (
+    split(prefixes), split(suffixes), split(patterns)
+  )
+  constraints = []
+  for i in range(max(len(prefixes), len(suffixes), len(patterns))):
+    pattern = patterns[i] if i < len(patterns) else ""
+    if any(not (c.isalpha() or c == WILDCARD) for c in pattern):
+      raise ValueError(
+        "Patterns may only hold letters and {!r}, got {!r}.".format(
+          WILDCARD, pattern
+        )
+      )
+    constraint = WordConstraint(
+      prefixes[i] if i < len(prefixes) else "",
+      suffixes[i] if i < len(suffixes) else "",
+      WordConstraint.from_pattern(pattern).fixed
+    )
+    constraints.append(constraint or None)
+  return constraints
+
+def _letters(text):
+  text = text.upper()
+  if any(not "A" <= c <= "Z" for c in text):
+    raise ValueError("Expected letters A-Z, got {!r}.".format(text))
+  return text
@@ -1,4 +1,10 @@
+import hashlib
 import os
+from array import array
+from bisect import bisect_left
+from wordfinder import packed
+from wordfinder.constraints import matches_pattern
+from wordfinder.trie import Trie
 
 class Dictionary:
   """
@@ -16,18 +22,266 @@ class Dictionary:
     )
   ]
 
-  def __init__(self, file_path=""):
-    words_on_disk = file_path
-    if not words_on_disk:
-      for c in Dictionary.CANDIDATES:
-        if os.path.exists(c):
-          words_on_disk = c
-          break
+  def __init__(self, file_path="", use_cache=True):
+    """
+    file_path (str) -- the word list to load, one word per line. If not
+      given, the first of CANDIDATES that exists is used.
+    use_cache (bool) -- if True, load the word list from its compiled,
+      memory-mapped form (see `wordfinder.packed`), compiling it first if
+      needed. If False, or if the compiled form is unavailable, the
+      text file is read directly.
+    """
+    words_on_disk = file_path or Dictionary.default_path()
 
-    self.dictionary_words = set()
     self.path = words_on_disk
-    with open(words_on_disk) as f:
-      self.dictionary_words = { w.upper() for w in f.read().splitlines()}
+    # All words in the dictionary, upper-cased, sorted and unique
+    self.words = packed.load(words_on_disk) if use_cache else None
+    if self.words is None:
+      with open(words_on_disk) as f:
+        self.words = sorted({ w.upper() for w in f.read().splitlines()})
+    self._digest = None
+    self._dictionary_words = None
+    self._trie = None
+    self._index = None
+
+  @staticmethod
+  def default_path():
+    """Return the first of CANDIDATES that exists, or "" if none do."""
+    for c in Dictionary.CANDIDATES:
+      if os.path.exists(c):
+        return c
+    return ""
+
+  def __getstate__(self):
+    # The index and trie may hold views into a memory-mapped file, which
+    # can't be pickled; they are rebuilt on first use instead.
+    state = dict(self.__dict__)
+    state["_index"] = None
+    state["_trie"] = None
+    return state
+
+  def digest(self):
+    """
+    Return a SHA-256 digest identifying the words in the dictionary, so
+    results found with it can be recognised later. For a compiled word
+    list this is the digest of its source, so costs nothing.
+    """
+    if self._digest is None:
+      if isinstance(self.words, packed.PackedWords):
+        self._digest = self.words.source_digest
+      else:
+        self._digest = hashlib.sha256(
+          "\n".join(self.words).encode("utf-8")
+        ).digest()
+    return self._digest
+
+  @property
+  def dictionary_words(self):
+    """The words in the dictionary as a set, built on first use."""
+    if self._dictionary_words is None:
+      self._dictionary_words = set(self.words)
+    return self._dictionary_words
 
   def contains(self, word):
-    return word.upper() in self.dictionary_words
+    word = word.upper()
+    i = bisect_left(self.words, word)
+    return i < len(self.words) and self.words[i] == word
+
+  def trie(self, length=None, letter_counts=None, pattern=""):
+    """
+    Return a prefix Trie, which searches use to abandon paths as soon as
+    their letters stop being a prefix of a word they could find.
+
+    With no arguments, the trie holds every word in the dictionary, and
+    is built on first use. Given a `length` and `letter_counts`, it only
+    holds the words `feasible_words` returns that also fit `pattern` (see
+    `wordfinder.constraints`), and None is returned if there are none.
+    """
+    if length is None:
+      if self._trie is None:
+        self._trie = Trie(self.words)
+      return self._trie
+    words = self.feasible_words(length, letter_counts)
+    if pattern:
+      pattern = pattern.upper()
+      words = [w for w in words if matches_pattern(w, pattern)]
+    return Trie(words) if words else None
+
+  def _word_index(self):
+    """Return the (masks, order, starts) index of `packed.build_index`."""
+    if self._index is None:
+      if isinstance(self.words, packed.PackedWords):
+        self._index = self.words.index()
+      else:
+        self._index = packed.build_index(self.words)
+    return self._index
+
+  def words_of_length(self, length):
+    """Return a sorted list of the words with exactly `length` letters."""
+    (masks, order, starts) = self._word_index()
+    if not 0 <= length < len(starts) - 1:
+      return []
+    return [self.words[i] for i in order[starts[length]:starts[length + 1]]]
+
+  def feasible_words(self, length, letter_counts):
+    """
+    Return a sorted list of the words with exactly `length` letters that
+    can be spelled using the given letters, each no more times than it
+    is available.
+
+    letter_counts (dict of str to int) -- the number of times each
+      upper-case letter is available, e.g. the letters on a board.
+
+    Words using a letter that isn't available at all are ruled out by
+    comparing letter masks, without decoding them; only the remaining
+    words have their letter counts checked.
+    """
+    (masks, order, starts) = self._word_index()
+    if not 0 <= length < len(starts) - 1:
+      return []
+    unavailable = ~packed.letter_mask(
+      "".join(l for (l, n) in letter_counts.items() if n > 0)
+    )
+    feasible = []
+    for i in order[starts[length]:starts[length + 1]]:
+      if masks[i] & unavailable:
+        continue
+      word = self.words[i]
+      if all(word.count(l) <= letter_counts.get(l, 0) for l in set(word)):
+        feasible.append(word)
+    return feasible
+
+def load_dictionary(file_paths=(), exclude_paths=(), intersect=False):
+  """
+  Return a Dictionary of the word list at the single path in
+  `file_paths`, or a CompositeDictionary combining several. With no
+  paths, the default word list is used.
+  """
+  file_paths = [p for p in file_paths if p] or [Dictionary.default_path()]
+  if len(file_paths) == 1 and not exclude_paths:
+    return Dictionary(file_paths[0])
+  return CompositeDictionary(file_paths, exclude_paths, intersect)
+
+
+class CompositeDictionary(Dictionary):
+  """
+  Combines several word lists into one dictionary: the union of the
+  included lists (or their intersection, if `intersect` is True), less
+  any word in an excluded list.
+
+  Every word in any of the lists is stored once, in a merged compiled
+  file that is memory-mapped and so shared between processes (see
+  `packed.load_merged`), along with flags saying which lists each word
+  is in. Whether a combination of flags is accepted is worked out once
+  for every combination, so a lookup is one binary search and one
+  table lookup however many lists there are.
+  """
+
+  # The most word lists that can be combined, so the acceptance table
+  # stays small
+  MAX_SOURCES = 16
+
+  def __init__(
+      self, file_paths, exclude_paths=(), intersect=False, use_cache=True
+  ):
+    """
+    file_paths (list of str) -- the word lists to include.
+    exclude_paths (list of str) -- word lists whose words are excluded.
+    intersect (bool) -- if True, only words in every included list are
+      accepted, rather than words in any of them.
+    use_cache (bool) -- as for `Dictionary`.
+    """
+    self.paths = list(file_paths) + list(exclude_paths)
+    if not file_paths:
+      raise ValueError("At least one word list must be included.")
+    if len(self.paths) > CompositeDictionary.MAX_SOURCES:
+      raise ValueError("At most {} word lists can be combined.".format(
+        CompositeDictionary.MAX_SOURCES
+      ))
+    self.path = ",".join(self.paths)
+    self.words = packed.load_merged(self.paths) if use_cache else None
+    self._flags = None
+    if self.words is None:
+      word_lists = []
+      for path in self.paths:
+        with open(path) as f:
+          word_lists.append(sorted({w.upper() for w in f.read().splitlines()}))
+      (self.words, self._flags) = packed.merge_words(word_lists)
+
+    # accept[flags] is 1 if a word with those source flags is accepted
+    included = (1 << len(file_paths)) - 1
+    excluded = ((1 << len(self.paths)) - 1) & ~included
+    self.accept = bytearray(1 << len(self.paths))
+    for flags in range(len(self.accept)):
+      if flags & excluded:
+        continue
+      if (flags & included == included) if intersect else (flags & included):
+        self.accept[flags] = 1
+    self._digest = None
+    self._dictionary_words = None
+    self._trie = None
+    self._index = None
+
+  def digest(self):
+    # The merged words' digest covers every list, but not how they are
+    # combined
+    if self._digest is None:
+      if isinstance(self.words, packed.PackedWords):
+        words_digest = self.words.source_digest
+      else:
+        words_digest = hashlib.sha256(
+          "\n".join(self.words).encode("utf-8") + self.flags.tobytes()
+        ).digest()
+      self._digest = hashlib.sha256(words_digest + self.accept).digest()
+    return self._digest
+
+  @property
+  def flags(self):
+    """The source flags of each word in `words`."""
+    return self._flags if self._flags is not None else self.words.flags
+
+  def accepts(self, i):
+    """True if the i'th word of `words` is accepted."""
+    return self.accept[self.flags[i]] == 1
+
+  @property
+  def dictionary_words(self):
+    if self._dictionary_words is None:
+      self._dictionary_words = {
+        w for (i, w) in enumerate(self.words) if self.accepts(i)
+      }
+    return self._dictionary_words
+
+  def contains(self, word):
+    word = word.upper()
+    i = bisect_left(self.words, word)
+    return i < len(self.words) and self.words[i] == word and self.accepts(i)
+
+  def trie(self, length=None, letter_counts=None, pattern=""):
+    if length is not None:
+      # feasible_words only returns accepted words
+      return Dictionary.trie(self, length, letter_counts, pattern)
+    if self._trie is None:
+      self._trie = Trie(sorted(self.dictionary_words))
+    return self._trie
+
+  def _word_index(self):
+    """
+    Return the index of `packed.build_index` for the merged words, with
+    words that aren't accepted left out of `order`.
+    """
+    if self._index is None:
+      if isinstance(self.words, packed.PackedWords):
+        (masks, order, starts) = self.words.index()
+      else:
+        (masks, order, starts) = packed.build_index(self.words)
+      (accept, flags) = (self.accept, self.flags)
+      accepted = array("I")
+      accepted_starts = array("I", [0])
+      for n in range(len(starts) - 1):
+        accepted.extend(
+          i for i in order[starts[n]:starts[n + 1]] if accept[flags[i]]
+        )
+        accepted_starts.append(len(accepted))
+      self._index = (masks, accepted, accepted_starts)
+    return self._index
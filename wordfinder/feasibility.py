@@ -0,0 +1,156 @@
+"""
+Rule out multi-word searches from the letters left on the board alone.
+
+Whatever paths the board allows, the words of a solution must between
+them use no more of each letter than the board has. LetterFeasibility
+keeps, for each word length, the distinct letter multisets of the
+dictionary words the board could make, and answers whether some choice
+of words of the remaining lengths fits in a given multiset of letters.
+The solver asks this for the letters left over by each first word, and
+skips the word without walking the board if no such choice exists.
+When the words must use every letter, most dead subtrees are cut off
+this way.
+
+Letter multisets are bytes of 26 counts, one per letter A-Z. Answers
+are memoized on the multiset and the remaining lengths, so the many
+first words that leave the same letters are only checked once.
+"""
+
+_A = ord("A")
+
+def letter_counts(letters):
+  """
+  Return the multiset of the upper-case letters A-Z in `letters` (a str
+  or bytes), as bytes of 26 counts. Anything else is ignored.
+  """
+  if isinstance(letters, str):
+    letters = letters.encode("ascii", "ignore")
+  counts = bytearray(26)
+  for b in letters.upper():
+    if _A <= b < _A + 26:
+      counts[b - _A] += 1
+  return bytes(counts)
+
+
+class LetterFeasibility:
+  """
+  Answers whether words of given lengths can be made from a multiset of
+  letters, see above.
+  """
+
+  def __init__(self, words_by_length):
+    """
+    words_by_length (dict of int to sequence of str) -- the upper-case
+      words to choose from for each length.
+    """
+    # For each length, the distinct multisets of its words, each as a
+    # tuple (letter mask, tuple of (letter index, count) pairs). The mask
+    # rules out most multisets without looking at the counts.
+    self.multisets = {}
+    for (length, words) in words_by_length.items():
+      multisets = set()
+      for word in words:
+        pairs = tuple(
+          (i, n) for (i, n) in enumerate(letter_counts(word)) if n
+        )
+        mask = 0
+        for (i, _) in pairs:
+          mask |= 1 << i
+        multisets.add((mask, pairs))
+      # Sorted, so the search order is the same on every run
+      self.multisets[length] = sorted(multisets)
+    self._memo = {}
+    self._fits = {}
+
+  def solvable(self, counts, word_lengths):
+    """
+    True if words of every length in `word_lengths` can be chosen that
+    together use no more of each letter than `counts` holds.
+    """
+    if sum(word_lengths) > sum(counts):
+      return False
+    # Order doesn't matter, so the lengths are sorted to share answers
+    return self._solvable(
+      counts, tuple(sorted(word_lengths, reverse=True)), self.multisets
+    )
+
+  def leaves_solvable(self, counts, word, word_lengths):
+    """
+    True if, once the letters of `word` are taken from `counts`, the
+    rest are `solvable` for `word_lengths`.
+    """
+    rest = bytearray(counts)
+    for b in word.encode("ascii", "ignore").upper():
+      rest[b - _A] -= 1
+    if sum(word_lengths) > sum(rest):
+      return False
+    # Only the multisets that fit `counts` can fit what's left of it, and
+    # they're shared by every word taken from the same letters
+    candidates = self._fits.get(counts)
+    if candidates is None:
+      candidates = self._fits[counts] = {
+        length: _fitting(counts, multisets)
+        for (length, multisets) in self.multisets.items()
+      }
+    return self._solvable(
+      bytes(rest), tuple(sorted(word_lengths, reverse=True)), candidates
+    )
+
+  def _solvable(self, counts, word_lengths, candidates):
+    """
+    `candidates` maps each length to the multisets that might still fit,
+    a superset of those that fit `counts`, since letters are only ever
+    taken away.
+    """
+    if not word_lengths:
+      return True
+    key = (counts, word_lengths)
+    answer = self._memo.get(key)
+    if answer is not None:
+      return answer
+
+    fits = {}
+    for length in set(word_lengths):
+      fits[length] = _fitting(counts, candidates.get(length, ()))
+      if not fits[length]:
+        self._memo[key] = False
+        return False
+
+    if sum(counts) == sum(word_lengths):
+      # Every letter must be used, so some word must use the letter that
+      # the fewest words can; only those words need trying
+      uses = [[] for _ in range(26)]
+      for (length, multisets) in fits.items():
+        for m in multisets:
+          for (i, _) in m[1]:
+            uses[i].append((length, m))
+      choices = min(
+        (uses[i] for (i, n) in enumerate(counts) if n), key=len
+      )
+    else:
+      length = word_lengths[0]
+      choices = [(length, m) for m in fits[length]]
+
+    answer = False
+    for (length, m) in choices:
+      rest = bytearray(counts)
+      for (i, n) in m[1]:
+        rest[i] -= n
+      rest_lengths = list(word_lengths)
+      rest_lengths.remove(length)
+      if self._solvable(bytes(rest), tuple(rest_lengths), fits):
+        answer = True
+        break
+    self._memo[key] = answer
+    return answer
+
+def _fitting(counts, multisets):
+  """Return the multisets, as kept by LetterFeasibility, within `counts`."""
+  missing = 0
+  for (i, n) in enumerate(counts):
+    if not n:
+      missing |= 1 << i
+  return [
+    m for m in multisets
+    if not m[0] & missing and all(counts[i] >= n for (i, n) in m[1])
+  ]
@@ -0,0 +1,144 @@
+from wordfinder.board import Board
+from wordfinder.cell_path import CellPath
+
+class IncrementalSolver:
+  """
+  Keeps the words of one length found in a board up to date as words
+  are removed from it, as in a live game where the board changes a
+  little each turn.
+
+  Removing a word only changes the cells it used and the cells above
+  them in the same columns. A path's word depends only on the letters
+  of its own cells, so the paths that touch no changed cell are kept as
+  they are, and those whose letters all fell the same distance are
+  moved down with them. Only paths mixing letters that fell different
+  distances are searched for, abandoning a partial path as soon as no
+  such letter is within its reach, so the work done per turn depends on
+  the edges of the change, not the size of the board.
+  """
+
+  def __init__(self, matrix, length, prefix="", dictionary=None, stats=None):
+    """
+    matrix (LetterMatrix or Board) -- the starting board.
+    length (int), prefix (str), dictionary (Dictionary) -- as for
+      `LetterMatrix.find_word_coords`.
+    stats (SearchStats) -- if given, search counters are added to it.
+    """
+    if isinstance(matrix, Board):
+      self.board = matrix
+    else:
+      self.board = Board.from_matrix(matrix)
+    self.length = length
+    self.prefix = prefix
+    self.stats = stats
+    # Letters are only ever removed, so words that can't be spelled from
+    # the starting letters never need to be searched for
+    self.trie = None
+    if dictionary:
+      self.trie = dictionary.trie(length, self.board.letter_counts(), prefix)
+    # With a dictionary but no words it could find, there's no search
+    self._searching = not dictionary or self.trie is not None
+    # The paths found, and those found through each cell
+    self._paths = set()
+    self._paths_by_cell = [set() for _ in self.board.cells]
+    if self._searching:
+      self._add_paths(self.board.iter_cell_paths(
+        length, prefix, self.trie, stats
+      ))
+
+  def __len__(self):
+    return len(self._paths)
+
+  def matrix(self):
+    """Return a new LetterMatrix holding the current letters."""
+    return self.board.to_matrix()
+
+  def word_coords(self):
+    """
+    Return a sorted list of the coordinate lists of the words in the
+    current board, as `LetterMatrix.find_word_coords` would.
+    """
+    return sorted(
+      [self.board.coords(i) for i in path] for path in self._paths
+    )
+
+  def words(self):
+    """
+    Return a sorted list of the words in the current board, as
+    `LetterMatrix.find_words` would.
+    """
+    return sorted(self.board.word_at_cells(path) for path in self._paths)
+
+  def remove_word(self, coords):
+    """
+    Remove the letters at the given coordinates and collapse the
+    columns, as `LetterMatrix.remove_word` does, then update the words
+    found. Returns the set of flat indices of the cells that changed.
+    """
+    old_board = self.board
+    self.board = old_board.remove_word(coords)
+    changed = {
+      i for (i, (old, new)) in enumerate(zip(old_board.cells, self.board.cells))
+      if old != new
+    }
+    if not changed or not self._searching:
+      return changed
+    if isinstance(coords, CellPath):
+      removed = set(coords.cells)
+    else:
+      removed = {old_board.index(r, c) for (r, c) in coords}
+    origins = _origins(old_board, removed)
+    moves = {
+      old: new for (new, old) in enumerate(origins)
+      if old is not None and old != new
+    }
+
+    # A path whose letters all fell by the same number of rows still
+    # spells its word where they landed, so it is moved along with them.
+    # Any other path through a removed or moved cell is dropped.
+    stale = set()
+    for i in removed | set(moves):
+      stale |= self._paths_by_cell[i]
+    kept = []
+    for path in stale:
+      self._paths.discard(path)
+      for i in path:
+        self._paths_by_cell[i].discard(path)
+      moved = tuple(moves.get(i, i) for i in path)
+      if not removed.intersection(path) and \
+         len({new - old for (old, new) in zip(path, moved)}) == 1:
+        kept.append(moved)
+    self._add_paths(kept)
+
+    # The only new paths are those mixing letters that fell different
+    # distances, or none, so the search abandons a path as soon as it
+    # can no longer reach a letter that fell a different distance
+    falls = [
+      None if old is None else new - old for (new, old) in enumerate(origins)
+    ]
+    self._add_paths(self.board.iter_cell_paths(
+      self.length, self.prefix, self.trie, self.stats, regions=falls
+    ))
+    return changed
+
+  def _add_paths(self, paths):
+    for path in paths:
+      self._paths.add(path)
+      for i in path:
+        self._paths_by_cell[i].add(path)
+
+def _origins(board, removed):
+  """
+  Return a list holding, for each cell of `board` once the cells in
+  `removed` are taken out and the columns collapsed, the cell its letter
+  came from, or None if it is empty.
+  """
+  origins = [None] * len(board.cells)
+  for c in range(board.columns):
+    kept = [
+      i for i in range(c, len(board.cells), board.columns)
+      if board.cells[i] and i not in removed
+    ]
+    for (r, i) in enumerate(kept):
+      origins[board.index(r, c)] = i
+  return origins
@@ -1,26 +1,28 @@
-import re
-import copy
+import string
+from collections import Counter
+from wordfinder.adjacency import NEIGHBOR_TRANSFORMS, neighbor_coords
+from wordfinder.cell_path import CellPath, CellPathList
+from wordfinder.constraints import WILDCARD
 
 class LetterMatrix:
   """
   Represents a two-dimensional array in which each element is either
   a single letter or the empty string. 
   """
-  LETTER_REGEX = re.compile('^[A-Za-z]?$')
-
-  NEIGHBOR_TRANSFORMS = [
-    (-1, -1),
-    (-1, 0),
-    (-1, 1),
-    (0, -1),
-    (0, 1),
-    (1, -1),
-    (1, 0),
-    (1, 1),
-  ]
-
-  def __init__(self, matrix):
-    LetterMatrix.validate(matrix)
+  # Every valid element, for validating with a set lookup per element
+  VALID_ELEMENTS = frozenset([''] + list(string.ascii_letters))
+
+  NEIGHBOR_TRANSFORMS = NEIGHBOR_TRANSFORMS
+
+  def __init__(self, matrix, validate=True):
+    """
+    matrix (list of lists of str) -- the elements, by row.
+    validate (bool) -- whether to check the matrix meets the
+      requirements of `validate`. Only skip this for matrices that are
+      already known to be valid.
+    """
+    if validate:
+      LetterMatrix.validate(matrix)
     self.matrix = matrix
     # TODO control whether columns are collapsed at an instance level?
 
@@ -39,14 +41,16 @@ class LetterMatrix:
     if len(row_lengths) > 1:
       raise InvalidLetterMatrixException("All rows must be the same length.")
 
-    for row in matrix:
+    valid = LetterMatrix.VALID_ELEMENTS
+    for (r, row) in enumerate(matrix):
       # Guard against `row` being a multi-character string
       if not isinstance(row, list):
         raise InvalidLetterMatrixException("Matrix must be a list of lists.")
-      for elm in row:
-        if not LetterMatrix.LETTER_REGEX.match(elm):
+      for (c, elm) in enumerate(row):
+        if not isinstance(elm, str) or elm not in valid:
           raise InvalidLetterMatrixException(
-            "Only single letters are permitted, {} is invalid.".format(elm)
+            "Only single letters are permitted, {!r} at row {}, column {} "
+            "is invalid.".format(elm, r + 1, c + 1)
           )
     return True
 
@@ -72,6 +76,10 @@ class LetterMatrix:
     the letters at those locations."""
     return "".join(self.elements(coords))
 
+  def letter_counts(self):
+    """Return a Counter of the upper-case letters in the matrix."""
+    return Counter(elm.upper() for row in self.matrix for elm in row if elm)
+
   def exists(self, r, c):
     """Return True if an element exists at the given coordinates, that
     is, if the given coordinates are within the matrix."""
@@ -89,29 +97,59 @@ class LetterMatrix:
     Adjacent elements include those diagonal to the given one, so each
     element has a minimum of 0 and a maximum of 8 neightbors.
     """
-    neighbors_arr = []
-    for t in LetterMatrix.NEIGHBOR_TRANSFORMS:
-      candidate = (r + t[0], c + t[1])
-      if self.is_letter(candidate[0], candidate[1]):
-        neighbors_arr.append(candidate)
-    return neighbors_arr
+    matrix = self.matrix
+    return [
+      (nr, nc)
+      for (nr, nc) in neighbor_coords(len(matrix), len(matrix[0]))[r][c]
+      if matrix[nr][nc]
+    ]
 
-  def find_words(self, length, prefix="", dictionary=None):
+  def find_words(
+      self, length, prefix="", dictionary=None, stats=None, unique=False,
+      budget=None
+  ):
     """
     Return a sorted list of all strings of the given length that can be 
     made by combining the letters in the matrix, following these rules:
      - The first letter in the word can be any element in the matrix
      - Adjacent letters in the word must be neighbors in the matrix
      - Each element in the matrix can be used only once
-     - The word must begin with the given prefix. If the prefix is 
-       longer than the desired word length no solutions will exist.
+     - The word must begin with the given prefix, in which a "." 
+       stands for any letter. If the prefix is longer than the desired
+       word length no solutions will exist.
      - If a dictionary is given, the word must appear in it.
+
+    A word is listed once for each way of making it, unless `unique` is
+    True. `stats` and `budget` are as for `find_word_coords`.
+    """
+    return sorted(self.iter_words(
+      length, prefix, dictionary, stats, unique, budget
+    ))
+
+  def iter_words(
+      self, length, prefix="", dictionary=None, stats=None, unique=False,
+      budget=None
+  ):
     """
-    return sorted(
-      [self.word_at(w) for w in self.find_word_coords(length, prefix, dictionary)]
+    Like `find_words`, but lazily yield each word as it is found, in 
+    search order rather than sorted order.
+    """
+    seen = set()
+    coords_list = self.iter_word_coords(
+      length, prefix, dictionary, stats, budget
     )
+    for coords in coords_list:
+      word = self.word_at(coords)
+      if unique:
+        if word in seen:
+          continue
+        seen.add(word)
+      yield word
 
-  def find_word_coords(self, length, prefix="", dictionary=None):
+  def find_word_coords(
+      self, length, prefix="", dictionary=None, stats=None, budget=None,
+      compact=False
+  ):
     """
     Return a list of coordinate lists of the given length that correspond
     to words that can be made by combining the letters in the matrix, 
@@ -119,35 +157,85 @@ class LetterMatrix:
      - The first element in the word can be any element in the matrix
      - Adjacent elements in the word must be neighbors in the matrix
      - Each element in the matrix can be used only once
-     - The word must begin with the given prefix. If the prefix is 
-       longer than the desired word length no solutions will exist.
+     - The word must begin with the given prefix, in which a "." 
+       stands for any letter. If the prefix is longer than the desired
+       word length no solutions will exist.
      - If a dictionary is given, the word must appear in it.
 
     This is similar to finding words in the matrix, but we return the
     locations of the letters in the word rather than the letters 
     themselves. This is useful because there can be multiple ways to
     make a given word. 
+
+    If a SearchStats is given as `stats`, search counters are added
+    to it. If a SearchBudget is given as `budget`, each element visited
+    is counted against it, and BudgetExceeded is raised if it runs out.
+
+    If `compact` is True, a CellPathList is returned instead of a list,
+    holding every path in a single byte array. This uses an order of
+    magnitude less memory for large result sets.
+    """
+    coords_list = self.iter_word_coords(
+      length, prefix, dictionary, stats, budget
+    )
+    if not compact:
+      return list(coords_list)
+    paths = CellPathList(length, self.row_count(), self.column_count())
+    for coords in coords_list:
+      paths.append(coords)
+    return paths
+
+  def iter_word_coords(
+      self, length, prefix="", dictionary=None, stats=None, budget=None,
+      compact=False
+  ):
     """
-    word_coords = []
+    Like `find_word_coords`, but lazily yield each coordinate list as 
+    it is found. Only the current search path is held in memory, so 
+    this is suitable for very large result sets. If `compact` is True,
+    each is yielded as a CellPath.
+    """
+    if compact:
+      (rows, columns) = (self.row_count(), self.column_count())
+      for coords in self.iter_word_coords(
+          length, prefix, dictionary, stats, budget
+      ):
+        yield CellPath.from_coords(coords, rows, columns)
+      return
+    trie = None
+    if dictionary:
+      # Only search for words that can be spelled from our letters and
+      # fit the pattern, so paths that can't reach the end of the
+      # pattern are abandoned early too
+      trie = dictionary.trie(length, self.letter_counts(), prefix)
+      if trie is None:
+        if stats is not None:
+          stats.prunes["infeasible"] += 1
+        return
+    prefix = prefix.upper()
     for row in range(self.row_count()):
       for col in range(self.column_count()):
         if self.is_letter(row, col):
-          potential_word_coords = self._rec_find_word_coords(
-            length, row, col, {(row, col)}, prefix
+          node = None
+          if trie:
+            node = trie.child(trie.root(), self.element(row, col).upper())
+            if stats is not None:
+              stats.lookups += 1
+              stats.prunes["dictionary"] += node is None
+            if node is None:
+              continue
+          yield from self._rec_find_word_coords(
+            length, row, col, {(row, col)}, prefix, trie, node, stats,
+            budget
           )
-          if dictionary:
-            potential_word_coords = [ 
-              w for w in potential_word_coords if dictionary.contains(self.word_at(w)) 
-            ]
-          word_coords += potential_word_coords
-    return word_coords
 
   def _rec_find_word_coords(
-      self, length, start_row, start_col, used_coords, prefix
+      self, length, start_row, start_col, used_coords, prefix,
+      trie=None, node=None, stats=None, budget=None, path=None
   ):
     """
-    Find word locations in the matrix as described in `find_word_coords` 
-    matching the given requirements.
+    Generate word locations in the matrix as described in 
+    `find_word_coords` matching the given requirements.
 
     length (int) -- Return words of exactly this length
     start_row (int), start_col (int) -- the coordinates of the letter
@@ -155,33 +243,81 @@ class LetterMatrix:
       letter.
     used_coords (set of (int, int)) -- Contains the coordinates used 
       already in this word, which shouldn't be reused.
-    prefix (str) -- words must begin with this prefix. If the prefix
-      is longer than the desired word length, no solutions will exist.
+    prefix (str) -- words must begin with this prefix, where WILDCARD
+      stands for any letter. If the prefix is longer than the
+      word, no solutions will exist.
+    trie (Trie) -- if given, only paths spelling words in this trie are
+      returned, and we stop extending a path as soon as its letters are
+      not a prefix of any word.
+    node -- the trie node for the letters of the path so far, including
+      the letter at (start_row, start_col). Required if `trie` is given.
+    stats (SearchStats) -- if given, search counters are added to it.
+    budget (SearchBudget) -- if given, each element visited is counted
+      against it.
+    path (list of (int, int)) -- the coordinates of the path so far,
+      ending with (start_row, start_col). `length` counts the letters
+      from there on, and the letter there is checked against the prefix
+      at its depth in the path.
+
+    `used_coords` and `path` are shared by the whole search, with each
+    level adding its element before descending and removing it after,
+    so a path is only copied when it is yielded.
     """
-    word_coords = []
+    if path is None:
+      path = [(start_row, start_col)]
     head_letter = self.element(start_row, start_col)
+    if budget is not None:
+      budget.spend()
+    if stats is not None:
+      stats.nodes += 1
+      stats.max_path_depth = max(stats.max_path_depth, len(used_coords))
 
-    if len(prefix) > length:
+    depth = len(path) - 1
+    if len(prefix) > depth + length:
       # Short circuit if prefix length means there are no valid solutions
-      pass
-    elif prefix and prefix[0].upper() != head_letter.upper():
+      return
+    elif depth < len(prefix) and prefix[depth] != WILDCARD and \
+         prefix[depth].upper() != head_letter.upper():
       # Short circuit if this path doesn't result in words that 
       # match our prefix
-      pass
+      if stats is not None:
+        stats.prunes["prefix"] += 1
+      return
     elif length == 1:
-      word_coords += [[(start_row, start_col)]]
+      if stats is not None:
+        stats.paths += 1
+        stats.lookups += trie is not None
+      if trie is None or trie.is_word(node):
+        yield list(path)
+      elif stats is not None:
+        stats.prunes["dictionary"] += 1
     elif length > 1:
       for (r, c) in self.neighbors(start_row, start_col):
         if (r, c) not in used_coords:
-          tails = self._rec_find_word_coords(
+          next_node = None
+          if trie:
+            next_node = trie.child(node, self.element(r, c).upper())
+            if stats is not None:
+              stats.lookups += 1
+              stats.prunes["dictionary"] += next_node is None
+            if next_node is None:
+              # No dictionary word continues this way
+              continue
+          used_coords.add((r, c))
+          path.append((r, c))
+          yield from self._rec_find_word_coords(
             length - 1, 
             r, c, 
-            used_coords | {(r, c)}, 
-            prefix[1:]
+            used_coords, 
+            prefix,
+            trie,
+            next_node,
+            stats,
+            budget,
+            path
           )
-          word_coords += [[(start_row, start_col)] + tail for tail in tails ]
-    
-    return word_coords
+          path.pop()
+          used_coords.discard((r, c))
 
   def remove_word(self, coords, collapse=True):
     """
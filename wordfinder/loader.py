@@ -0,0 +1,143 @@
+"""
+Read boards from files, as CSV, a plain text grid or JSON:
+
+  CSV        C,A,T       one row per line, elements separated by commas,
+             D,,G        with nothing between commas for an empty element
+
+  Grid       CAT         one row per line, one character per element,
+             D.G         with "." for an empty element. Spaces and tabs
+                         between elements are ignored.
+
+  JSON       [["C", "A", "T"], ["D", "", "G"]]
+
+The format is worked out from the contents: JSON starts with "[", and
+anything else with a comma in it is CSV. Blank lines are ignored.
+
+The file is read as bytes and each row is checked in one step, by
+deleting every letter with `bytes.translate` and seeing if anything is
+left, so no per-element regex or string is needed, and the Board used
+by the solver is built directly. Errors give the row and column of the
+first bad element, both counted from 1. The csv and json modules are
+only imported for the files that need them, as most boards are read by
+the command line, where start-up time counts.
+"""
+from string import ascii_letters
+from wordfinder.board import Board
+from wordfinder.letter_matrix import InvalidLetterMatrixException
+
+_LETTERS = ascii_letters.encode("ascii")
+
+# Translates the grid's empty element to a zero byte
+_GRID_EMPTY = bytes.maketrans(b".", b"\0")
+
+def load_board(path):
+  """
+  Read the board file at `path` and return a Board of its letters.
+  Raises InvalidLetterMatrixException if the contents are not a valid
+  letter matrix, or OSError if the file can't be read.
+  """
+  with open(path, "rb") as f:
+    return parse_board(f.read())
+
+def load_matrix(path):
+  """Like `load_board`, but return a LetterMatrix."""
+  return load_board(path).to_matrix()
+
+def parse_board(data):
+  """Return a Board of the letters in `data`, the bytes of a board file."""
+  text = data.lstrip()
+  if text.startswith(b"\xef\xbb\xbf"):
+    # Skip a UTF-8 byte order mark
+    text = text[3:].lstrip()
+  if text.startswith(b"["):
+    return _parse_json(text)
+  lines = [line.rstrip(b"\r") for line in text.split(b"\n")]
+  lines = [line for line in lines if line.strip()]
+  if any(b"," in line for line in lines):
+    if any(b'"' in line for line in lines):
+      # Quoted elements are rare enough to leave to the csv module
+      lines = _unquote_csv(lines)
+    rows = [_csv_row(line, n) for (n, line) in enumerate(lines, start=1)]
+  else:
+    rows = [_grid_row(line, n) for (n, line) in enumerate(lines, start=1)]
+  return _board(rows)
+
+def _csv_row(line, row):
+  elements = line.split(b",")
+  letters = b"".join(elements)
+  # With no empty elements, as many letters as elements means every
+  # element is a single letter
+  if len(letters) == len(elements) and b"" not in elements and \
+     _all_letters(letters):
+    return letters
+  for (column, element) in enumerate(elements, start=1):
+    if len(element) > 1 or not _all_letters(element):
+      _invalid(element, row, column)
+  return b"".join(element or b"\0" for element in elements)
+
+def _grid_row(line, row):
+  line = line.replace(b" ", b"").replace(b"\t", b"")
+  letters = line.translate(_GRID_EMPTY)
+  if not _all_letters(letters.replace(b"\0", b"")):
+    for (column, b) in enumerate(letters, start=1):
+      if b and not _all_letters(bytes([b])):
+        _invalid(bytes([b]), row, column)
+  return letters
+
+def _parse_json(text):
+  import json
+  try:
+    matrix = json.loads(text)
+  except ValueError as e:
+    raise InvalidLetterMatrixException("Invalid JSON: {}".format(e))
+  if not isinstance(matrix, list) or \
+     not all(isinstance(row, list) for row in matrix):
+    raise InvalidLetterMatrixException("Matrix must be a list of lists.")
+  rows = []
+  for (r, elements) in enumerate(matrix, start=1):
+    row = bytearray()
+    for (c, element) in enumerate(elements, start=1):
+      if not isinstance(element, str) or len(element) > 1:
+        _invalid(element, r, c)
+      encoded = element.encode("ascii", "replace")
+      if not _all_letters(encoded):
+        _invalid(element, r, c)
+      row += encoded or b"\0"
+    rows.append(bytes(row))
+  return _board(rows)
+
+def _unquote_csv(lines):
+  """Return the lines of CSV with any quoting removed."""
+  import csv
+  import io
+  reader = csv.reader(io.StringIO(
+    b"\n".join(lines).decode("utf-8", "replace")
+  ))
+  unquoted = []
+  for (row, elements) in enumerate(reader, start=1):
+    for (column, element) in enumerate(elements, start=1):
+      if "," in element:
+        _invalid(element, row, column)
+    unquoted.append(",".join(elements).encode("utf-8"))
+  return unquoted
+
+def _board(rows):
+  columns = len(rows[0]) if rows else 0
+  for (n, row) in enumerate(rows, start=1):
+    if len(row) != columns:
+      raise InvalidLetterMatrixException(
+        "All rows must be the same length, row {} has {} elements but "
+        "row 1 has {}.".format(n, len(row), columns)
+      )
+  return Board(len(rows), columns, b"".join(rows))
+
+def _all_letters(data):
+  return not data.translate(None, _LETTERS)
+
+def _invalid(element, row, column):
+  if isinstance(element, bytes):
+    element = element.decode("utf-8", "replace")
+  raise InvalidLetterMatrixException(
+    "Only single letters are permitted, {!r} at row {}, column {} is "
+    "invalid.".format(element, row, column)
+  )
@@ -0,0 +1,219 @@
+"""
+An optional NumPy-backed Board.
+
+NumpyBoard searches breadth-first: all partial paths of one length are
+held as rows of an integer array, and are extended together using a
+precomputed table of neighbor indices. The cells used by each path are
+a uint64 bitmask. Dictionary pruning encodes each partial word as an
+integer and checks the whole level at once against the encoded
+prefixes of the dictionary words. Removing a word collapses the columns
+with a single stable argsort.
+
+If NumPy isn't installed, or a search falls outside what the batch
+search supports, the pure-Python Board search is used instead. The
+batch search needs boards of at most 64 cells and words of at most
+MAX_WORD_LENGTH letters.
+"""
+from functools import lru_cache
+from wordfinder.adjacency import neighbor_table
+from wordfinder.board import Board
+from wordfinder.constraints import WILDCARD
+
+try:
+  import numpy
+except ImportError:
+  numpy = None
+
+# Partial words are encoded in base 27 in an int64, which fits this many
+# letters.
+MAX_WORD_LENGTH = 13
+
+# The most partial paths to extend in one batch. Larger levels are
+# split, so memory use stays bounded.
+BATCH_SIZE = 1 << 16
+
+def available():
+  """True if NumPy is installed, so NumpyBoard can be used."""
+  return numpy is not None
+
+def board_class(engine="python", cell_count=0):
+  """
+  Return the Board class to use for the given engine: "python",
+  "numpy", or "auto" to use NumPy if it is installed and the board has
+  at most 64 cells. Raises ValueError if "numpy" is asked for but isn't
+  installed.
+  """
+  if engine == "numpy":
+    if not available():
+      raise ValueError("NumPy is not installed.")
+    return NumpyBoard
+  if engine == "auto" and available() and cell_count <= 64:
+    return NumpyBoard
+  if engine not in ("python", "auto"):
+    raise ValueError("Unknown engine {}.".format(engine))
+  return Board
+
+@lru_cache(maxsize=32)
+def neighbor_array(rows, columns):
+  """
+  Return a (cells, 8) array of the neighbor indices of each cell, as in
+  `neighbor_table`, padded with the index `cells`, which refers to an
+  always-empty sentinel cell.
+  """
+  cell_count = rows * columns
+  table = numpy.full((cell_count, 8), cell_count, dtype=numpy.int64)
+  for (i, neighbors) in enumerate(neighbor_table(rows, columns)):
+    table[i, :len(neighbors)] = neighbors
+  return table
+
+@lru_cache(maxsize=32)
+def _prefix_codes(trie, length):
+  """
+  Return, for each depth d from 1 to `length`, a sorted array of the
+  base-27 codes of the first d letters of the words of `length` letters
+  in the trie. Words with characters other than A-Z can't be on a board,
+  and are skipped.
+  """
+  words = [
+    w for w in trie.words
+    if len(w) == length and w.isascii() and w.isalpha()
+  ]
+  codes = numpy.zeros(len(words), dtype=numpy.int64)
+  by_depth = []
+  for d in range(length):
+    letters = numpy.array(
+      [ord(w[d]) - 64 for w in words], dtype=numpy.int64
+    )
+    codes = codes * 27 + letters
+    by_depth.append(numpy.unique(codes))
+  return by_depth
+
+
+class NumpyBoard(Board):
+  """
+  A Board whose searches and column collapses are vectorized with
+  NumPy. It compares equal to, and hashes the same as, a Board with
+  the same letters.
+  """
+  __slots__ = ()
+
+  @staticmethod
+  def from_matrix(matrix):
+    board = Board.from_matrix(matrix)
+    return NumpyBoard(board.rows, board.columns, board.cells)
+
+  def _grid(self):
+    return numpy.frombuffer(self.cells, dtype=numpy.uint8).reshape(
+      self.rows, self.columns
+    )
+
+  def iter_cell_paths(
+      self, length, prefix="", trie=None, stats=None, starts=None,
+      budget=None, regions=None
+  ):
+    cell_count = len(self.cells)
+    if cell_count > 64 or length > MAX_WORD_LENGTH or regions is not None \
+       or (trie is not None and not isinstance(trie.words, list)):
+      # Fall back to the depth-first search
+      yield from Board.iter_cell_paths(
+        self, length, prefix, trie, stats, starts, budget, regions
+      )
+      return
+    if length < 1 or len(prefix) > length:
+      return
+
+    prefix = prefix.upper()
+    # Upper-case letter codes 1-26, with 0 for empty cells and a final
+    # sentinel cell that is always empty.
+    letters = numpy.frombuffer(self.cells.upper(), dtype=numpy.uint8)
+    letters = numpy.append(letters, 0).astype(numpy.int64)
+    letters[letters > 0] -= 64
+    neighbors = neighbor_array(self.rows, self.columns)
+    codes_by_depth = _prefix_codes(trie, length) if trie else None
+
+    if starts is None:
+      starts = numpy.flatnonzero(letters[:cell_count])
+    else:
+      starts = numpy.array(sorted(set(starts)), dtype=numpy.int64)
+      starts = starts[letters[starts] > 0]
+    paths = starts.reshape(-1, 1)
+    used = numpy.left_shift(numpy.uint64(1), starts.astype(numpy.uint64))
+    codes = letters[starts]
+    (paths, used, codes) = self._filter(
+      paths, used, codes, 0, prefix, codes_by_depth, stats
+    )
+    if stats is not None:
+      stats.nodes += len(paths)
+    yield from self._expand(
+      paths, used, codes, length, prefix, letters, neighbors,
+      codes_by_depth, stats, budget
+    )
+
+  def _filter(self, paths, used, codes, depth, prefix, codes_by_depth, stats):
+    """Keep only the paths whose letter at `depth` is allowed."""
+    keep = numpy.ones(len(paths), dtype=bool)
+    if depth < len(prefix) and prefix[depth] != WILDCARD:
+      keep &= (codes % 27) == ord(prefix[depth]) - 64
+      if stats is not None:
+        stats.prunes["prefix"] += int(len(keep) - keep.sum())
+    if codes_by_depth is not None:
+      before = int(keep.sum())
+      keep &= numpy.isin(codes, codes_by_depth[depth], assume_unique=False)
+      if stats is not None:
+        stats.lookups += before
+        stats.prunes["dictionary"] += before - int(keep.sum())
+    return (paths[keep], used[keep], codes[keep])
+
+  def _expand(
+      self, paths, used, codes, length, prefix, letters, neighbors,
+      codes_by_depth, stats, budget
+  ):
+    depth = paths.shape[1]
+    if budget is not None:
+      budget.spend(len(paths))
+    if stats is not None and len(paths):
+      stats.max_path_depth = max(stats.max_path_depth, depth)
+    if depth == length:
+      if stats is not None:
+        stats.paths += len(paths)
+      for path in paths.tolist():
+        yield tuple(path)
+      return
+
+    for start in range(0, len(paths), BATCH_SIZE):
+      batch = slice(start, start + BATCH_SIZE)
+      (b_paths, b_used, b_codes) = (paths[batch], used[batch], codes[batch])
+      candidates = neighbors[b_paths[:, -1]]
+      free = numpy.right_shift(
+        b_used[:, None], candidates.astype(numpy.uint64)
+      ) & numpy.uint64(1)
+      valid = (letters[candidates] > 0) & (free == 0)
+      (rows, slots) = numpy.nonzero(valid)
+      cells = candidates[rows, slots]
+
+      next_paths = numpy.concatenate(
+        [b_paths[rows], cells.reshape(-1, 1)], axis=1
+      )
+      next_used = b_used[rows] | numpy.left_shift(
+        numpy.uint64(1), cells.astype(numpy.uint64)
+      )
+      next_codes = b_codes[rows] * 27 + letters[cells]
+      (next_paths, next_used, next_codes) = self._filter(
+        next_paths, next_used, next_codes, depth, prefix, codes_by_depth,
+        stats
+      )
+      if stats is not None:
+        stats.nodes += len(next_paths)
+      yield from self._expand(
+        next_paths, next_used, next_codes, length, prefix, letters,
+        neighbors, codes_by_depth, stats, budget
+      )
+
+  def remove_cells(self, cells):
+    grid = self._grid().copy()
+    flat = grid.reshape(-1)
+    flat[list(cells)] = 0
+    # Stable sort each column so letters keep their order but come first
+    order = numpy.argsort(grid == 0, axis=0, kind="stable")
+    grid = numpy.take_along_axis(grid, order, axis=0)
+    return NumpyBoard(self.rows, self.columns, grid.tobytes())
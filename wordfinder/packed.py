@@ -0,0 +1,340 @@
+"""
+A compiled, memory-mapped format for word lists.
+
+Reading and upper-casing a large word list dominates the start-up time
+of short solves. Instead, each word list is compiled once into a packed
+file holding its words sorted and upper-cased, and later runs map that
+file into memory rather than parsing the text again. A compiled file
+records the size and modification time of its source, and is rebuilt
+automatically when the source changes.
+
+Alongside the words, a compiled file stores an index used to rule out
+words that can't be spelled from a board's letters (see `build_index`).
+
+File layout (integers in native byte order, since compiled files are
+specific to the machine that built them):
+  MAGIC
+  HEADER: source size, source mtime (ns), word count, blob length,
+    longest word length, SHA-256 digest of the source contents
+  word count + 1 offsets (uint32) into the blob
+  word count letter masks (uint32)
+  word count word indices (uint32), ordered by word length
+  longest word length + 2 starts (uint32) into the ordered indices
+  blob: the words, encoded as UTF-8 and concatenated
+
+Several word lists can also be merged into one compiled file (see
+`load_merged`), with MERGED_MAGIC in place of MAGIC. Its words are
+every word in any of the lists, stored once, and a table of word count
+source flags (uint32) comes just before the blob, with bit i of a
+word's flags set if it is in the i'th list. The header's source size
+and mtime are 0, and its digest covers the digests of every list, so a
+merged file is rebuilt under a new name whenever any list changes.
+
+The cache directory holds one compiled file per word list path, each
+rebuilt in place. Merged files, each a full copy of its lists' words,
+would otherwise pile up with every new combination of lists and every
+change to one, so only the MAX_MERGED most recently used are kept.
+"""
+import hashlib
+import heapq
+import mmap
+import os
+import struct
+from array import array
+
+MAGIC = b"WFDICT02"
+MERGED_MAGIC = b"WFMERG01"
+HEADER = struct.Struct("=QQIQI32s")
+
+# The most merged files to keep in the cache directory
+MAX_MERGED = 8
+
+# The letter mask of words containing anything other than A-Z, which
+# can never be made from a board.
+NO_MASK = 0xFFFFFFFF
+
+def letter_mask(letters):
+  """
+  Return an int with bit i set if the upper-case string `letters`
+  contains the i'th letter of the alphabet, or NO_MASK if it contains
+  anything other than A-Z.
+  """
+  mask = 0
+  for ch in letters:
+    bit = ord(ch) - 65
+    if not 0 <= bit < 26:
+      return NO_MASK
+    mask |= 1 << bit
+  return mask
+
+def build_index(words):
+  """
+  Return a tuple (masks, order, starts) of uint32 arrays indexing the
+  sorted sequence `words`:
+    masks -- the letter_mask of each word
+    order -- the index of each word, ordered by word length and then
+      alphabetically
+    starts -- order[starts[n]:starts[n + 1]] are the words of length n
+  """
+  masks = array("I", (letter_mask(w) for w in words))
+  lengths = [len(w) for w in words]
+  order = array("I", sorted(range(len(words)), key=lengths.__getitem__))
+  starts = array("I", bytes(4 * (max(lengths, default=0) + 2)))
+  for n in lengths:
+    starts[n + 1] += 1
+  for n in range(1, len(starts)):
+    starts[n] += starts[n - 1]
+  return (masks, order, starts)
+
+def cache_dir():
+  """
+  Return the directory compiled word lists are stored in. This is
+  $WORDFINDER_CACHE_DIR if set, otherwise a `wordfinder` directory under
+  $XDG_CACHE_HOME or ~/.cache.
+  """
+  path = os.environ.get("WORDFINDER_CACHE_DIR")
+  if not path:
+    base = os.environ.get("XDG_CACHE_HOME") or \
+           os.path.join(os.path.expanduser("~"), ".cache")
+    path = os.path.join(base, "wordfinder")
+  return path
+
+def compiled_path(source_path):
+  """Return where the compiled form of the given word list is stored."""
+  source_path = os.path.abspath(source_path)
+  name = hashlib.sha1(source_path.encode("utf-8")).hexdigest()
+  return os.path.join(cache_dir(), name + ".wfd")
+
+def merged_path(digest):
+  """Return where the merged word lists with the given digest are stored."""
+  return os.path.join(cache_dir(), digest.hex()[:40] + ".wfm")
+
+def compile_words(source_path, target_path):
+  """Compile the word list at `source_path` into a file at `target_path`."""
+  stat = os.stat(source_path)
+  with open(source_path, "rb") as f:
+    contents = f.read()
+  words = sorted(
+    {w.upper() for w in contents.decode("utf-8").splitlines()}
+  )
+  _write(
+    target_path, MAGIC, words, stat.st_size, stat.st_mtime_ns,
+    hashlib.sha256(contents).digest()
+  )
+
+def merge_words(word_lists):
+  """
+  Return a tuple (words, flags) for the given sorted, unique sequences
+  of words: a sorted list of every word in any of them, and a uint32
+  array with bit i of each word's flags set if it is in word_lists[i].
+  """
+  words = []
+  flags = array("I")
+  tagged = [_tag(ws, 1 << i) for (i, ws) in enumerate(word_lists)]
+  for (word, flag) in heapq.merge(*tagged):
+    if words and words[-1] == word:
+      flags[-1] |= flag
+    else:
+      words.append(word)
+      flags.append(flag)
+  return (words, flags)
+
+def _tag(words, flag):
+  for word in words:
+    yield (word, flag)
+
+def _write(target_path, magic, words, source_size, source_mtime_ns, digest,
+           flags=None):
+  encoded = [w.encode("utf-8") for w in words]
+  offsets = array("I", [0])
+  for w in encoded:
+    offsets.append(offsets[-1] + len(w))
+  blob = b"".join(encoded)
+  (masks, order, starts) = build_index(words)
+
+  directory = os.path.dirname(target_path)
+  os.makedirs(directory, exist_ok=True)
+  # Write to a temporary file first, so readers never see a partial file.
+  # Only rebuilding the file needs tempfile, so it isn't imported on
+  # every start-up.
+  import tempfile
+  (fd, tmp_path) = tempfile.mkstemp(dir=directory, suffix=".tmp")
+  try:
+    with os.fdopen(fd, "wb") as out:
+      out.write(magic)
+      out.write(HEADER.pack(
+        source_size, source_mtime_ns, len(words), len(blob),
+        len(starts) - 2, digest
+      ))
+      tables = [offsets, masks, order, starts]
+      if flags is not None:
+        tables.append(flags)
+      for table in tables:
+        out.write(table.tobytes())
+      out.write(blob)
+    os.replace(tmp_path, target_path)
+  except BaseException:
+    os.remove(tmp_path)
+    raise
+
+def load(source_path):
+  """
+  Return a PackedWords for the word list at `source_path`, compiling it
+  first if there is no up-to-date compiled copy. Returns None if the
+  compiled copy can't be built or read, for example because the cache
+  directory isn't writable.
+  """
+  target_path = compiled_path(source_path)
+  try:
+    words = PackedWords(target_path)
+    if words.is_current(source_path):
+      return words
+    words.close()
+  except (OSError, ValueError):
+    pass
+
+  try:
+    compile_words(source_path, target_path)
+    return PackedWords(target_path)
+  except (OSError, ValueError):
+    return None
+
+def load_merged(source_paths):
+  """
+  Return a PackedWords of the words in any of the word lists at
+  `source_paths`, with `flags` giving the lists each word is in. Each
+  list is compiled as by `load` if needed, and the merged file is built
+  from those. Returns None if any of them can't be built or read.
+  """
+  sources = [load(path) for path in source_paths]
+  try:
+    if any(source is None for source in sources):
+      return None
+    digest = hashlib.sha256(
+      b"".join(source.source_digest for source in sources)
+    ).digest()
+    target_path = merged_path(digest)
+    try:
+      words = PackedWords(target_path)
+      if words.flags is not None and words.source_digest == digest:
+        # Mark the file as recently used, so it isn't pruned
+        _touch(target_path)
+        return words
+      words.close()
+    except (OSError, ValueError):
+      pass
+
+    try:
+      (words, flags) = merge_words(sources)
+      _write(target_path, MERGED_MAGIC, words, 0, 0, digest, flags)
+      _prune_merged(target_path)
+      return PackedWords(target_path)
+    except (OSError, ValueError):
+      return None
+  finally:
+    for source in sources:
+      if source is not None:
+        source.close()
+
+def _prune_merged(keep_path):
+  """
+  Delete all but the MAX_MERGED most recently used merged files in the
+  directory of `keep_path`, which is always kept. Files another process
+  still has mapped stay readable by it where the platform allows.
+  """
+  directory = os.path.dirname(keep_path)
+  merged = []
+  for name in os.listdir(directory):
+    path = os.path.join(directory, name)
+    if not name.endswith(".wfm") or path == keep_path:
+      continue
+    try:
+      merged.append((os.stat(path).st_mtime_ns, path))
+    except OSError:
+      # Removed by another process
+      continue
+  merged.sort(reverse=True)
+  for (_, path) in merged[MAX_MERGED - 1:]:
+    try:
+      os.remove(path)
+    except OSError:
+      pass
+
+def _touch(path):
+  try:
+    os.utime(path)
+  except OSError:
+    pass
+
+
+class PackedWords:
+  """
+  A read-only, sorted sequence of words backed by a memory-mapped
+  compiled word list. Words are decoded on access, so only the pages
+  actually touched by a search are read from disk.
+
+  For merged word lists, `flags` is a uint32 view of each word's source
+  flags (see `load_merged`); otherwise it is None.
+  """
+
+  def __init__(self, path):
+    self.path = path
+    with open(path, "rb") as f:
+      self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    magic = self._mmap[:len(MAGIC)]
+    if magic not in (MAGIC, MERGED_MAGIC):
+      self.close()
+      raise ValueError("{} is not a compiled word list.".format(path))
+    (self.source_size, self.source_mtime_ns, self._count, blob_length,
+     max_length, self.source_digest) = \
+      HEADER.unpack_from(self._mmap, len(MAGIC))
+    # Sizes of the offsets, masks, order and starts tables
+    table_sizes = [self._count + 1, self._count, self._count, max_length + 2]
+    if magic == MERGED_MAGIC:
+      table_sizes.append(self._count)
+    self._blob_start = len(MAGIC) + HEADER.size + 4 * sum(table_sizes)
+    if len(self._mmap) != self._blob_start + blob_length:
+      self.close()
+      raise ValueError("{} is truncated.".format(path))
+    self._view = memoryview(self._mmap)
+    self._tables = []
+    start = len(MAGIC) + HEADER.size
+    for size in table_sizes:
+      self._tables.append(self._view[start:start + 4 * size].cast("I"))
+      start += 4 * size
+    self._offsets = self._tables[0]
+    self.flags = self._tables[4] if magic == MERGED_MAGIC else None
+
+  def __reduce__(self):
+    # Reopen the mapping rather than copying the words when pickled,
+    # e.g. when sent to worker processes.
+    return (PackedWords, (self.path,))
+
+  def __len__(self):
+    return self._count
+
+  def __getitem__(self, i):
+    if i < 0:
+      i += self._count
+    if not 0 <= i < self._count:
+      raise IndexError("word index out of range")
+    start = self._blob_start + self._offsets[i]
+    end = self._blob_start + self._offsets[i + 1]
+    return self._mmap[start:end].decode("utf-8")
+
+  def index(self):
+    """Return the (masks, order, starts) index stored with the words."""
+    return tuple(self._tables[1:4])
+
+  def is_current(self, source_path):
+    """True if this was compiled from the current contents of the file."""
+    stat = os.stat(source_path)
+    return (stat.st_size, stat.st_mtime_ns) == \
+           (self.source_size, self.source_mtime_ns)
+
+  def close(self):
+    for view in getattr(self, "_tables", []):
+      view.release()
+    if hasattr(self, "_view"):
+      self._view.release()
+    self._mmap.close()
@@ -0,0 +1,200 @@
+"""
+Enumerate and count the paths through a board without a dictionary.
+
+With no dictionary to prune with, finding every path is pure
+combinatorics. Here the cells a partial path has used are an integer
+bitmask, and each cell's neighbors are a precomputed bitmask, so the
+possible next cells of a path are found at once with
+`neighbors[end] & allowed & ~used`, rather than by checking each
+neighbor in turn.
+
+Paths are extended one level (one letter) at a time, a block of
+partial paths at a time, so memory stays bounded however many paths
+there are. Counting doesn't need the paths at all: partial paths with
+the same used cells and end cell have the same completions, so each
+level only keeps a count per (used, end) pair.
+"""
+from collections import Counter
+from wordfinder.adjacency import neighbor_masks, reach_masks
+from wordfinder.constraints import WILDCARD
+
+# The most partial paths to extend in one block.
+BLOCK_SIZE = 1 << 14
+
+def _allowed_masks(cells, length, prefix):
+  """
+  Return, for each depth up to `length`, a bitmask of the cells that may
+  appear at that depth: those with a letter, and matching the prefix,
+  which may hold wildcards.
+  """
+  letters = 0
+  by_letter = {}
+  for (i, b) in enumerate(cells):
+    if b:
+      letters |= 1 << i
+      letter = chr(b).upper()
+      by_letter[letter] = by_letter.get(letter, 0) | 1 << i
+  prefix = prefix.upper()
+  return [
+    by_letter.get(prefix[d], 0)
+    if d < len(prefix) and prefix[d] != WILDCARD else letters
+    for d in range(length)
+  ]
+
+def region_masks(rows, columns, length, regions):
+  """
+  Return (outside, near), two lists with an item for each cell of a
+  board with the given shape and a region for each cell, or None for
+  empty cells. outside[i] is a bitmask of the cells of other regions
+  than cell i's. near[i][d] is a bitmask of the cells from which a path
+  of `length` letters, with its (d + 1)th letter there, can still reach
+  one of them. Returns (None, None) if `regions` is None.
+  """
+  if regions is None:
+    return (None, None)
+  masks = {}
+  for (i, region) in enumerate(regions):
+    if region is not None:
+      masks[region] = masks.get(region, 0) | 1 << i
+  everything = sum(masks.values())
+  by_region = {}
+  for (region, mask) in masks.items():
+    others = everything & ~mask
+    reach = reach_masks(rows, columns, _bits(others), length - 1)
+    by_region[region] = (
+      others, [reach[length - 1 - d] for d in range(length)]
+    )
+  outside = [by_region[r][0] if r is not None else 0 for r in regions]
+  near = [by_region[r][1] if r is not None else None for r in regions]
+  return (outside, near)
+
+def _bits(mask):
+  """Yield the index of each set bit of `mask`, lowest first."""
+  while mask:
+    low = mask & -mask
+    yield low.bit_length() - 1
+    mask ^= low
+
+def _popcount(mask):
+  return bin(mask).count("1")
+
+def iter_paths(
+    rows, columns, cells, length, prefix="", stats=None, starts=None,
+    budget=None, regions=None
+):
+  """
+  Lazily yield a tuple of flat cell indices for every path of `length`
+  letters through a board, given as the shape and row-major bytes of a
+  Board, with the rules of `LetterMatrix.find_word_coords` when no
+  dictionary is given. Paths are yielded a level at a time, not in
+  depth-first order.
+
+  stats (SearchStats) -- if given, search counters are added to it.
+  starts (iterable of int) -- if given, only paths starting at these
+    cells are yielded.
+  budget (SearchBudget) -- if given, paths are counted against it a
+    block at a time, and BudgetExceeded is raised when it runs out.
+  regions (sequence) -- if given, the region of each cell, or None for
+    empty cells. Only paths using cells of at least two regions are
+    yielded, and a path within one region is dropped as soon as no other
+    region is within the steps it has left.
+  """
+  if length < 1 or len(prefix) > length:
+    return
+  (outside, near) = region_masks(rows, columns, length, regions)
+  neighbors = neighbor_masks(rows, columns)
+  allowed = _allowed_masks(cells, length, prefix)
+  letters = _allowed_masks(cells, 1, "")[0]
+  if starts is not None:
+    start_mask = 0
+    for i in starts:
+      start_mask |= 1 << i
+    letters &= start_mask
+    allowed[0] &= start_mask
+  if near:
+    start_mask = 0
+    for (i, masks) in enumerate(near):
+      if masks is not None and masks[0] >> i & 1:
+        start_mask |= 1 << i
+    letters &= start_mask
+    allowed[0] &= start_mask
+  if stats is not None and prefix:
+    stats.prunes["prefix"] += _popcount(letters & ~allowed[0])
+  # Each partial path is (cells, used cells, end cell)
+  frontier = [((i,), 1 << i, i) for i in _bits(allowed[0])]
+
+  def expand(frontier, depth):
+    if budget is not None:
+      budget.spend(len(frontier))
+    if stats is not None and frontier:
+      stats.nodes += len(frontier)
+      stats.max_path_depth = max(stats.max_path_depth, depth)
+    if depth == length:
+      if stats is not None:
+        stats.paths += len(frontier)
+      for (path, _, _) in frontier:
+        yield path
+      return
+
+    mask = allowed[depth]
+    last = depth == length - 1
+    for start in range(0, len(frontier), BLOCK_SIZE):
+      next_frontier = []
+      block = frontier[start:start + BLOCK_SIZE]
+      if budget is not None and last:
+        budget.spend(len(block))
+      for (path, used, end) in block:
+        free = neighbors[end] & ~used
+        if near and not used & outside[path[0]]:
+          free &= near[path[0]][depth]
+        if stats is not None:
+          if depth < len(prefix):
+            stats.prunes["prefix"] += _popcount(free & letters & ~mask)
+          if last:
+            found = _popcount(free & mask)
+            stats.nodes += found
+            stats.paths += found
+            if found:
+              stats.max_path_depth = length
+        free &= mask
+        while free:
+          low = free & -free
+          n = low.bit_length() - 1
+          if last:
+            # Complete paths are yielded straight away
+            yield path + (n,)
+          else:
+            next_frontier.append((path + (n,), used | low, n))
+          free ^= low
+      if not last:
+        yield from expand(next_frontier, depth + 1)
+
+  yield from expand(frontier, 1)
+
+def count_paths(rows, columns, cells, length, prefix=""):
+  """
+  Return the number of paths `iter_paths` would yield, without
+  enumerating them.
+  """
+  if length < 1 or len(prefix) > length:
+    return 0
+  neighbors = neighbor_masks(rows, columns)
+  allowed = _allowed_masks(cells, length, prefix)
+
+  # The number of partial paths with each (used cells, end cell)
+  counts = Counter({(1 << i, i): 1 for i in _bits(allowed[0])})
+  for depth in range(1, length - 1):
+    mask = allowed[depth]
+    next_counts = Counter()
+    for ((used, end), count) in counts.items():
+      for n in _bits(neighbors[end] & mask & ~used):
+        next_counts[(used | 1 << n, n)] += count
+    counts = next_counts
+  if length == 1:
+    return sum(counts.values())
+  # The last level only needs the number of ways to finish each path
+  mask = allowed[length - 1]
+  return sum(
+    count * _popcount(neighbors[end] & mask & ~used)
+    for ((used, end), count) in counts.items()
+  )
@@ -0,0 +1,266 @@
+"""
+A cache of whole results, in front of `find_words` and
+`solve_word_game`.
+
+The same boards are often asked about many times, with the same word
+lengths and prefix, e.g. a daily puzzle. A ResultCache keeps the
+results of each query, keyed on a SHA-256 hash of the board's shape and
+letters, the query, and the dictionary's path and contents, so a
+repeated query is answered without searching.
+
+Results are held JSON-encoded, in two tiers: a bounded in-memory LRU,
+and optionally a directory on disk, which outlives the process and can
+be shared between processes. When the files in the directory take up
+more than `max_bytes`, the least recently used are deleted. Only files
+named like the cache's own entries are ever read or deleted, so the
+directory can safely hold other files. Results of searches stopped
+early by a SearchBudget are never cached.
+"""
+import hashlib
+import json
+import os
+import re
+import tempfile
+from collections import OrderedDict
+from wordfinder.board import Board
+from wordfinder.budget import BudgetExceeded
+from wordfinder.constraints import word_patterns
+from wordfinder.solve import solve_word_game
+
+# The name of a result's file: its key, a SHA-256 hex digest
+_ENTRY_NAME = re.compile(r"[0-9a-f]{64}\.json\Z")
+
+class ResultCache:
+  """
+  A two-tier cache of query results, see above. `hits`, `misses` and
+  `hit_rate()` report how well it is working, and `memory_bytes` and
+  `disk_bytes()` how much space it is using.
+  """
+  DEFAULT_MAXSIZE = 256
+  DEFAULT_MAX_BYTES = 64 << 20
+
+  def __init__(
+      self, directory=None, maxsize=DEFAULT_MAXSIZE,
+      max_bytes=DEFAULT_MAX_BYTES
+  ):
+    """
+    directory (str) -- if given, results are also stored in files in
+      this directory, which is created if needed.
+    maxsize (int) -- the most results to hold in memory. A maxsize of 0
+      disables the memory tier.
+    max_bytes (int) -- the most bytes of results to keep on disk.
+    """
+    self.directory = directory
+    self.maxsize = maxsize
+    self.max_bytes = max_bytes
+    self.memory_hits = 0
+    self.disk_hits = 0
+    self.misses = 0
+    self.memory_bytes = 0
+    self._entries = OrderedDict()
+    if directory:
+      os.makedirs(directory, exist_ok=True)
+
+  def __len__(self):
+    return len(self._entries)
+
+  @property
+  def hits(self):
+    return self.memory_hits + self.disk_hits
+
+  def hit_rate(self):
+    """Return the fraction of lookups that were hits, or 0 if none."""
+    lookups = self.hits + self.misses
+    return self.hits / lookups if lookups else 0.0
+
+  def disk_bytes(self):
+    """Return the number of bytes of results stored on disk."""
+    return sum(size for (_, _, size) in self._disk_entries())
+
+  def summary(self):
+    """Return the cache's counters as a dict suitable for JSON."""
+    return {
+      "memory_hits": self.memory_hits,
+      "disk_hits": self.disk_hits,
+      "misses": self.misses,
+      "hit_rate": self.hit_rate(),
+      "memory_entries": len(self._entries),
+      "memory_bytes": self.memory_bytes,
+      "disk_bytes": self.disk_bytes(),
+    }
+
+  @staticmethod
+  def key(kind, matrix, word_lengths, prefix="", dictionary=None,
+          unique=False):
+    """
+    Return the hex key for a query. `kind` names the kind of result, so
+    that different entry points never share entries.
+    """
+    board = matrix if isinstance(matrix, Board) else Board.from_matrix(matrix)
+    identity = None
+    if dictionary is not None:
+      identity = [dictionary.path, dictionary.digest().hex()]
+    query = json.dumps([
+      kind, board.rows, board.columns, [int(n) for n in word_lengths],
+      prefix.upper(), bool(unique), identity
+    ])
+    h = hashlib.sha256(query.encode("utf-8"))
+    h.update(board.cells)
+    return h.hexdigest()
+
+  def get(self, key):
+    """Return the result stored under `key`, or None if there isn't one."""
+    data = self._entries.get(key)
+    if data is not None:
+      self._entries.move_to_end(key)
+      self.memory_hits += 1
+      return json.loads(data)
+    data = self._read(key)
+    if data is not None:
+      self.disk_hits += 1
+      self._remember(key, data)
+      return json.loads(data)
+    self.misses += 1
+    return None
+
+  def put(self, key, result):
+    """Store `result`, which must be JSON-encodable, under `key`."""
+    data = json.dumps(result, separators=(",", ":")).encode("utf-8")
+    self._remember(key, data)
+    self._write(key, data)
+
+  def clear(self):
+    """Remove every result, from memory and disk."""
+    self._entries.clear()
+    self.memory_bytes = 0
+    for (path, _, _) in self._disk_entries():
+      _remove(path)
+
+  def find_words(self, matrix, length, prefix="", dictionary=None,
+                 unique=False, stats=None, budget=None):
+    """Like `LetterMatrix.find_words`, answered from the cache if possible."""
+    key = ResultCache.key(
+      "words", matrix, [length], prefix, dictionary, unique
+    )
+    words = self.get(key)
+    if words is None:
+      words = []
+      try:
+        words.extend(matrix.iter_words(
+          length, prefix, dictionary, stats, unique, budget
+        ))
+      except BudgetExceeded:
+        # Return the words found so far, as solve_word_game does
+        pass
+      words.sort()
+      if budget is None or budget.completed:
+        self.put(key, words)
+    return words
+
+  def solve_word_game(self, matrix, word_lengths, dictionary, unique=False,
+                      constraints=None, **kwargs):
+    """
+    Like `solve_word_game`, answered from the cache if possible, but with
+    the solutions sorted. Other keyword arguments are passed on to
+    `solve_word_game`.
+    """
+    patterns = word_patterns(constraints, word_lengths)
+    if patterns is None:
+      return []
+    # The words' patterns stand in for the prefix
+    key = ResultCache.key(
+      "solutions", matrix, word_lengths, ",".join(patterns).rstrip(","),
+      dictionary, unique
+    )
+    solutions = self.get(key)
+    if solutions is None:
+      solutions = sorted(solve_word_game(
+        matrix, word_lengths, dictionary, unique=unique,
+        constraints=constraints, **kwargs
+      ))
+      budget = kwargs.get("budget")
+      if budget is None or budget.completed:
+        self.put(key, solutions)
+    return solutions
+
+  def _remember(self, key, data):
+    if self.maxsize <= 0:
+      return
+    old = self._entries.pop(key, None)
+    if old is not None:
+      self.memory_bytes -= len(old)
+    self._entries[key] = data
+    self.memory_bytes += len(data)
+    while len(self._entries) > self.maxsize:
+      (_, evicted) = self._entries.popitem(last=False)
+      self.memory_bytes -= len(evicted)
+
+  def _path(self, key):
+    return os.path.join(self.directory, key + ".json")
+
+  def _read(self, key):
+    if not self.directory:
+      return None
+    path = self._path(key)
+    try:
+      with open(path, "rb") as f:
+        data = f.read()
+      # Mark the file as recently used, for eviction
+      os.utime(path)
+    except OSError:
+      return None
+    return data
+
+  def _write(self, key, data):
+    if not self.directory or len(data) > self.max_bytes:
+      return
+    tmp_path = None
+    try:
+      # Write to a temporary file first, so readers never see a partial
+      # file
+      (fd, tmp_path) = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+      with os.fdopen(fd, "wb") as out:
+        out.write(data)
+      os.replace(tmp_path, self._path(key))
+    except OSError:
+      if tmp_path is not None:
+        _remove(tmp_path)
+      return
+    self._evict()
+
+  def _disk_entries(self):
+    """Return a list of (path, mtime, size) for each result on disk."""
+    if not self.directory:
+      return []
+    entries = []
+    try:
+      names = os.listdir(self.directory)
+    except OSError:
+      return []
+    for name in names:
+      if not _ENTRY_NAME.match(name):
+        continue
+      path = os.path.join(self.directory, name)
+      try:
+        stat = os.stat(path)
+      except OSError:
+        # Removed by another process
+        continue
+      entries.append((path, stat.st_mtime_ns, stat.st_size))
+    return entries
+
+  def _evict(self):
+    """Delete the least recently used files until within max_bytes."""
+    entries = self._disk_entries()
+    total = sum(size for (_, _, size) in entries)
+    for (path, _, size) in sorted(entries, key=lambda e: e[1]):
+      if total <= self.max_bytes:
+        break
+      _remove(path)
+      total -= size
+
+def _remove(path):
+  try:
+    os.remove(path)
+  except OSError:
+    pass
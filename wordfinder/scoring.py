@@ -0,0 +1,170 @@
+"""
+Find the highest-scoring solutions without enumerating every one.
+
+`best_solutions` searches depth first, like `solve_word_game`, but
+keeps only the K best solutions found so far in a heap. Before
+descending into the board left by a word, it asks the scorer for an
+upper bound on what the remaining words could score there; if even
+that can't beat the K-th best solution, the whole subtree is skipped.
+Candidate words are tried highest-scoring first, so good solutions are
+found early and the bound prunes hard.
+"""
+import heapq
+from wordfinder.board import Board
+from wordfinder.budget import BudgetExceeded
+from wordfinder.constraints import search_patterns
+from wordfinder.solve import word_tries
+
+SCRABBLE_VALUES = {
+  "A": 1, "B": 3, "C": 3, "D": 2, "E": 1, "F": 4, "G": 2, "H": 4, "I": 1,
+  "J": 8, "K": 5, "L": 1, "M": 3, "N": 1, "O": 1, "P": 3, "Q": 10, "R": 1,
+  "S": 1, "T": 1, "U": 1, "V": 4, "W": 4, "X": 8, "Y": 4, "Z": 10,
+}
+
+# Boggle-style points for a word of each length, with longer words
+# scoring the same as the longest listed
+LENGTH_POINTS = {1: 0, 2: 0, 3: 1, 4: 1, 5: 2, 6: 3, 7: 5, 8: 11}
+
+class Scorer:
+  """
+  Scores a word as the sum of its letter values plus points for its
+  length. A solution scores the sum of its words' scores.
+  """
+
+  def __init__(self, letter_values=None, length_points=None):
+    """
+    letter_values (dict of str to int) -- the value of each upper-case
+      letter; letters not listed are worth nothing.
+    length_points (dict of int to int) -- points for a word of each
+      length. Words longer than any listed length get the points of
+      the longest.
+    """
+    self.letter_values = dict(letter_values or {})
+    self.length_points = dict(length_points or {})
+    self._byte_values = [
+      self.letter_values.get(chr(b).upper(), 0) if b else 0
+      for b in range(256)
+    ]
+
+  def score(self, word):
+    """Return the score of a single word."""
+    letters = sum(self.letter_values.get(l, 0) for l in word.upper())
+    return letters + self.points_for_length(len(word))
+
+  def points_for_length(self, length):
+    if not self.length_points:
+      return 0
+    if length in self.length_points:
+      return self.length_points[length]
+    longest = max(self.length_points)
+    return self.length_points[longest] if length > longest else 0
+
+  def upper_bound(self, board, word_lengths):
+    """
+    Return the most that words of the given lengths could score between
+    them in the board. Every word uses different cells, so no more than
+    the most valuable letters left on the board can be used.
+    """
+    values = sorted(
+      (self._byte_values[b] for b in board.cells if b), reverse=True
+    )
+    return sum(values[:sum(word_lengths)]) + \
+           sum(self.points_for_length(n) for n in word_lengths)
+
+SCORERS = {
+  "scrabble": Scorer(SCRABBLE_VALUES),
+  "length": Scorer(length_points=LENGTH_POINTS),
+}
+
+def best_solutions(
+    matrix, word_lengths, dictionary, k, scorer=None, prefix="", stats=None,
+    budget=None, constraints=None
+):
+  """
+  Return a list of up to `k` tuples (score, solution) for the
+  highest-scoring solutions to the word game, best first. Solutions are
+  as for `solve_word_game` and are not repeated; among solutions with
+  equal scores, those found first are kept.
+
+  scorer (Scorer) -- defaults to Scrabble letter values.
+  prefix (str) -- the first word must start with this.
+  constraints (sequence of WordConstraint) -- if given instead of
+    `prefix`, the letters each word must have, as for `solve_word_game`.
+  stats (SearchStats) -- if given, search counters are added to it,
+    with subtrees skipped by the bound counted as "bound" prunes.
+  budget (SearchBudget) -- if given, the search stops when it runs out,
+    returning the best solutions found so far.
+  """
+  if k < 1:
+    return []
+  if scorer is None:
+    scorer = SCORERS["scrabble"]
+  board = matrix if isinstance(matrix, Board) else Board.from_matrix(matrix)
+  word_lengths = tuple(word_lengths)
+  patterns = search_patterns(word_lengths, prefix, constraints)
+  tries = None
+  if patterns is not None:
+    tries = word_tries(board, word_lengths, patterns, dictionary)
+  if tries is None:
+    if stats is not None:
+      stats.prunes["infeasible"] += 1
+    return []
+
+  # A min-heap of (score, -order found, solution), so heap[0] is the
+  # worst solution kept, and the latest found of those with its score
+  heap = []
+  kept = set()
+  found = [0]
+
+  def threshold():
+    return heap[0][0] if len(heap) == k else None
+
+  def search(board, word_lengths, words, score, patterns):
+    length = word_lengths[0]
+    candidates = []
+    paths = board.iter_cell_paths(
+      length, patterns[0], tries[(length, patterns[0])], stats, budget=budget
+    )
+    for path in paths:
+      word = board.word_at_cells(path)
+      candidates.append((scorer.score(word), word, path))
+    # Try the best words first, so the bound prunes as early as possible
+    candidates.sort(key=lambda c: -c[0])
+
+    rest = word_lengths[1:]
+    # The remaining words can't score more on a board with fewer letters
+    rest_bound = scorer.upper_bound(board, rest) if rest else 0
+    for (i, (word_score, word, path)) in enumerate(candidates):
+      total = score + word_score
+      least = threshold()
+      if least is not None and total + rest_bound <= least:
+        # Nor can any of the lower-scoring candidates after this one
+        if stats is not None:
+          stats.prunes["bound"] += len(candidates) - i
+        break
+      if not rest:
+        solution = words + (word,)
+        if solution not in kept:
+          found[0] += 1
+          if len(heap) == k:
+            kept.discard(heapq.heappop(heap)[2])
+          heapq.heappush(heap, (total, -found[0], solution))
+          kept.add(solution)
+        continue
+      remaining = board.remove_cells(path)
+      if least is not None and \
+         total + scorer.upper_bound(remaining, rest) <= least:
+        if stats is not None:
+          stats.prunes["bound"] += 1
+        continue
+      search(remaining, rest, words + (word,), total, patterns[1:])
+
+  try:
+    search(board, word_lengths, (), 0, patterns)
+  except BudgetExceeded:
+    # Return the best found so far
+    pass
+  return [
+    (score, list(solution))
+    for (score, _, solution) in sorted(heap, key=lambda e: (-e[0], -e[1]))
+  ]
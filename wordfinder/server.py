@@ -0,0 +1,371 @@
+"""
+A long-running solver that keeps the dictionary loaded between requests:
+
+  wordfinder serve [--port PORT | --unix PATH] [options]
+
+Requests are made over HTTP, on a local TCP port or a Unix socket:
+
+  POST /solve
+  {"board": [["A", "B"], ["C", ""]], "word_lengths": [2, 1], "suffix": "B"}
+
+The body accepts the same fields as a `wordfinder batch` JSON line,
+including "prefix", "suffix" and "pattern" for any of the words, plus
+an optional "limit", except that the board must be given inline as
+"board": "path" is refused, so clients can't have the server read its
+files. The response is the same JSON result, with
+status 200 if the board was solved and 400 if it could not be. A
+request that takes longer than the timeout gets a 504 response, with
+the solutions found in time and "completed": false. The timeout is
+enforced inside the search, so a slow board frees its worker for the
+next request rather than holding it until it finishes. GET /health
+returns {"status": "ok"}.
+
+Solves run on a pool of worker processes, each holding its own copy
+of the dictionary. Connections are kept alive between requests unless
+the client asks otherwise.
+
+With --cache_size or --cache_dir, results for boards given inline are
+kept in a ResultCache, and repeated requests are answered from it in
+the server process without reaching a worker.
+"""
+import asyncio
+import json
+import sys
+import time
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from wordfinder.batch import job_constraints, solve_job
+from wordfinder.constraints import word_patterns
+from wordfinder.dictionary import load_dictionary
+from wordfinder.letter_matrix import LetterMatrix
+from wordfinder.result_cache import ResultCache
+
+MAX_BODY_BYTES = 1 << 20
+
+# Seconds to wait past the timeout for a worker to notice it and return
+# its partial result, before giving up on it
+TIMEOUT_GRACE = 1.0
+
+REASONS = {
+  200: "OK",
+  400: "Bad Request",
+  404: "Not Found",
+  405: "Method Not Allowed",
+  413: "Payload Too Large",
+  504: "Gateway Timeout",
+}
+
+class SolverServer:
+  """
+  Serves solve requests, see above. Use `start` to begin listening, and
+  `close` when done.
+  """
+
+  def __init__(
+      self, dictionary, workers=1, timeout=10.0, max_concurrent=None,
+      result_cache=None
+  ):
+    """
+    dictionary (Dictionary) -- the dictionary to solve with, or None for
+      raw results.
+    workers (int) -- the number of worker processes to solve in. If 0,
+      solves run in a single thread of this process instead.
+    timeout (float) -- seconds a request may take, including time spent
+      queued behind other requests, before its search is stopped and it
+      gets an error, with the solutions found in time.
+    max_concurrent (int) -- the most solves to run at once; further
+      requests wait their turn. Defaults to the number of workers.
+    result_cache (ResultCache) -- if given, results are kept in it and
+      repeated requests answered from it.
+    """
+    self.dictionary = dictionary
+    self.result_cache = result_cache
+    self.timeout = timeout
+    if workers > 0:
+      self.executor = ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(dictionary,)
+      )
+    else:
+      self.executor = ThreadPoolExecutor(max_workers=1)
+    self.workers = workers
+    self.semaphore = asyncio.Semaphore(max_concurrent or max(workers, 1))
+
+  async def start(self, host="127.0.0.1", port=8765, unix_path=None):
+    """
+    Start every worker, then listen on the Unix socket at `unix_path` if
+    given, otherwise on the TCP host and port. Returns the
+    asyncio.Server.
+    """
+    loop = asyncio.get_running_loop()
+    # Start the workers now, rather than on the first requests
+    await asyncio.gather(*[
+      loop.run_in_executor(self.executor, _ping)
+      for _ in range(max(self.workers, 1))
+    ])
+    if unix_path:
+      return await asyncio.start_unix_server(self.handle_connection, unix_path)
+    return await asyncio.start_server(self.handle_connection, host, port)
+
+  def close(self):
+    self.executor.shutdown(cancel_futures=True)
+
+  async def solve(self, job):
+    """Return a tuple (status, result) for a solve request."""
+    loop = asyncio.get_running_loop()
+    error = _job_error(job)
+    if error is not None:
+      return (400, {"id": job.get("id"), "solutions": None, "error": error})
+    key = self.cache_key(job)
+    limit = job.get("limit")
+    if key is not None:
+      solutions = self.result_cache.get(key)
+      if solutions is not None:
+        return (200, {
+          "id": job.get("id"), "solutions": solutions[:limit], "error": None,
+          "completed": True
+        })
+      # Solve in full, so the whole result can be cached
+      job = dict(job, limit=None)
+
+    deadline = time.monotonic() + self.timeout
+    timed_out = "Timed out after {} seconds.".format(self.timeout)
+
+    async def run():
+      async with self.semaphore:
+        # The search gets whatever time is left after queueing
+        remaining = max(deadline - time.monotonic(), 0.0)
+        if self.workers > 0:
+          return await loop.run_in_executor(
+            self.executor, _solve_in_worker, job, remaining
+          )
+        return await loop.run_in_executor(
+          self.executor, solve_job, job, self.dictionary, job.get("limit"),
+          remaining
+        )
+
+    try:
+      result = await asyncio.wait_for(run(), self.timeout + TIMEOUT_GRACE)
+    except asyncio.TimeoutError:
+      return (504, {
+        "id": job.get("id"), "solutions": None, "error": timed_out,
+        "completed": False
+      })
+    if result["error"]:
+      return (400, result)
+    if not result["completed"]:
+      result["error"] = timed_out
+      return (504, result)
+    if key is not None:
+      self.result_cache.put(key, result["solutions"])
+      result["solutions"] = result["solutions"][:limit]
+    return (200, result)
+
+  def cache_key(self, job):
+    """
+    Return the result cache key for a job, or None if there is no cache
+    or the job can't be cached. Only boards given inline are cached, as
+    a board file could change between requests.
+    """
+    if self.result_cache is None or "board" not in job or "error" in job:
+      return None
+    try:
+      matrix = LetterMatrix(job["board"])
+      word_lengths = [int(n) for n in job["word_lengths"]]
+      patterns = word_patterns(job_constraints(job), word_lengths)
+      # The words' patterns stand in for the prefix
+      return ResultCache.key(
+        "job", matrix, word_lengths, ",".join(patterns).rstrip(","),
+        self.dictionary, unique=True
+      )
+    except Exception:
+      # Let the solve report what is wrong with the job
+      return None
+
+  async def respond(self, method, path, body):
+    """Return a tuple (status, JSON-encodable body) for a request."""
+    if path == "/health":
+      return (200, {"status": "ok"})
+    if path != "/solve":
+      return (404, {"error": "Unknown path {}.".format(path)})
+    if method != "POST":
+      return (405, {"error": "Use POST to solve."})
+    try:
+      job = json.loads(body)
+      if not isinstance(job, dict):
+        raise ValueError("The request must be a JSON object.")
+    except ValueError as e:
+      return (400, {"error": "Invalid JSON: {}".format(e)})
+    return await self.solve(job)
+
+  async def handle_connection(self, reader, writer):
+    """Serve HTTP requests on one connection until it is closed."""
+    try:
+      while True:
+        request_line = await reader.readline()
+        if not request_line:
+          break
+        try:
+          (method, path, version) = request_line.decode("latin-1").split()
+        except ValueError:
+          await self.write_response(writer, 400, {"error": "Bad request."})
+          break
+
+        headers = {}
+        while True:
+          line = await reader.readline()
+          if line in (b"\r\n", b"\n", b""):
+            break
+          (name, _, value) = line.decode("latin-1").partition(":")
+          headers[name.strip().lower()] = value.strip()
+
+        try:
+          length = int(headers.get("content-length", "0") or "0")
+          if length < 0:
+            raise ValueError(length)
+        except ValueError:
+          await self.write_response(
+            writer, 400, {"error": "Invalid Content-Length."}
+          )
+          break
+        if length > MAX_BODY_BYTES:
+          await self.write_response(writer, 413, {"error": "Too large."})
+          break
+        body = await reader.readexactly(length) if length else b""
+
+        (status, response) = await self.respond(method, path, body)
+        keep_alive = headers.get("connection", "").lower() != "close" and \
+                     version == "HTTP/1.1"
+        await self.write_response(writer, status, response, keep_alive)
+        if not keep_alive:
+          break
+    except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+      pass
+    finally:
+      writer.close()
+
+  async def write_response(self, writer, status, response, keep_alive=False):
+    body = json.dumps(response).encode("utf-8")
+    head = "HTTP/1.1 {} {}\r\n".format(status, REASONS[status]) + \
+           "Content-Type: application/json\r\n" + \
+           "Content-Length: {}\r\n".format(len(body)) + \
+           "Connection: {}\r\n\r\n".format(
+             "keep-alive" if keep_alive else "close"
+           )
+    writer.write(head.encode("latin-1") + body)
+    await writer.drain()
+
+def _job_error(job):
+  """
+  Return why a solve request can't be run, or None if it can. Only
+  boards given inline are solved, and "limit" must be a whole number.
+  """
+  if "path" in job or "board" not in job:
+    return "Give the board inline as \"board\"; \"path\" isn't accepted."
+  limit = job.get("limit")
+  if limit is not None and (
+      not isinstance(limit, int) or isinstance(limit, bool) or limit < 0
+  ):
+    return "Limit must be a whole number, got {!r}.".format(limit)
+  return None
+
+# Set once per worker process, so the dictionary isn't sent per request.
+_worker_state = {}
+
+def _init_worker(dictionary):
+  _worker_state["dictionary"] = dictionary
+
+def _ping():
+  return True
+
+def _solve_in_worker(job, timeout):
+  return solve_job(job, _worker_state["dictionary"], job.get("limit"), timeout)
+
+def main(args=None):
+  if args is None:
+    args = sys.argv[1:]
+
+  parser = ArgumentParser("wordfinder serve",
+                          description="Serve solve requests over HTTP, " +
+                          "keeping the dictionary loaded.")
+  parser.add_argument("--host", type=str, default="127.0.0.1",
+                      help="Address to listen on. Defaults to 127.0.0.1.")
+  parser.add_argument("--port", type=int, default=8765,
+                      help="TCP port to listen on. Defaults to 8765.")
+  parser.add_argument("--unix", type=str, default="",
+                      help="Listen on this Unix socket path instead of " +
+                      "a TCP port.")
+  parser.add_argument("--workers", type=int, default=1,
+                      help="Number of worker processes. Use 0 to solve " +
+                      "in the server process. Defaults to 1.")
+  parser.add_argument("--timeout", type=float, default=10.0,
+                      help="Seconds to wait for each solve. Defaults to 10.")
+  parser.add_argument("--max_concurrent", type=int, default=None,
+                      help="Most solves to run at once. Defaults to the " +
+                      "number of workers.")
+  parser.add_argument("--raw_results", dest="use_dict", action="store_false",
+                      help="Return every possible solution rather than " +
+                      "only dictionary words.")
+  parser.add_argument("--dictionary_path", type=str, action="append",
+                      default=[],
+                      help="Use this dictionary rather than the default. " +
+                      "Give it more than once to accept words from any of " +
+                      "several dictionaries.")
+  parser.add_argument("--exclude_dictionary", type=str, action="append",
+                      default=[],
+                      help="Never accept words from this dictionary.")
+  parser.add_argument("--cache_size", type=int, default=0,
+                      help="Keep the results of this many requests in " +
+                      "memory, and answer repeated requests from them. " +
+                      "Defaults to 0, or to 256 with --cache_dir.")
+  parser.add_argument("--cache_dir", type=str, default="",
+                      help="Also keep results in this directory, so they " +
+                      "outlive the server.")
+  parser.add_argument("--cache_bytes", type=int,
+                      default=ResultCache.DEFAULT_MAX_BYTES,
+                      help="The most bytes of results to keep in " +
+                      "--cache_dir. Defaults to 64 MiB.")
+  parsed_args = parser.parse_args(args)
+
+  dictionary = None
+  if parsed_args.use_dict:
+    dictionary = load_dictionary(
+      parsed_args.dictionary_path, parsed_args.exclude_dictionary
+    )
+
+  result_cache = None
+  if parsed_args.cache_size > 0 or parsed_args.cache_dir:
+    result_cache = ResultCache(
+      parsed_args.cache_dir or None,
+      parsed_args.cache_size or ResultCache.DEFAULT_MAXSIZE,
+      parsed_args.cache_bytes
+    )
+
+  async def serve():
+    server = SolverServer(
+      dictionary,
+      parsed_args.workers,
+      parsed_args.timeout,
+      parsed_args.max_concurrent,
+      result_cache
+    )
+    try:
+      listener = await server.start(
+        parsed_args.host, parsed_args.port, parsed_args.unix
+      )
+      address = parsed_args.unix or \
+                "{}:{}".format(parsed_args.host, parsed_args.port)
+      print("Serving on {}".format(address), file=sys.stderr)
+      async with listener:
+        await listener.serve_forever()
+    finally:
+      server.close()
+
+  try:
+    asyncio.run(serve())
+  except KeyboardInterrupt:
+    pass
+
+if __name__ == "__main__":
+  main()
@@ -1,25 +1,569 @@
-import copy
+from collections import OrderedDict
+from wordfinder.board import Board
+from wordfinder.budget import BudgetExceeded, SearchBudget
+from wordfinder.constraints import search_patterns, word_patterns
+from wordfinder.feasibility import LetterFeasibility, letter_counts
+from wordfinder.stats import SearchStats
 
-def solve_word_game(matrix, word_lengths, dictionary):
-  solutions = []
+class SolveCache:
+  """
+  A bounded LRU cache of sub-solutions, used by `solve_word_game` to
+  avoid re-solving boards it has already seen. Different first words,
+  and different orderings of the same words, often leave identical
+  boards once the columns collapse.
+
+  Entries are keyed on the board (which compares by shape and letters)
+  plus the remaining word lengths, their patterns, and whether solutions
+  are unique. Sub-solutions depend on the dictionary too, so a cache is
+  bound to the first dictionary it is used with and cleared if it is
+  later used with a different one.
+
+  A board can have a huge number of sub-solutions, especially without a
+  dictionary, so the cache is bounded by the total number of solutions
+  it holds as well as by its number of entries. Boards with more
+  solutions than the cache can hold are never cached, and their
+  solutions stop being collected as soon as there are too many.
+  """
+  DEFAULT_MAXSIZE = 4096
+  DEFAULT_MAX_SOLUTIONS = 1 << 17
+
+  def __init__(self, maxsize=DEFAULT_MAXSIZE,
+               max_solutions=DEFAULT_MAX_SOLUTIONS):
+    """
+    maxsize (int) -- the most entries to hold before discarding the
+      least recently used one. A maxsize of 0 disables caching.
+    max_solutions (int) -- the most solutions to hold across all
+      entries before discarding the least recently used ones.
+    """
+    self.maxsize = maxsize
+    self.max_solutions = max_solutions
+    self.hits = 0
+    self.misses = 0
+    self.solutions = 0
+    self._entries = OrderedDict()
+    self._dictionary = None
+
+  def __len__(self):
+    return len(self._entries)
+
+  def bind(self, dictionary):
+    """Clear the cache if it holds results for a different dictionary."""
+    if dictionary is not self._dictionary:
+      self._entries.clear()
+      self.solutions = 0
+      self._dictionary = dictionary
+
+  def get(self, key):
+    """Return the cached value for `key`, or None, updating counters."""
+    value = self._entries.get(key)
+    if value is None:
+      self.misses += 1
+    else:
+      self.hits += 1
+      self._entries.move_to_end(key)
+    return value
+
+  def accepts(self, count):
+    """True if a value holding `count` solutions could be stored."""
+    return self.maxsize > 0 and count <= self.max_solutions
+
+  def put(self, key, value):
+    """
+    Store a sequence of solutions, evicting the least recently used
+    entries while there are too many entries or solutions. Values too
+    big to hold at all are not stored.
+    """
+    if not self.accepts(len(value)):
+      return
+    old = self._entries.pop(key, None)
+    if old is not None:
+      self.solutions -= len(old)
+    self._entries[key] = value
+    self.solutions += len(value)
+    while len(self._entries) > self.maxsize or \
+          self.solutions > self.max_solutions:
+      (_, evicted) = self._entries.popitem(last=False)
+      self.solutions -= len(evicted)
+
+
+def solve_word_game(
+    matrix, word_lengths, dictionary, cache=None, workers=1, stats=None,
+    unique=False, budget=None, constraints=None
+):
+  """
+  Return a list of solutions to the word game, each a list containing
+  one word for each entry in `word_lengths`. Each word is found in the
+  matrix left behind after the previous words are removed from it and
+  its columns are collapsed.
+
+  `matrix` may be a LetterMatrix or a Board. `cache` is an optional
+  SolveCache to reuse sub-solutions from; by default a fresh one is
+  used for each call. If `workers` is greater than 1, the subtrees 
+  below each candidate first word are solved in that many processes,
+  each with its own cache; the solutions and their order are the same
+  as for a serial solve. If a SearchStats is given as `stats`, search 
+  counters and the time spent searching are added to it.
+
+  The same words can often be made from different cells, so by default
+  a solution is returned once for each way of making it. If `unique` is
+  True, each solution is returned only once, and a word that leaves the
+  same board as an earlier instance of the same word is not searched
+  again.
+
+  If a SearchBudget is given as `budget`, the search stops when it runs
+  out, returning the solutions found so far; `budget.exhausted` is then
+  True.
+
+  `constraints` is an optional sequence holding a WordConstraint or None
+  for each word, giving letters it must have. They are checked as each
+  path is extended, so the search never strays far from them. Raises
+  ValueError if there are more constraints than words.
+  """
+  return list(iter_solve_word_game(
+    matrix, word_lengths, dictionary, cache, workers, stats, unique, budget,
+    constraints
+  ))
+
+def solve_word_game_with_stats(matrix, word_lengths, dictionary, **kwargs):
+  """
+  Like `solve_word_game`, but return a tuple (solutions, stats) where
+  stats is a SearchStats describing the search.
+  """
+  stats = SearchStats()
+  solutions = solve_word_game(
+    matrix, word_lengths, dictionary, stats=stats, **kwargs
+  )
+  return (solutions, stats)
+
+def solve_word_game_within(
+    matrix, word_lengths, dictionary, timeout=None, max_nodes=None, **kwargs
+):
+  """
+  Like `solve_word_game`, but stop after `timeout` seconds or after
+  visiting `max_nodes` cells, and return a tuple (solutions, completed)
+  where completed is False if the search was stopped early.
+  """
+  budget = SearchBudget(timeout, max_nodes)
+  solutions = solve_word_game(
+    matrix, word_lengths, dictionary, budget=budget, **kwargs
+  )
+  return (solutions, budget.completed)
+
+def count_raw_solutions(matrix, word_lengths, prefix="", constraints=None):
+  """
+  Return the number of solutions `solve_word_game` would return without
+  a dictionary, without building them. The first word must start with
+  `prefix`, and the words must meet `constraints`, as for
+  `solve_word_game`. This is cheap next to a raw solve, so can be used
+  to size a job before running it.
+  """
+  board = matrix if isinstance(matrix, Board) else Board.from_matrix(matrix)
+  patterns = search_patterns(word_lengths, prefix, constraints)
+  if patterns is None:
+    return 0
+  return _count_raw(board, tuple(word_lengths), patterns, {})
+
+def _count_raw(board, word_lengths, patterns, counts):
+  if len(word_lengths) == 1:
+    return board.count_cell_paths(word_lengths[0], patterns[0])
+  if sum(word_lengths) > len(board.cells) - board.cells.count(0):
+    return 0
+  key = (board, word_lengths, patterns)
+  if key not in counts:
+    counts[key] = sum(
+      _count_raw(board.remove_cells(path), word_lengths[1:], patterns[1:],
+                 counts)
+      for path in board.iter_cell_paths(word_lengths[0], patterns[0])
+    )
+  return counts[key]
+
+def iter_solve_word_game(
+    matrix, word_lengths, dictionary, cache=None, workers=1, stats=None,
+    unique=False, budget=None, constraints=None
+):
+  """
+  Like `solve_word_game`, but lazily yield each solution as soon as it
+  is found. Solutions for the first word are streamed; those for the
+  remaining words are computed and cached one board at a time.
+
+  With `stats`, time spent by the consumer between solutions is not
+  counted as search time. With `budget`, it is: the budget limits the
+  whole time taken, so iterating stops on time even if the consumer is
+  slow, and solutions found before then can be used as they arrive.
+  """
+  board = matrix if isinstance(matrix, Board) else Board.from_matrix(matrix)
+  word_lengths = tuple(word_lengths)
+  patterns = word_patterns(constraints, word_lengths)
+  if patterns is None:
+    # Some word can't meet its constraint at its length
+    if stats is not None:
+      stats.prunes["infeasible"] += 1
+    return
+  if cache is None:
+    cache = SolveCache()
+  cache.bind(dictionary)
+  context = _SolveContext(
+    None, cache, stats, len(word_lengths), unique, budget, patterns
+  )
+  solutions = _iter_solve_top(
+    board, word_lengths, dictionary, workers, context
+  )
+  if stats is not None:
+    solutions = stats.timed(solutions)
+  try:
+    yield from solutions
+  except BudgetExceeded:
+    # Keep the solutions already yielded
+    return
+
+class _SolveContext:
+  """The state shared by every level of one solve."""
+  __slots__ = (
+    "tries", "cache", "stats", "word_count", "unique", "budget", "letters",
+    "patterns"
+  )
+
+  def __init__(
+      self, tries, cache, stats, word_count, unique=False, budget=None,
+      patterns=None
+  ):
+    self.tries = tries
+    self.cache = cache
+    self.stats = stats
+    self.word_count = word_count
+    self.unique = unique
+    self.budget = budget
+    # A LetterFeasibility for the tries' words, built by `feasibility`
+    # when first needed
+    self.letters = None
+    # The pattern for each word, see `constraints`
+    self.patterns = patterns or ("",) * word_count
+
+  def set_tries(self, tries):
+    """
+    Use `tries`, a dict mapping each (length, pattern) of the words to
+    the Trie to search for them, or None if there are no solutions.
+    """
+    self.tries = tries
+    self.letters = None
+
+  def feasibility(self):
+    """
+    Return a LetterFeasibility for the tries' words, or None without a
+    dictionary. It is only built when first asked for, as it takes
+    longer than a single-word search, which has no use for it.
+    """
+    tries = self.tries
+    if self.letters is None and tries is not None and \
+       None not in tries.values():
+      words = {}
+      for ((length, _), trie) in tries.items():
+        words.setdefault(length, set()).update(trie.words)
+      self.letters = LetterFeasibility(words)
+    return self.letters
+
+  def patterns_for(self, word_lengths):
+    """Return the patterns for the last len(word_lengths) words."""
+    return self.patterns[self.word_count - len(word_lengths):]
+
+def _iter_solve_top(board, word_lengths, dictionary, workers, context):
+  context.set_tries(
+    word_tries(board, word_lengths, context.patterns, dictionary)
+  )
+  if context.tries is None or (
+      len(word_lengths) > 1 and not _solvable(board, word_lengths, context)
+  ):
+    # The board's letters can't make words of these lengths
+    if context.stats is not None:
+      context.stats.prunes["infeasible"] += 1
+    return
+  if workers > 1 and len(word_lengths) > 1:
+    yield from _iter_solve_parallel(board, word_lengths, workers, context)
+  else:
+    yield from _iter_solve(board, word_lengths, context)
+
+def _solvable(board, word_lengths, context):
+  """
+  False if the board's letters can't make words of `word_lengths` with
+  the tries' words. A single word needs no check, as `word_tries`
+  has already found some word of its length that the letters can make.
+  """
+  letters = context.feasibility()
+  return letters is None or letters.solvable(
+    letter_counts(board.cells), word_lengths
+  )
+
+def word_tries(board, word_lengths, patterns, dictionary):
+  """
+  Return a dict mapping each word's (length, pattern) to the Trie to
+  search for it, or None if the board's letters can't possibly make a
+  solution. Each trie holds only the dictionary words that fit the
+  pattern and can be spelled from the board's letters. Letters are only
+  ever removed from the board, so these tries serve for every board
+  reached while solving. Without a dictionary, every word maps to None.
+  """
+  counts = board.letter_counts()
+  if sum(word_lengths) > sum(counts.values()):
+    return None
+  tries = {}
+  for key in set(zip(word_lengths, patterns)):
+    if dictionary is None:
+      tries[key] = None
+      continue
+    tries[key] = dictionary.trie(key[0], counts, key[1])
+    if tries[key] is None:
+      return None
+  return tries
+
+def _iter_solve(board, word_lengths, context):
+  stats = context.stats
+  if stats is not None:
+    depth = context.word_count - len(word_lengths) + 1
+    stats.max_solve_depth = max(stats.max_solve_depth, depth)
   # Get all possible solutions for the first word
-  subsolns = matrix.find_word_coords(word_lengths[0], dictionary=dictionary)
+  pattern = context.patterns_for(word_lengths)[0]
+  trie = context.tries[(word_lengths[0], pattern)]
+  subsolns = board.iter_cell_paths(
+    word_lengths[0], pattern, trie, stats, budget=context.budget
+  )
+  if context.unique:
+    yield from _iter_solve_unique(board, word_lengths, subsolns, context)
+    return
+  remaining_word_lengths = word_lengths[1:]
+  keep = _word_filter(board, remaining_word_lengths, context)
   for s in subsolns:
-    word = matrix.word_at(s)
-    remaining_word_lengths = word_lengths[1:]
+    word = board.word_at_cells(s)
 
     if not remaining_word_lengths:
       # We found all the words!
-      solutions += [[word]]
+      yield [word]
+    elif keep is not None and not keep(word):
+      # Too few letters would be left for the remaining words
+      if stats is not None:
+        stats.prunes["letters"] += 1
     else:
       # There are more words to find, look for the next one
-      reduced_matrix = copy.deepcopy(matrix)
-      reduced_matrix.remove_word(s)
-      remaining_solutions = solve_word_game(
-        reduced_matrix, 
+      remaining_solutions = _cached_solve(
+        board.remove_cells(s),
         remaining_word_lengths,
-        dictionary
+        context
       )
-      solutions += [[word] + r  for r in remaining_solutions]
+      for r in remaining_solutions:
+        yield [word] + list(r)
+
+def _word_filter(board, word_lengths, context):
+  """
+  Return a function of a word on the board, True if the letters it
+  leaves behind could still make words of `word_lengths`, or None if
+  there is nothing to check. Many paths spell the same word, so each
+  word is only checked once.
+  """
+  if not word_lengths:
+    return None
+  letters = context.feasibility()
+  if letters is None:
+    return None
+  counts = letter_counts(board.cells)
+  leaves = {}
+
+  def keep(word):
+    ok = leaves.get(word)
+    if ok is None:
+      ok = leaves[word] = letters.leaves_solvable(counts, word, word_lengths)
+    return ok
+  return keep
 
+def _iter_solve_unique(board, word_lengths, subsolns, context):
+  """Like `_iter_solve`, but yield each solution only once."""
+  remaining_word_lengths = word_lengths[1:]
+  groups = _group_by_word(
+    board, subsolns, bool(remaining_word_lengths), context.stats,
+    _word_filter(board, remaining_word_lengths, context)
+  )
+  for (word, subtrees) in groups.items():
+    if not remaining_word_lengths:
+      yield [word]
+      continue
+    # Solutions can only repeat if the word leaves more than one board
+    seen = set() if len(subtrees) > 1 else None
+    for (_, remaining_board) in subtrees:
+      remaining_solutions = _cached_solve(
+        remaining_board, remaining_word_lengths, context
+      )
+      for r in remaining_solutions:
+        if seen is not None:
+          if r in seen:
+            continue
+          seen.add(r)
+        yield [word] + list(r)
+
+def _group_by_word(board, paths, with_boards, stats, keep=None):
+  """
+  Return a dict mapping each word spelled by the paths, in the order
+  first found, to a list of (path, remaining board) for each distinct
+  board left behind by removing the word. A path leaving the same board
+  as an earlier one for the same word would lead to the same solutions,
+  so is left out. If not `with_boards`, the lists are empty. Words for
+  which `keep`, if given, returns False are left out altogether.
+  """
+  groups = {}
+  boards = set()
+  for path in paths:
+    word = board.word_at_cells(path)
+    if keep is not None and not keep(word):
+      if stats is not None:
+        stats.prunes["letters"] += 1
+      continue
+    subtrees = groups.setdefault(word, [])
+    if not with_boards:
+      continue
+    remaining_board = board.remove_cells(path)
+    if (word, remaining_board) in boards:
+      if stats is not None:
+        stats.prunes["duplicate"] += 1
+      continue
+    boards.add((word, remaining_board))
+    subtrees.append((path, remaining_board))
+  return groups
+
+def _cached_solve(board, word_lengths, context):
+  """
+  Return an iterable of solution tuples for the board, using the cache.
+  Solutions are yielded as they are found, so the first doesn't wait for
+  the rest, and those found before a budget runs out aren't lost. They
+  are only cached once the board has been solved completely, so a
+  search stopped part way never leaves partial results in the cache.
+  """
+  key = (
+    board, word_lengths, context.patterns_for(word_lengths), context.unique
+  )
+  solutions = context.cache.get(key)
+  if solutions is None:
+    return _iter_and_cache(key, board, word_lengths, context)
+  if context.stats is not None:
+    context.stats.cache_hits += 1
   return solutions
+
+def _iter_and_cache(key, board, word_lengths, context):
+  cache = context.cache
+  solutions = [] if cache.accepts(1) else None
+  for s in _iter_solve(board, word_lengths, context):
+    solution = tuple(s)
+    if solutions is not None:
+      solutions.append(solution)
+      if not cache.accepts(len(solutions)):
+        # Too many to cache, so they aren't kept either
+        solutions = None
+    yield solution
+  if solutions is not None:
+    cache.put(key, solutions)
+
+# State for worker processes of a parallel solve, set up once per worker
+# by `_init_worker` so the tries are not sent with every task.
+_worker_state = {}
+
+def _init_worker(
+    board, word_lengths, tries, letters, collect_stats, unique, budget,
+    patterns
+):
+  _worker_state.update(
+    board=board,
+    word_lengths=word_lengths,
+    tries=tries,
+    letters=letters,
+    patterns=patterns,
+    cache=SolveCache(),
+    collect_stats=collect_stats,
+    unique=unique,
+    budget=budget
+  )
+
+def _solve_subtree(path):
+  """
+  Solve the remaining words after using `path` for the first word,
+  returning a tuple (solutions, stats, nodes, reason). stats is a
+  SearchStats for this subtree, or None if the parent isn't collecting
+  stats. With a budget, nodes is the number of cells visited, and if
+  the budget ran out, solutions is incomplete and reason says why.
+  """
+  board = _worker_state["board"]
+  word_lengths = _worker_state["word_lengths"]
+  stats = SearchStats() if _worker_state["collect_stats"] else None
+  budget = _worker_state["budget"]
+  nodes = budget.nodes if budget is not None else 0
+  context = _SolveContext(
+    _worker_state["tries"], _worker_state["cache"], stats, len(word_lengths),
+    _worker_state["unique"], budget, _worker_state["patterns"]
+  )
+  context.letters = _worker_state["letters"]
+  solutions = []
+  try:
+    for s in _cached_solve(board.remove_cells(path), word_lengths[1:], context):
+      solutions.append(s)
+  except BudgetExceeded:
+    pass
+  if budget is None:
+    return (solutions, stats, 0, None)
+  return (solutions, stats, budget.nodes - nodes, budget.reason())
+
+def _iter_solve_parallel(board, word_lengths, workers, context):
+  budget = context.budget
+  pattern = context.patterns[0]
+  subsolns = list(board.iter_cell_paths(
+    word_lengths[0], pattern, context.tries[(word_lengths[0], pattern)],
+    context.stats, budget=budget
+  ))
+  keep = _word_filter(board, word_lengths[1:], context)
+  words = None
+  if context.unique:
+    groups = _group_by_word(board, subsolns, True, context.stats, keep)
+    subsolns = [
+      path for subtrees in groups.values() for (path, _) in subtrees
+    ]
+    words = {word: len(subtrees) for (word, subtrees) in groups.items()}
+  elif keep is not None:
+    kept = []
+    for path in subsolns:
+      if keep(board.word_at_cells(path)):
+        kept.append(path)
+      elif context.stats is not None:
+        context.stats.prunes["letters"] += 1
+    subsolns = kept
+  if not subsolns:
+    return
+  # Deferred, as it's slow to import and only parallel solves need it
+  from concurrent.futures import ProcessPoolExecutor
+  executor = ProcessPoolExecutor(
+    max_workers=workers,
+    initializer=_init_worker,
+    initargs=(
+      board, word_lengths, context.tries, context.feasibility(),
+      context.stats is not None, context.unique, budget, context.patterns
+    )
+  )
+  try:
+    chunksize = max(1, len(subsolns) // (workers * 4))
+    results = executor.map(_solve_subtree, subsolns, chunksize=chunksize)
+    # For a unique solve, the paths for each word are consecutive
+    (last_word, seen) = (None, None)
+    for (s, result) in zip(subsolns, results):
+      (remaining_solutions, stats, nodes, reason) = result
+      if stats is not None:
+        context.stats.merge(stats)
+      word = board.word_at_cells(s)
+      if words is not None and word != last_word:
+        last_word = word
+        seen = set() if words[word] > 1 else None
+      for r in remaining_solutions:
+        if seen is not None:
+          if r in seen:
+            continue
+          seen.add(r)
+        yield [word] + list(r)
+      if budget is not None:
+        if reason is not None:
+          # The worker ran out of budget part way through this subtree
+          budget.stop(reason)
+        budget.spend(nodes)
+  finally:
+    executor.shutdown(cancel_futures=True)
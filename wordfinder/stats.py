@@ -0,0 +1,83 @@
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+class SearchStats:
+  """
+  Counters and timings collected during a search, to help explain why a
+  solve is slow. Searches take an optional `stats` argument and only
+  update it if one is given, so instrumentation costs next to nothing
+  when it isn't wanted.
+
+  nodes (int) -- cells visited while extending paths
+  paths (int) -- paths that reached the full word length, whether or not
+    they spelled a dictionary word
+  lookups (int) -- dictionary (trie) lookups
+  prunes (Counter) -- paths abandoned early, by cause:
+    "prefix" -- the letter didn't match the required prefix
+    "dictionary" -- the letters weren't a prefix of, or weren't, a word
+    "infeasible" -- the board's letters couldn't spell any solution
+    "duplicate" -- a word left the same board as an earlier instance
+      of it, in a unique solve
+    "letters" -- a word left too few letters for the remaining words
+  cache_hits (int) -- sub-solutions reused from the SolveCache
+  max_path_depth (int) -- the longest path explored
+  max_solve_depth (int) -- the most words deep the solver recursed
+  timings (dict of str to float) -- seconds spent in each named phase
+  """
+
+  COUNTERS = ["nodes", "paths", "lookups", "cache_hits"]
+  MAXIMUMS = ["max_path_depth", "max_solve_depth"]
+
+  def __init__(self):
+    self.nodes = 0
+    self.paths = 0
+    self.lookups = 0
+    self.prunes = Counter()
+    self.cache_hits = 0
+    self.max_path_depth = 0
+    self.max_solve_depth = 0
+    self.timings = {}
+
+  @contextmanager
+  def phase(self, name):
+    """Add the time spent in the `with` block to the named phase."""
+    start = time.perf_counter()
+    try:
+      yield
+    finally:
+      self.timings[name] = \
+        self.timings.get(name, 0.0) + time.perf_counter() - start
+
+  def timed(self, iterable, name="search"):
+    """
+    Lazily yield the items of `iterable`, adding the time spent producing
+    them, but not the time the consumer spends between items, to the
+    named phase.
+    """
+    iterator = iter(iterable)
+    while True:
+      with self.phase(name):
+        try:
+          item = next(iterator)
+        except StopIteration:
+          return
+      yield item
+
+  def merge(self, other):
+    """Add the counts and timings of another SearchStats to these."""
+    for name in SearchStats.COUNTERS:
+      setattr(self, name, getattr(self, name) + getattr(other, name))
+    for name in SearchStats.MAXIMUMS:
+      setattr(self, name, max(getattr(self, name), getattr(other, name)))
+    self.prunes.update(other.prunes)
+    for (name, seconds) in other.timings.items():
+      self.timings[name] = self.timings.get(name, 0.0) + seconds
+
+  def to_dict(self):
+    """Return the stats as a dict suitable for encoding as JSON."""
+    d = {name: getattr(self, name)
+         for name in SearchStats.COUNTERS + SearchStats.MAXIMUMS}
+    d["prunes"] = dict(self.prunes)
+    d["timings"] = dict(self.timings)
+    return d
@@ -0,0 +1,56 @@
+from bisect import bisect_left
+
+class Trie:
+  """
+  A prefix trie over a sorted sequence of upper-case words.
+
+  Rather than allocating a node object per letter, each node is
+  represented by the slice of the sorted word list that shares its
+  prefix: a tuple (lo, hi, depth) where every word in words[lo:hi]
+  begins with the same `depth` letters. Descending to a child is a
+  pair of binary searches within that slice, so the trie costs no
+  memory beyond the word list itself.
+  """
+
+  def __init__(self, words):
+    """
+    words (sequence of str) -- upper-case words in sorted order, with
+      no duplicates.
+    """
+    self.words = words
+
+  def root(self):
+    """Return the node matching the empty prefix."""
+    return (0, len(self.words), 0)
+
+  def child(self, node, letter):
+    """
+    Return the node reached by appending `letter` (a single upper-case
+    character) to the prefix of `node`, or None if no word begins with
+    the resulting prefix.
+    """
+    (lo, hi, depth) = node
+    if lo >= hi:
+      return None
+    prefix = self.words[lo][:depth]
+    start = bisect_left(self.words, prefix + letter, lo, hi)
+    end = bisect_left(
+      self.words, prefix + chr(ord(letter) + 1), start, hi
+    )
+    if start >= end:
+      return None
+    return (start, end, depth + 1)
+
+  def is_word(self, node):
+    """True if the prefix of `node` is itself a word."""
+    (lo, hi, depth) = node
+    return lo < hi and len(self.words[lo]) == depth
+
+  def walk(self, letters):
+    """Return the node for the given prefix, or None if no word has it."""
+    node = self.root()
+    for letter in letters.upper():
+      node = self.child(node, letter)
+      if node is None:
+        break
+    return node